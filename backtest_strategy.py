@@ -2,20 +2,23 @@
 from concurrent import futures
 import multiprocessing
 from os import getcwd
-from os.path import join, exists
-import keras
-from tensorflow.python.data import Dataset
-
-import keras_models
+from os.path import join, exists, basename, splitext
+from time import perf_counter_ns
 import numpy as np
 from common_utilities import CommonUtilities
 import constants
 import indicators_set_up
 from enum_classes import EnumPair
+from feature_layout import FeatureLayout
+from indicator_registry import IndicatorRegistry
+from numpy_inference import NumpyInferenceModel
+from order_book import OrderBook
 from process_quotes_file import ProcessQuotesFile
 from quotes_reader import QuotesReader
 from quote import Quote
 from position import Position
+from price_scale import PriceScale
+from profiler import Profiler
 
 def run() -> None:
     print("Starting BACKTEST.")
@@ -27,8 +30,14 @@ def run() -> None:
     if model_path is None:
         print("There were no models saved/stored in the " + constants.MODELS_PATH + " folder. Ending procedure.")
         return
+    numpy_model_path = join(constants.MODELS_PATH, model_path + "_0" + NumpyInferenceModel.MODEL_FILE_EXTENSION)
     model_path = join(constants.MODELS_PATH, model_path + "_0.keras")
-    if exists(model_path):
+    if constants.BACKTEST_NUMPY_INFERENCE and exists(numpy_model_path):
+        model = NumpyInferenceModel.load(numpy_model_path)
+        print("Running the predictions with the NumPy export " + numpy_model_path)
+    elif exists(model_path):
+        # TensorFlow is only imported when the Keras model is used.
+        import keras
         model = keras.models.load_model(model_path)
     else:
         raise ValueError("Please check while the KERAS model could not be loaded from path " + model_path)
@@ -36,7 +45,18 @@ def run() -> None:
 
     all_positions = []
 
-    if constants.MULTITHREADED:
+    if constants.CHAIN_DAILY_FILES:
+        # Each file continues from the order book and indicators state at the end of the previous one.
+        order_book_state = None
+        for file_name in sorted(csv_list):
+            full_file_name = join(getcwd(), constants.RAW_BACKTEST_PATH, file_name)
+            checkpoint_path = join(getcwd(), constants.CHECKPOINTS_PATH,
+                                   "backtest_" + splitext(file_name)[0] + ".ckpt")
+            positions = process(full_file_name, currency_pair, model, order_book_state, checkpoint_path)
+            order_book_state = OrderBook.load_checkpoint(checkpoint_path)
+            if positions is not None:
+                all_positions.extend(positions)
+    elif constants.MULTITHREADED:
         # Create adequate number of threads
         cpu_count = multiprocessing.cpu_count() - 2
         cpu_count = max(2, cpu_count)
@@ -63,6 +83,13 @@ def run() -> None:
             if positions is not None:
                 all_positions.extend(positions)
 
+    if constants.PROFILING:
+        # Sum the per-file reports of all the workers.
+        reports_prefix = "backtest_" + CommonUtilities.generate_file_name_base(".json").split("{}")[0]
+        aggregated_report = Profiler.aggregate_reports(Profiler.load_reports(reports_prefix))
+        stored_report = Profiler.store(aggregated_report, reports_prefix + "all.json")
+        print("Stored the aggregated profiling report in {}.".format(stored_report))
+
     # REPORTING
     total_variation = 0.0
     total_calmar = 0.0
@@ -129,26 +156,64 @@ def run() -> None:
         print(f'Total duration : {total_duration:,}')
         print(f'Max duration : {max_duration / constants.NANOS_IN_ONE_MINUTE:,} minutes')
 
-def process(file_name, currency_pair: EnumPair, model: keras.Model) -> list:
+def process(file_name, currency_pair: EnumPair, model, order_book_state: dict = None,
+            checkpoint_path: str = None) -> list:
+    """
+    Backtests the strategy on one file.
+    @param model: a NumpyInferenceModel or a keras.Model. Both output (SELL, BUY) probabilities.
+    @param order_book_state: state of the order book and the indicators to continue from (see OrderBook.get_state),
+    e.g. at the end of the previous file. None (default) starts from an empty book and skips the first 100 quotes.
+    @param checkpoint_path: if set, the state at the end of the file is stored there (see OrderBook.store_checkpoint).
+    """
     # load the trained model in the "model" folder using keras built-in tools
     quantity_processed = 0
-    indicators_return_size = 0
     positions_list = []
     previous_report_time = 0
 
-    indicators: tuple = ProcessQuotesFile.deep_copy_indicators(indicators_set_up.INDICATORS)
+    indicators: tuple = IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS)
     order_book = CommonUtilities.init_globally_chosen_order_book(currency_pair)
     order_book.set_indicators(indicators)
+    if order_book_state is not None:
+        order_book.set_state(order_book_state)
+    # Top of the book, refreshed by the order book at each quote.
+    market_state = order_book.get_market_state()
+    # Per-stage timers. When profiling is disabled, the loop only tests the local boolean.
+    file_name_short = splitext(basename(file_name))[0]
+    profiler = Profiler(file_name_short)
+    profiling = profiler.is_enabled()
+    order_book.set_profiler(profiler)
+
+    feature_layout = FeatureLayout(indicators)
+    full_validity_mask = feature_layout.get_full_validity_mask()
+    collected_features = np.empty(feature_layout.get_width(), dtype=np.float32)
 
-    for indicator in indicators:
-        indicators_return_size += indicator.get_return_size()[0]
+    is_numpy_model = isinstance(model, NumpyInferenceModel)
+    if not is_numpy_model:
+        from tensorflow.data import Dataset
+    # Multi-head models (one head per profit level): query the head of the traded profit level.
+    heads_count = model.get_heads_count() if is_numpy_model else len(model.outputs)
+    head_index = constants.PROFIT_LEVEL_INDEX if heads_count > 1 else 0
+    # Sequence models (see SlidingWindowDataset) read the window of the last collected feature rows.
+    window_length = model.input_shape[1] if not is_numpy_model and len(model.input_shape) == 3 else 0
+    if window_length > 0:
+        window = np.zeros((1, window_length, feature_layout.get_width()), dtype=np.float32)
+        window_rows_count = 0
 
     reader = QuotesReader(file_name, currency_pair)
+    # Fixed-point prices: the positions compare the units of the quotes, see PriceScale.
+    if constants.FIXED_POINT_PRICES:
+        price_scale = PriceScale.for_pair(currency_pair)
+        get_best_bid = market_state.get_best_bid_units
+        get_best_offer = market_state.get_best_offer_units
+    else:
+        price_scale = None
+        get_best_bid = market_state.get_best_bid
+        get_best_offer = market_state.get_best_offer
 
     each_quote: Quote = reader.read_line()
 
-    # No backtest/calculations for the first 100 quotes to update indicator values.
-    while quantity_processed < 100 and each_quote is not None:
+    # No backtest/calculations for the first 100 quotes to update indicator values. Not needed after a warm start.
+    while order_book_state is None and quantity_processed < 100 and each_quote is not None:
         order_book.incoming_quote(each_quote)
         quantity_processed += 1
         each_quote = reader.read_line()
@@ -159,27 +224,61 @@ def process(file_name, currency_pair: EnumPair, model: keras.Model) -> list:
     current_position_is_long: bool = None
 
     while each_quote is not None:
+        if profiling:
+            started = perf_counter_ns()
         order_book.incoming_quote(each_quote)
+        if profiling:
+            profiler.add_time(Profiler.ORDER_BOOK, perf_counter_ns() - started)
+            started = perf_counter_ns()
         # Update all existing positions with the latest prices
         for position in positions_list:
             # Each position handles the OPEN/CLOSE process automatically.
-            position.actualize(order_book.get_best_price(True),
-                               order_book.get_best_price(False),
+            position.actualize(get_best_bid(), get_best_offer(),
                                each_quote.get_local_timestamp())
+        if profiling:
+            profiler.add_time(Profiler.POSITIONS_ACTUALIZE, perf_counter_ns() - started, len(positions_list))
         # Do the PREDICT only once X ms. Reuse the processor's function AS IS
         if ProcessQuotesFile.is_next_step_timer(previous_report_time,
                                                 constants.EACH_STEP_TIMER,
                                                 each_quote.get_local_timestamp()):
             previous_report_time = each_quote.get_local_timestamp()
-            collected_features = ProcessQuotesFile.collect_indicators_values(indicators, indicators_return_size)
-            # Wrap into a dataset object. Maybe the collected_features = (np.expand_dims(collected_features, 0))
-            # would equally work
-            collected_features = ([collected_features,],)
-            collected_features = Dataset.from_tensor_slices(collected_features).batch(constants.BATCH_SIZE)
-            #features = (np.expand_dims(collected_features, 0))
-            label_prediction = model.predict(x=collected_features, verbose=0)
+            if profiling:
+                started = perf_counter_ns()
+            validity_mask = feature_layout.collect_indicators_values(collected_features)
+            if profiling:
+                profiler.add_time(Profiler.FEATURE_COLLECTION, perf_counter_ns() - started)
+            if validity_mask != full_validity_mask:
+                # Some indicators are still warming up: the model was never trained on such rows.
+                profiler.count("warm_up_steps")
+                each_quote = reader.read_line()
+                continue
+            if window_length > 0:
+                window[0, :-1] = window[0, 1:]
+                window[0, -1] = collected_features
+                window_rows_count += 1
+                if window_rows_count < window_length:
+                    profiler.count("window_warm_up_steps")
+                    each_quote = reader.read_line()
+                    continue
+            if profiling:
+                started = perf_counter_ns()
+            if is_numpy_model:
+                label_prediction = model.predict_row(collected_features, head_index)
+            elif window_length > 0:
+                label_prediction = model.predict(x=window, verbose=0)[0]
+            else:
+                # Wrap into a dataset object. Maybe the collected_features = (np.expand_dims(collected_features, 0))
+                # would equally work
+                features_dataset = ([collected_features,],)
+                features_dataset = Dataset.from_tensor_slices(features_dataset).batch(constants.BATCH_SIZE)
+                label_prediction = model.predict(x=features_dataset, verbose=0)
+                if heads_count > 1:
+                    label_prediction = label_prediction[head_index]
+                label_prediction = label_prediction[0]
             # (ex. (True, False) -> buy, (False,True) -> sell, (False, False) or (True, True) -> nothing)
-            label_prediction = (label_prediction[0][0] > 0.5, label_prediction[0][1] > 0.5)
+            label_prediction = (label_prediction[0] > 0.5, label_prediction[1] > 0.5)
+            if profiling:
+                profiler.add_time(Profiler.INFERENCE, perf_counter_ns() - started)
 
             is_long = tuple(label_prediction) == (True, False)
             is_short = tuple(label_prediction) == (False, True)
@@ -189,13 +288,16 @@ def process(file_name, currency_pair: EnumPair, model: keras.Model) -> list:
                 # Or we are switching ways in our position (we were LONG and the new signal is SELL for example)
                 if current_position_is_long is None or ((is_long and not current_position_is_long) or (is_short and current_position_is_long)):
                     current_position_is_long = is_long
-                    new_position = Position(is_long, order_book.get_best_price(True),
-                                            order_book.get_best_price(False),
-                                            each_quote.get_local_timestamp())
+                    new_position = Position(is_long, get_best_bid(), get_best_offer(),
+                                            each_quote.get_local_timestamp(), price_scale)
                     positions_list.append(new_position)
 
         # Update with new quote.
         each_quote = reader.read_line()
     # Close the reader.
     reader.close_reader()
+    if checkpoint_path is not None:
+        OrderBook.store_checkpoint(order_book.get_state(), checkpoint_path)
+    profiler.count("positions", len(positions_list))
+    profiler.store_report("backtest_" + CommonUtilities.generate_file_name_base(".json").format(file_name_short))
     return positions_list
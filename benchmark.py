@@ -0,0 +1,281 @@
+# This file contains the benchmark suite of the pipeline stages. Run it with: python benchmark.py [--steps N]
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from time import perf_counter_ns
+import numpy as np
+
+import constants
+import indicators_set_up
+import recursive_kernels
+from common_utilities import CommonUtilities
+from enum_classes import EnumOrderBook, EnumPair
+from feature_normalization import FeatureNormalization
+from feature_to_label_collection import FeatureToLabelCollection
+from features_labels_storage import FeaturesLabelsStorage
+from indicator_registry import IndicatorRegistry
+from numpy_inference import NumpyInferenceModel
+from process_quotes_file import ProcessQuotesFile
+from profiler import Profiler
+from quotes_reader import QuotesReader
+from synthetic_quotes_generator import SyntheticQuotesGenerator
+
+
+class Benchmark:
+    """
+    Reproducible benchmark of each stage of the pipeline on seeded synthetic files (see SyntheticQuotesGenerator):
+    QuotesReader, each order book, each indicator and its batch kernel, FeatureToLabelCollection, ProcessQuotesFile,
+    FeatureNormalization, the storage round-trip and the backtest loop.
+    Each stage reports its total time and its time per item (quote or row). The results are stored as JSON in
+    constants.BENCHMARK_PATH with the current commit, and compared with the previous stored run.
+    """
+
+    # The time per item of a stage is flagged as a regression above this ratio vs the previous run.
+    REGRESSION_RATIO = 1.20
+    __FORMATS = ((EnumOrderBook.HIGH_FREQ_FX, EnumPair.EURUSD), (EnumOrderBook.DUKASKOPY, EnumPair.OTHER))
+
+    def __init__(self, steps: int = 2000, seed: int = 0, pairs_weights: dict = None, include_backtest: bool = True):
+        """
+        @param steps: steps of the random walks, i.e. size of the generated files.
+        @param seed: seed of the generated files and features.
+        @param pairs_weights: pair mix of the HIGH_FREQ_FX file (see SyntheticQuotesGenerator). The benchmarked pair
+        is EURUSD: the other pairs are read and skipped by the reader.
+        @param include_backtest: the backtest loop needs TensorFlow. Set to False to skip it.
+        """
+        self.__steps = steps
+        self.__seed = seed
+        self.__pairs_weights = {EnumPair.EURUSD: 1} if pairs_weights is None else pairs_weights
+        self.__include_backtest = include_backtest
+        self.__stages = {}
+
+    def run(self) -> dict:
+        """
+        Generates the files and times all the stages.
+        @return: results: {"commit", "python", "machine", "parameters", "stages": {stage: {"total_ns", "items",
+        "ns_per_item"}}}
+        """
+        self.__stages = {}
+        generator = SyntheticQuotesGenerator(self.__seed)
+        with tempfile.TemporaryDirectory() as directory, Benchmark.__override_constants(DEBUG=False, TRACE=False):
+            for order_book_type, currency_pair in Benchmark.__FORMATS:
+                file_name = os.path.join(directory, order_book_type.name.lower() + ".csv")
+                if order_book_type == EnumOrderBook.HIGH_FREQ_FX:
+                    generator.generate_high_freq_fx(file_name, self.__steps, self.__pairs_weights)
+                else:
+                    generator.generate_dukascopy(file_name, self.__steps)
+                with Benchmark.__override_constants(ORDER_BOOK_TYPE=order_book_type):
+                    self.__run_file_stages(order_book_type.name + ":", file_name, currency_pair)
+            self.__run_rows_stages(directory)
+        return {"commit": Benchmark.__get_commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "parameters": {"steps": self.__steps, "seed": self.__seed,
+                               "pairs_weights": {pair.name: weight for pair, weight in self.__pairs_weights.items()},
+                               "kernels": recursive_kernels.get_backend()},
+                "stages": self.__stages}
+
+    def __add_stage(self, stage: str, elapsed_nanos: int, items: int) -> None:
+        self.__stages[stage] = {"total_ns": elapsed_nanos, "items": items,
+                                "ns_per_item": elapsed_nanos / items if items > 0 else 0.0}
+
+    def __run_file_stages(self, prefix: str, file_name: str, currency_pair: EnumPair) -> None:
+        # Reader: it is the input of all the other stages, which then run on the preloaded quotes.
+        started = perf_counter_ns()
+        reader = QuotesReader(file_name, currency_pair)
+        quotes = []
+        quote = reader.read_line()
+        while quote is not None:
+            quotes.append(quote)
+            quote = reader.read_line()
+        self.__add_stage(prefix + "quotes_reader", perf_counter_ns() - started, len(quotes))
+
+        # Bare order book.
+        order_book = CommonUtilities.init_globally_chosen_order_book(currency_pair)
+        started = perf_counter_ns()
+        for quote in quotes:
+            order_book.incoming_quote(quote)
+        self.__add_stage(prefix + "order_book", perf_counter_ns() - started, len(quotes))
+
+        # Each indicator: timed by the profiler of the order book.
+        order_book = CommonUtilities.init_globally_chosen_order_book(currency_pair)
+        order_book.set_indicators(IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS))
+        profiler = Profiler(prefix, enabled=True)
+        order_book.set_profiler(profiler)
+        bids = np.empty(len(quotes), dtype=np.float64)
+        offers = np.empty(len(quotes), dtype=np.float64)
+        for quote_index, quote in enumerate(quotes):
+            order_book.incoming_quote(quote)
+            bids[quote_index] = order_book.get_best_price(True)
+            offers[quote_index] = order_book.get_best_price(False)
+        for stage, timer in profiler.get_report()["stages"].items():
+            if stage.startswith(Profiler.INDICATOR_PREFIX):
+                self.__add_stage(prefix + stage, timer["total_ns"], timer["calls"])
+        self.__run_kernel_stages(prefix, (bids + offers) / 2)
+
+        # Labels: one row per step timer, the profit levels are checked at each quote.
+        collection = FeatureToLabelCollection(constants.LOOKBACK_TIME, constants.PROFIT_LEVELS)
+        previous_report_time = 0
+        rows_count = 0
+        started = perf_counter_ns()
+        for quote_index, quote in enumerate(quotes):
+            quote_time = quote.get_local_timestamp()
+            if ProcessQuotesFile.is_next_step_timer(previous_report_time, constants.EACH_STEP_TIMER, quote_time):
+                previous_report_time = quote_time
+                collection.put(quote_time, bids[quote_index], offers[quote_index], rows_count)
+                rows_count += 1
+            collection.check_profit_levels_on_active_cells(quote_time, bids[quote_index], offers[quote_index])
+        collection.get_ready_calculations()
+        self.__add_stage(prefix + "feature_to_label_collection", perf_counter_ns() - started, len(quotes))
+
+        # The whole file processor: reader, order book, indicators, features and labels.
+        processor = ProcessQuotesFile(file_name, constants.PROFIT_LEVELS, constants.LOOKBACK_TIME)
+        started = perf_counter_ns()
+        processor.start_process(indicators_set_up.INDICATOR_SPECS, currency_pair)
+        self.__add_stage(prefix + "process_quotes_file", perf_counter_ns() - started, len(quotes))
+
+        if self.__include_backtest:
+            self.__run_backtest_stage(prefix, file_name, currency_pair, len(quotes))
+
+    def __run_kernel_stages(self, prefix: str, mids: np.ndarray) -> None:
+        # Batch recursions of the indicators over the whole mid series (see recursive_kernels). The first call of
+        # each kernel is a warm-up: with Numba, it compiles the kernel.
+        kernels = (("MACD", lambda series: (recursive_kernels.ema_series(series, 12),
+                                            recursive_kernels.ema_series(series, 26))),
+                   ("VPVMA", lambda series: recursive_kernels.ema_series(series, 12)),
+                   ("RSI", lambda series: recursive_kernels.rsi_series(series, 14)),
+                   ("ADX", lambda series: recursive_kernels.wilder_sum_series(np.abs(np.diff(series)), 14)),
+                   ("SAR", lambda series: recursive_kernels.sar_series(series)))
+        for name, kernel in kernels:
+            kernel(mids[:64])
+            started = perf_counter_ns()
+            kernel(mids)
+            self.__add_stage(prefix + "kernel:" + name, perf_counter_ns() - started, len(mids))
+
+    def __run_backtest_stage(self, prefix: str, file_name: str, currency_pair: EnumPair, quotes_count: int) -> None:
+        # TensorFlow is only loaded when the backtest is benchmarked.
+        import keras
+        import backtest_strategy
+        from feature_layout import FeatureLayout
+        width = FeatureLayout(IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS)).get_width()
+        keras.utils.set_random_seed(self.__seed)
+        # Untrained model of the same input width: it gives the inference cost, not the strategy PnL.
+        model = keras.Sequential([keras.Input(shape=(width,)), keras.layers.Dense(2, activation="sigmoid")])
+        started = perf_counter_ns()
+        backtest_strategy.process(file_name, currency_pair, model)
+        self.__add_stage(prefix + "backtest_loop", perf_counter_ns() - started, quotes_count)
+        numpy_model = NumpyInferenceModel.from_keras_model(model)
+        started = perf_counter_ns()
+        backtest_strategy.process(file_name, currency_pair, numpy_model)
+        self.__add_stage(prefix + "backtest_loop_numpy", perf_counter_ns() - started, quotes_count)
+
+    def __run_rows_stages(self, directory: str) -> None:
+        # Feature rows of the width of the indicators set.
+        width = sum(indicator.get_return_size()[0]
+                    for indicator in IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS))
+        rows_count = max(self.__steps, 1)
+        random_generator = np.random.default_rng(self.__seed)
+        features = random_generator.normal(size=(rows_count, width)).astype(np.float32)
+        labels = [[[bool(sell), bool(buy)] for sell, buy in random_generator.random(size=(rows_count, 2)) < 0.3]
+                  for i in range(len(constants.PROFIT_LEVELS))]
+
+        started = perf_counter_ns()
+        normalized_features = FeatureNormalization(features).run_normalization()
+        self.__add_stage("feature_normalization", perf_counter_ns() - started, rows_count)
+
+        started = perf_counter_ns()
+        stored_file_name = FeaturesLabelsStorage.store_ready_features_labels(
+            [labels, normalized_features], ("benchmark.csv", "benchmark_0.pkl"),
+            (indicators_set_up.INDICATOR_SPECS, constants.PROFIT_LEVELS, EnumPair.EURUSD), directory)
+        FeaturesLabelsStorage.restore_ready_features_labels(file_name=stored_file_name)
+        self.__add_stage("storage_round_trip", perf_counter_ns() - started, rows_count)
+
+    @staticmethod
+    def store_results(results: dict, directory_base: str = constants.BENCHMARK_PATH) -> str:
+        """
+        @return: the stored file path: benchmark_<date>_<commit>.json
+        """
+        return Profiler.store(results, "benchmark_" + CommonUtilities.generate_file_name_base(".json")
+                              .format(results["commit"]), directory_base)
+
+    @staticmethod
+    def load_previous_results(directory_base: str = constants.BENCHMARK_PATH) -> dict:
+        """
+        @return: the most recent stored results. None if there is none.
+        """
+        stored_files = sorted(glob.glob("benchmark_*.json", root_dir=directory_base))
+        if len(stored_files) == 0:
+            return None
+        with open(os.path.join(directory_base, stored_files[-1]), 'r') as open_pointer:
+            return json.load(open_pointer)
+
+    @staticmethod
+    def compare_results(results: dict, previous_results: dict) -> dict:
+        """
+        Compares the time per item of each stage with the previous run. Only meaningful with the same parameters.
+        @return: dict stage -> ratio current / previous. The stages absent from one run are skipped.
+        """
+        ratios = {}
+        for stage, timer in results["stages"].items():
+            previous_timer = previous_results["stages"].get(stage)
+            if previous_timer is not None and previous_timer["ns_per_item"] > 0:
+                ratios[stage] = timer["ns_per_item"] / previous_timer["ns_per_item"]
+        return ratios
+
+    @staticmethod
+    def print_results(results: dict, previous_results: dict = None) -> None:
+        ratios = {}
+        if previous_results is not None:
+            if previous_results["parameters"] != results["parameters"]:
+                print("WARNING! The previous run ({}) used other parameters: no comparison."
+                      .format(previous_results["commit"]))
+            else:
+                ratios = Benchmark.compare_results(results, previous_results)
+                print("Compared with the previous run ({}).".format(previous_results["commit"]))
+        print("{:<70}{:>12}{:>16}{:>10}".format("STAGE", "ITEMS", "NS PER ITEM", "RATIO"))
+        for stage, timer in results["stages"].items():
+            ratio = ratios.get(stage)
+            ratio_str = "" if ratio is None else "{:.2f}".format(ratio)
+            flag = " REGRESSION" if ratio is not None and ratio > Benchmark.REGRESSION_RATIO else ""
+            print("{:<70}{:>12,}{:>16,.0f}{:>10}{}".format(stage, timer["items"], timer["ns_per_item"],
+                                                           ratio_str, flag))
+
+    @staticmethod
+    def __get_commit() -> str:
+        try:
+            return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
+
+    @staticmethod
+    @contextmanager
+    def __override_constants(**overridden):
+        # The readers and the order books read the global constants at run time.
+        previous_values = {name: getattr(constants, name) for name in overridden}
+        for name, value in overridden.items():
+            setattr(constants, name, value)
+        try:
+            yield
+        finally:
+            for name, value in previous_values.items():
+                setattr(constants, name, value)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark of the pipeline stages on synthetic quotes.")
+    parser.add_argument("--steps", type=int, default=2000, help="size of the generated files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-backtest", action="store_true", help="don't load TensorFlow")
+    parser.add_argument("--no-store", action="store_true", help="don't store the results")
+    arguments = parser.parse_args()
+
+    benchmark_results = Benchmark(arguments.steps, arguments.seed,
+                                  include_backtest=not arguments.skip_backtest).run()
+    Benchmark.print_results(benchmark_results, Benchmark.load_previous_results())
+    if not arguments.no_store:
+        print("Stored the results in {}.".format(Benchmark.store_results(benchmark_results)))
@@ -1,13 +1,15 @@
 from concurrent import futures
 import multiprocessing
 from os import getcwd, makedirs
-from os.path import join
+from os.path import join, exists, splitext
 import constants
 import indicators_set_up
 from features_labels_storage import FeaturesLabelsStorage
 from process_quotes_file import ProcessQuotesFile
 from common_utilities import CommonUtilities
-from feature_normalization import FeatureNormalization
+from order_book import OrderBook
+from profiler import Profiler
+from run_configuration import RunConfiguration
 
 
 def run():
@@ -17,12 +19,18 @@ def run():
 
     save_features_labels_folder = join(getcwd(), constants.FEATURES_LABELS_PATH)
     makedirs(save_features_labels_folder, exist_ok=True)
+    # One folder per run configuration: the configurations are computed in the same pass over each file. Each one is
+    # trained on with train_network.run(features_labels_path=...) or a TrainingJob of the configuration.
+    for configuration in RunConfiguration.get_configured_runs():
+        makedirs(join(save_features_labels_folder, configuration.get_name()), exist_ok=True)
 
     csv_list = CommonUtilities.get_files_list_of_a_type_in_dir(constants.RAW_PATH)
     # Create the file name base.
     file_name_base = CommonUtilities.generate_file_name_base()
 
-    if constants.MULTITHREADED:
+    if constants.CHAIN_DAILY_FILES:
+        run_chained(csv_list, file_name_base)
+    elif constants.MULTITHREADED:
         # Create adequate number of threads
         cpu_count = multiprocessing.cpu_count() - 2
         cpu_count = max(2, cpu_count)
@@ -53,36 +61,99 @@ def run():
             file_index += 1
         print("Done processing files.")
 
+    if constants.PROFILING:
+        # Sum the per-file reports of all the workers.
+        reports_prefix = "features_" + file_name_base.split("{}")[0]
+        aggregated_report = Profiler.aggregate_reports(Profiler.load_reports(reports_prefix))
+        stored_report = Profiler.store(aggregated_report, reports_prefix + "all.json")
+        print("Stored the aggregated profiling report in {}.".format(stored_report))
 
-def process_one_file(file_name, file_index, file_name_base) -> bool:
-    processor = ProcessQuotesFile(file_name, constants.PROFIT_LEVELS, constants.LOOKBACK_TIME)
-    # Calculate
-    processor.start_process(indicators_set_up.INDICATORS, constants.CCY_PAIR)
-    # Get ready results
-    processed_features_labels = processor.get_features_labels()
-    #Adding a normalization process to all features, then replacing the unnormalized features
-    #By normalized ones.
-    normalized_features_labels = normalize_features(processed_features_labels)
 
-    total_lines_features_labels = len(processed_features_labels[0][0])
+def get_checkpoint_path(file_name: str) -> str:
+    """
+    @return: path of the checkpoint stored at the end of a raw file, see run_chained.
+    """
+    return join(getcwd(), constants.CHECKPOINTS_PATH, splitext(file_name)[0] + ".ckpt")
+
+
+def run_chained(csv_list: list, file_name_base: str) -> None:
+    """
+    Processes the files in name (date) order, each one continuing from the order book and indicators state at the
+    end of the previous one. The files with a checkpoint were processed by a previous run: they are skipped and the
+    next file continues from their checkpoint.
+    """
+    order_book_state = None
+    for file_index, file_name in enumerate(sorted(csv_list)):
+        checkpoint_path = get_checkpoint_path(file_name)
+        if exists(checkpoint_path):
+            print("Skipping file: {} (index {}), already processed.".format(file_name, file_index))
+            order_book_state = OrderBook.load_checkpoint(checkpoint_path)
+            continue
+        print("Starting processing file: {} (index {})".format(file_name, file_index))
+        full_file_name = join(getcwd(), constants.RAW_PATH, file_name)
+        order_book_state = process_one_file(full_file_name, file_index, file_name_base, order_book_state)
+        OrderBook.store_checkpoint(order_book_state, checkpoint_path)
+        print("Processed file: {} (index {})".format(file_name, file_index))
+    print("Done processing chained files.")
 
-    print("\n{}: Collected {} features-labels.".format(file_index, total_lines_features_labels))
-    # Store for later
+
+def process_one_file(file_name, file_index, file_name_base, order_book_state: dict = None) -> dict:
+    """
+    @param order_book_state: state at the end of the previous file to continue from. None for a cold start.
+    @return: state of the order book and the indicators at the end of the file (see OrderBook.get_state).
+    """
+    # The configured runs (constants.RUN_CONFIGURATIONS) share this pass over the file. None: the single run.
+    configured_runs = RunConfiguration.get_configured_runs()
+    processor = ProcessQuotesFile(file_name, constants.PROFIT_LEVELS, constants.LOOKBACK_TIME,
+                                  configured_runs if len(configured_runs) > 0 else None)
+    # Calculate
+    processor.start_process(indicators_set_up.INDICATOR_SPECS, constants.CCY_PAIR, order_book_state)
+    profiler = processor.get_profiler()
     stored_file_name = file_name_base.format(file_index)
-    FeaturesLabelsStorage.store_ready_features_labels(normalized_features_labels,
-                                                      (file_name, stored_file_name),
-                                                      (indicators_set_up.INDICATORS, constants.PROFIT_LEVELS,
-                                                       constants.CCY_PAIR), constants.FEATURES_LABELS_PATH)
-    print("\n{}: Stored in {} features-labels.".format(file_index, stored_file_name))
-    return True
+    for configuration, processed_features_labels, targets in zip(processor.get_run_configurations(),
+                                                                 processor.get_features_labels_per_configuration(),
+                                                                 processor.get_targets_per_configuration()):
+        #Adding a normalization process to all features, then replacing the unnormalized features
+        #By normalized ones.
+        with profiler.measure(Profiler.NORMALIZATION):
+            normalized_features_labels = normalize_features(processed_features_labels)
+
+        total_lines_features_labels = len(processed_features_labels[0][0])
+
+        print("\n{}: Collected {} features-labels ({}).".format(file_index, total_lines_features_labels,
+                                                               configuration.get_name()))
+        # Store for later
+        if len(configured_runs) > 0:
+            directory_base = join(constants.FEATURES_LABELS_PATH, configuration.get_name())
+        else:
+            directory_base = constants.FEATURES_LABELS_PATH
+        with profiler.measure(Profiler.STORAGE):
+            stored_full_path = FeaturesLabelsStorage.store_ready_features_labels(normalized_features_labels,
+                                                                                 (file_name, stored_file_name),
+                                                                                 (indicators_set_up.INDICATOR_SPECS,
+                                                                                  configuration.get_profit_levels(),
+                                                                                  constants.CCY_PAIR), directory_base)
+            # Multi-horizon labels and first touch times, aligned with the stored rows.
+            if len(configuration.get_horizons()) > 0:
+                FeaturesLabelsStorage.store_targets(targets, configuration.get_horizons(), stored_full_path)
+        print("\n{}: Stored in {} features-labels.".format(file_index, join(directory_base, stored_file_name)))
+    stored_report = profiler.store_report("features_" + file_name_base.format(file_index).replace(".pkl", ".json"))
+    if stored_report is not None:
+        print("{}: Stored the profiling report in {}.".format(file_index, stored_report))
+    return processor.get_order_book_state()
 
 def normalize_features(processed_features_labels):
     """
     Fonction pour normaliser les valeurs de features labels grâce à la classe FeatureNormalization
     """
     normalized_features_labels = processed_features_labels
-    normalizer = FeatureNormalization(processed_features_labels[0][1])
+    if len(processed_features_labels[1]) == 0:
+        # Nothing to normalize: the file was too short to get past the indicators warm-up.
+        return normalized_features_labels
+    # sklearn is only imported by the normalization: not by the workers that only process the quotes.
+    from feature_normalization import FeatureNormalization
+    normalizer = FeatureNormalization(processed_features_labels[1])
     normalized_features = normalizer.run_normalization()
-    normalized_features_labels[0][1] = normalized_features
+    normalized_features_labels[1] = normalized_features
 
     return normalized_features_labels 
@@ -31,6 +31,9 @@ FLOAT_ROUND_PRECISION: int = 8
 FLOAT_ROUND_PRECISION_DEC: int = pow(10, -FLOAT_ROUND_PRECISION)
 # How many digits there is after the comma in the fractions
 PRICE_ROUND_PRECISION: int = 5
+# Fixed-point prices: the reader decodes the prices into int64 units of 10^-decimals of the pair (see PriceScale,
+# PRICE_ROUND_PRECISION decimals by default). The labels and the backtest positions then compare ints.
+FIXED_POINT_PRICES = False
 # Nanos in second, millisecond, minute etc.
 NANOS_IN_ONE_MILLIS = 1000000
 NANOS_IN_ONE_SECOND = 1000000000
@@ -41,6 +44,26 @@ DATE_FORMAT: str = "%Y-%m-%d-%H-%M"
 # This constant modifies the frequency of FEATURE/LABEL collection updates AND the debug of the current status
 # of processing
 FREQUENCY_OF_DATA_TRANSFERS = 10000
+# HIGH_FREQ_FX files are read as raw bytes by buffers of this size (see QuotesReader).
+QUOTES_READER_BUFFER_SIZE = 1024 * 1024
+# Audit mode of the QuotesReader fast path: one accepted line every N is validated with the strict regex. 0 = off.
+QUOTES_READER_AUDIT_EVERY = 0
+# Per-stage timers and counters (see Profiler). Reports are stored as JSON in PROFILING_PATH, one per processed
+# file plus one aggregated over all the files/workers.
+PROFILING = False
+PROFILING_PATH = r"profiling"
+# Results of benchmark.py: one JSON file per run, compared with the previous run to spot regressions.
+BENCHMARK_PATH = r"benchmarks"
+# The batch kernels of the indicator recursions (see recursive_kernels) are compiled with Numba when it is installed.
+# False forces the pure-Python kernels.
+NUMBA_KERNELS = True
+# The feature rows are stored in a preallocated 2-D array. It grows by this number of rows when it is full.
+FEATURE_BUFFER_CHUNK_ROWS = 65536
+# Daily files chaining: the files are processed one after the other in name (date) order, each one continuing from
+# the state of the order book and the indicators at the end of the previous one (no warm-up after the first file).
+# The state at the end of each file is stored in CHECKPOINTS_PATH: a new run resumes after the last checkpointed file.
+CHAIN_DAILY_FILES = False
+CHECKPOINTS_PATH = r"checkpoints"
 
 
 """
@@ -59,9 +82,25 @@ LOOKBACK_TIME = 120 * NANOS_IN_ONE_SECOND
 # How long do we wait between each step (recalculation of indicators and report to FeatureToLabelCollection)
 # It manages as well the frequency at which the backtester makes the PREDICT
 EACH_STEP_TIMER = 100 * NANOS_IN_ONE_MILLIS
+# Multi-horizon targets: horizons (nanos) of extra labels computed in the same labelling pass, with the time to the
+# first touch of each price target (see FeatureToLabelCollection.get_ready_targets). They are stored as int32/bool
+# arrays in a _targets.npz file next to each features-labels file. Empty: none. For example:
+# (10 * NANOS_IN_ONE_SECOND, 30 * NANOS_IN_ONE_SECOND, LOOKBACK_TIME)
+LABEL_HORIZONS: tuple = ()
+# Sensitivity studies: several (name, lookback time, step timer, profit levels[, horizons]) computed in a single pass
+# over each quotes file, sharing the reading, the order book and the indicators (see RunConfiguration). Each one is
+# stored in its own FEATURES_LABELS_PATH/<name> folder. Without horizons, a configuration uses LABEL_HORIZONS.
+# Empty: the single run above, stored in FEATURES_LABELS_PATH.
+# For example: (("lb_60s", 60 * NANOS_IN_ONE_SECOND, EACH_STEP_TIMER, PROFIT_LEVELS),
+#               ("lb_300s", 300 * NANOS_IN_ONE_SECOND, 500 * NANOS_IN_ONE_MILLIS, (0.0001, 0.0002)))
+RUN_CONFIGURATIONS: tuple = ()
 #It manages the FeatureLabelModificator to let the user choose between various strategies to try to resolve
 #the classifications issues for our model to perfom better.
-FEATURE_LABEL_MODIFICATION_STRATEGY = "NONE"  # Options: "class_weights", "smote", "map_labels", "NONE"
+# Options: "class_weights", "smote", "streaming_smote", "map_labels", "NONE"
+FEATURE_LABEL_MODIFICATION_STRATEGY = "NONE"
+# "streaming_smote": synthetic minority rows are interpolated per training batch between a row and one of its
+# SMOTE_NEIGHBORS nearest neighbours of the same class (see StreamingOversampler).
+SMOTE_NEIGHBORS = 5
 
 """
 TRAIN NETWORK PARAMETERS
@@ -69,8 +108,14 @@ TRAIN NETWORK PARAMETERS
 
 # This is the profit level index. Remember that we calculate LABELs for several profit levels at once.
 PROFIT_LEVEL_INDEX = 0
+# Trains all the profit levels at once: one shared trunk with one head per profit level. The backtest then queries
+# the head of PROFIT_LEVEL_INDEX. False trains the PROFIT_LEVEL_INDEX level only.
+MULTI_HEAD_TRAINING = False
 # Test is 30% fraction of all data. Train is 70%
 TEST_FRACTION = 0.30
+# Fraction of the TRAIN rows held out as the validation set of the early stopping and of the learning rate reduction
+# (val_loss). The TEST set is only used for the final report.
+VALIDATION_FRACTION = 0.15
 # Epochs set how many times you will sweep through the (same set of) data to train the network. With each sweep the
 # model gets incremental adjustments and the loss (calculated with loss function) decreases. So, having many epochs
 # might be beneficial to having a well-trained model. Too many epochs can lead to overfitting problems.
@@ -80,10 +125,41 @@ EPOCHS_COUNT = 50
 # model. For example, if you had 1000 input points and BATCH_SIZE=4 -- the model will be trained each iteration with
 # 1000/4 = 250 total iterations.
 BATCH_SIZE = 32
-# Type of hyperparameters optimization (GRID, RANDOM, BAYESIAN) or NONE if you want the simple version.
+# Sequence models ("lstm" or "conv1d", "NONE" for the Dense models): each example is the window of the last
+# SEQUENCE_WINDOW_LENGTH feature rows of a file (see SlidingWindowDataset).
+SEQUENCE_MODEL = "NONE"
+SEQUENCE_WINDOW_LENGTH = 16
+# The TEST set is evaluated in batches of this size: one prediction pass, then the metrics are computed on arrays.
+EVALUATION_BATCH_SIZE = 4096
+# Decision thresholds swept by the evaluation, besides the 0.5 of the backtest (precision/recall of each).
+EVALUATION_THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8)
+# Type of hyperparameters optimization (GRID, RANDOM, BAYESIAN, HYPERBAND) or NONE if you want the simple version.
 HYPERPARAMETERS_OPTIMIZATION = EnumHyperParamsOptimization.BAYESIAN
-# Number of trials for hyperparameters optimization
+# Number of trials for hyperparameters optimization. HYPERBAND derives its count of trials from EPOCHS_COUNT (the
+# maximal epochs budget of a trial) and HYPERBAND_FACTOR instead.
 TRIALS = 10
+# HYPERBAND: each round keeps 1 / HYPERBAND_FACTOR of the configurations and gives them HYPERBAND_FACTOR times more
+# epochs. The whole bracket sweep is repeated HYPERBAND_ITERATIONS times.
+HYPERBAND_FACTOR = 3
+HYPERBAND_ITERATIONS = 1
+# The trials of the search are stopped after this count of epochs without val_loss improvement. 0 = never.
+TUNER_EARLY_STOPPING_PATIENCE = 3
+# Above 1, the trials of the search run concurrently in this number of local worker processes (see parallel_tuning).
+TUNER_WORKERS = 1
+# CPU threads budget of each worker. 0 shares the CPUs between the workers.
+TUNER_THREADS_PER_WORKER = 0
+# Incremental training (see train_network.run_incremental): the most recent model is fine-tuned on the new stored
+# files during INCREMENTAL_EPOCHS_COUNT epochs, with a replay sample of at most REPLAY_SAMPLE_SIZE older rows.
+INCREMENTAL_EPOCHS_COUNT = 5
+REPLAY_SAMPLE_SIZE = 50000
+# Training scheduler (see TrainingScheduler): one model per job (ccy pair, profit level index, strategy), trained in
+# TRAINING_WORKERS concurrent processes. 0 runs CPU count / TRAINING_INTRA_OP_THREADS processes. An optional 4th
+# element trains on the features and labels of a RUN_CONFIGURATIONS name, for example (CCY_PAIR, 0, "NONE", "lb_60s").
+TRAINING_JOBS = ((CCY_PAIR, PROFIT_LEVEL_INDEX, FEATURE_LABEL_MODIFICATION_STRATEGY),)
+TRAINING_WORKERS = 0
+# TensorFlow threads of each training process: threads of one operation (intra-op), concurrent operations (inter-op).
+TRAINING_INTRA_OP_THREADS = 1
+TRAINING_INTER_OP_THREADS = 1
 
 """
 BACKTEST PARAMETERS
@@ -93,4 +169,7 @@ TAKE_PROFIT = PROFIT_LEVELS[PROFIT_LEVEL_INDEX]
 # 10 bps
 # FOR Currency Pair STOP_LOSS would be 0.0010 for XAU/USD = 5.0
 STOP_LOSS = 0.0010
+# Run the backtest predictions with the NumPy export of the model (see NumpyInferenceModel) when it exists next to
+# the .keras file. TensorFlow is then not imported by the backtest.
+BACKTEST_NUMPY_INFERENCE = True
 
@@ -10,6 +10,8 @@ class EnumHyperParamsOptimization(Enum):
     GRID = 2
     RANDOM = 3
     NONE = 4
+    # Successive halving: many configurations on a small epochs budget, only the best are promoted.
+    HYPERBAND = 5
 
 
 class EnumCcy(Enum):
@@ -0,0 +1,98 @@
+import numpy as np
+from indicator import Indicator
+
+
+class FeatureLayout:
+    """
+    Compiled layout of a feature row: built once from the indicators set. Each indicator owns a fixed slice
+    [offset, offset + width) of the row, where width is its declared get_return_size. The indicators write their
+    values directly into their slice of a preallocated row (see Indicator.write_current_value).
+    Currently supports N-1 return sizes only (vectors).
+    """
+
+    def __init__(self, indicators: tuple):
+        """
+        Compiles the layout.
+        @param indicators: the indicators whose values form a feature row, in the order of the columns.
+        """
+        if len(indicators) > 64:
+            raise ValueError("The feature layout supports up to 64 indicators (one validity bit per indicator).")
+        self.__indicators = tuple(indicators)
+        slices = []
+        offset = 0
+        indicator: Indicator
+        for indicator in self.__indicators:
+            return_size = indicator.get_return_size()
+            if len(return_size) != 1 or not isinstance(return_size[0], int) or return_size[0] < 1:
+                raise ValueError("{}: declared return size {} is not supported. Use a 1-D size (N,)."
+                                 .format(indicator.get_description(), return_size))
+            slices.append((offset, offset + return_size[0]))
+            offset += return_size[0]
+        self.__slices = tuple(slices)
+        self.__width = offset
+        self.__full_validity_mask = (1 << len(self.__indicators)) - 1
+        # The effective width of each indicator is checked against the declared one on its first ready value.
+        self.__is_width_validated = [False] * len(self.__indicators)
+
+    def get_width(self) -> int:
+        """
+        @return: the total width of a feature row.
+        """
+        return self.__width
+
+    def get_indicators(self) -> tuple:
+        return self.__indicators
+
+    def get_slices(self) -> tuple:
+        """
+        @return: tuple of (start, stop) columns for each indicator.
+        """
+        return self.__slices
+
+    def get_full_validity_mask(self) -> int:
+        """
+        @return: the validity mask of a row in which all the indicators were ready.
+        """
+        return self.__full_validity_mask
+
+    def get_column_names(self) -> list:
+        """
+        @return: one name per column: the indicator description, suffixed with the position for the wide indicators.
+        """
+        column_names = []
+        for indicator, (start, stop) in zip(self.__indicators, self.__slices):
+            if stop - start == 1:
+                column_names.append(indicator.get_description())
+            else:
+                column_names += ["{}[{}]".format(indicator.get_description(), i) for i in range(stop - start)]
+        return column_names
+
+    def collect_indicators_values(self, features_row: np.ndarray) -> int:
+        """
+        Writes the current values of the indicators into their slices of the row. Indicators that are not ready
+        (see Indicator.is_ready) are written as NaN and their bit is left unset in the returned validity mask.
+        @param features_row: 1-D float array of get_width() cells. Filled in place.
+        @return: validity mask. Bit i is set if the indicator i was ready.
+        """
+        validity_mask = 0
+        indicator_index = 0
+        for indicator in self.__indicators:
+            start, stop = self.__slices[indicator_index]
+            if indicator.is_ready():
+                if not self.__is_width_validated[indicator_index]:
+                    self.__validate_width(indicator_index)
+                indicator.write_current_value(features_row[start:stop])
+                validity_mask |= 1 << indicator_index
+            else:
+                features_row[start:stop] = np.nan
+            indicator_index += 1
+        return validity_mask
+
+    def __validate_width(self, indicator_index: int) -> None:
+        indicator: Indicator = self.__indicators[indicator_index]
+        start, stop = self.__slices[indicator_index]
+        effective_width = np.size(indicator.get_current_value())
+        if effective_width != stop - start:
+            raise ValueError("{}: declares a return size of {} but returns {} values."
+                             .format(indicator.get_description(), stop - start, effective_width))
+        self.__is_width_validated[indicator_index] = True
@@ -6,6 +6,8 @@ class FeatureNormalization:
     Class that normalize all the features with the MinMax Scaler of Scikit:
     Takes as input the features calculated by the calculate_features_labels.py code.
     Runs at the end of features_labels calculations before saving.
+    The warm-up rows are already dropped by ProcessQuotesFile: the cleaning step is a vectorized safety net for
+    the values an indicator could still produce (inf, overflows).
     """
     def __init__(self, features):
         self.__features = features
@@ -18,7 +20,7 @@ class FeatureNormalization:
         self._validate_cleaning()    # Validate cleaned features
         self.__fit()                 # Fit the scaler
         normalized_features = self.__transform()  # Transform the features
-        return self._convert_to_tuples(normalized_features)
+        return normalized_features
 
     def __fit(self):
         self.__minmax_scaler.fit(self.__features)
@@ -27,7 +29,7 @@ class FeatureNormalization:
         return self.__minmax_scaler.transform(self.__features)
 
     def _convert_to_array(self):
-        self.__features = np.array([list(row) for row in self.__features], dtype=np.float64)
+        self.__features = np.asarray(self.__features, dtype=np.float32)
 
     def _debug_features(self):
         #print(f"Feature Shape: {self.__features.shape}")
@@ -54,9 +56,9 @@ class FeatureNormalization:
 
         if invalid_mask.any():
             print("Cleaning invalid values...")
-            col_means = np.nanmean(self.__features, axis=0)
-            for row, col in np.argwhere(invalid_mask):
-                self.__features[row, col] = col_means[col]
+            # Means over the valid cells only, then replace all the invalid cells at once.
+            col_means = np.nanmean(np.where(invalid_mask, np.nan, self.__features), axis=0)
+            self.__features = np.where(invalid_mask, col_means, self.__features).astype(np.float32)
         print("Invalid values cleaned.")
 
     def _validate_cleaning(self):
@@ -64,5 +66,3 @@ class FeatureNormalization:
             raise ValueError("Features still contain invalid values after cleaning.")
         print("All features are valid.")
 
-    def _convert_to_tuples(self, features):
-        return [tuple(row) for row in features]
@@ -0,0 +1,70 @@
+import numpy as np
+import constants
+
+
+class FeatureRowsBuffer:
+    """
+    Preallocated 2-D float32 buffer of feature rows with their validity masks. It grows by chunks of rows so the
+    pipeline doesn't allocate anything per step. Row views returned by next_row are only valid until the next call.
+    """
+
+    def __init__(self, width: int, chunk_rows: int = constants.FEATURE_BUFFER_CHUNK_ROWS):
+        """
+        @param width: the width of a feature row (see FeatureLayout.get_width)
+        @param chunk_rows: how many rows are added each time the buffer is full.
+        """
+        if chunk_rows < 1:
+            raise ValueError("Please input a positive chunk size.")
+        self.__width = width
+        self.__chunk_rows = chunk_rows
+        self.__rows = np.empty((chunk_rows, width), dtype=np.float32)
+        self.__validity_masks = np.zeros(chunk_rows, dtype=np.uint64)
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def get_width(self) -> int:
+        return self.__width
+
+    def get_capacity(self) -> int:
+        return self.__rows.shape[0]
+
+    def next_row(self) -> tuple:
+        """
+        Reserves the next row of the buffer.
+        @return: tuple (row index, 1-D row view to be filled in place)
+        """
+        if self.__count == self.__rows.shape[0]:
+            self.__grow()
+        row_index = self.__count
+        self.__count += 1
+        return row_index, self.__rows[row_index]
+
+    def set_validity_mask(self, row_index: int, validity_mask: int) -> None:
+        self.__validity_masks[row_index] = validity_mask
+
+    def get_rows(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        @return: 2-D view on the rows [start, stop). No copy.
+        """
+        if stop is None:
+            stop = self.__count
+        return self.__rows[start:stop]
+
+    def get_validity_masks(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        @return: 1-D view on the validity masks of the rows [start, stop). No copy.
+        """
+        if stop is None:
+            stop = self.__count
+        return self.__validity_masks[start:stop]
+
+    def __grow(self) -> None:
+        capacity = self.__rows.shape[0] + self.__chunk_rows
+        rows = np.empty((capacity, self.__width), dtype=np.float32)
+        rows[:self.__count] = self.__rows[:self.__count]
+        validity_masks = np.zeros(capacity, dtype=np.uint64)
+        validity_masks[:self.__count] = self.__validity_masks[:self.__count]
+        self.__rows = rows
+        self.__validity_masks = validity_masks
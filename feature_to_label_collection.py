@@ -1,4 +1,6 @@
+import numpy as np
 import constants
+from price_scale import PriceScale
 
 
 class FeatureToLabelCollection:
@@ -15,33 +17,110 @@ class FeatureToLabelCollection:
     If BID_t0 - PRICE_DELTA < ASK_tN -> SELL signal LABEL
     where tN - t0 < causality_timespan
     If neither was triggered during the causality timespan -> we mark this feature as NO_ACTION signal LABEL
+
+    With horizons, the same pass also records the time to the first touch of each price target, monitored up to the
+    longest horizon. The SELL/BUY hits within each horizon follow from it (see get_ready_targets).
+
+    The cells are stored in preallocated NumPy columns (end times, targets, label bits, features): [head, active
+    start) are the resolved cells not returned yet and [active start, tail) the monitored ones. The cells are put in
+    time order, so they expire in the same order: the monitored cells are a contiguous range checked with vectorized
+    comparisons, and the resolved ones are returned as a slice of the columns (see get_ready_batch).
+
+    With a price scale, the prices are fixed-point ints (see PriceScale): the targets are exact ints, not rounded.
     """
 
-    def __init__(self, causality_timespan: int, price_deltas: tuple):
+    def __init__(self, causality_timespan: int, price_deltas: tuple, horizons: tuple = (), capacity: int = 1024,
+                 price_scale: PriceScale = None):
         """
         Initialize the collection
         @param causality_timespan: the time interval (usually nanos) during which we monitor the price for each feature
         set.
         @param price_deltas: the price delta(s) that activate the BUY/SELL signal Label(s). Provide one or multiple
         price levels in a tuple.
+        @param horizons: time intervals (nanos) of the multi-horizon labels. Empty (default): only the labels of the
+        causality_timespan, no first touch times.
+        @param capacity: initial count of cells of the columns. They are compacted or doubled when full.
+        @param price_scale: None (default) for float prices. Otherwise put and check_profit_levels_on_active_cells
+        take the prices in the fixed-point units of this scale. The price deltas stay float prices.
         """
         self._causality_timespan = causality_timespan
+        for horizon in horizons:
+            if horizon <= 0:
+                raise ValueError("Please input positive horizons.")
+        if capacity < 1:
+            raise ValueError("Please input a positive capacity.")
+        self.__horizons = np.array(horizons, dtype=np.int64)
+        self.__tracks_targets = len(horizons) > 0
+        # The cells are monitored up to the longest horizon when it is longer than the causality timespan.
+        self.__monitoring_timespan = max((causality_timespan,) + tuple(horizons))
         for price_delta in price_deltas:
             if price_delta < 0:
                 raise ValueError("Please input a positive price target." +
                                  " It will be correctly added/subtracted by the algo.")
         self._price_deltas = price_deltas
         self._price_deltas_count = len(price_deltas)
+        self.__price_scale = price_scale
+        self.__price_deltas_units = None if price_scale is None else tuple(price_scale.to_units(price_delta)
+                                                                           for price_delta in price_deltas)
+        self.__prices_dtype = np.float64 if price_scale is None else np.int64
         self._price_targets_count = self._price_deltas_count * 2
-        self._price_targets = []
-        self._end_time_reference = []
-        self._features = []
-        self._labels = [[] for i in range(self._price_deltas_count)]
-        self.__monitored_indexes = set()
+        self.__column_names = ("_end_times", "_sell_targets", "_buy_targets", "_labels", "_features")
+        if self.__tracks_targets:
+            self.__column_names += ("_monitoring_ends", "_first_touch_times")
+        self.__head = 0
+        self.__active_start = 0
+        self.__tail = 0
+        self.__allocate(capacity)
+        self.__ready_targets = (np.zeros((0, len(horizons), self._price_deltas_count, 2), dtype=bool),
+                                np.zeros((0, self._price_deltas_count, 2), dtype=np.int32))
+
+    def get_horizons(self) -> tuple:
+        return tuple(self.__horizons.tolist())
+
+    def get_capacity(self) -> int:
+        return len(self._end_times)
+
+    def __allocate(self, capacity: int) -> None:
+        """
+        Allocates new columns and moves the cells [head, tail) to their beginning.
+        """
+        deltas_count = self._price_deltas_count
+        columns = {"_end_times": np.empty(capacity, dtype=np.int64),
+                   "_sell_targets": np.empty((capacity, deltas_count), dtype=self.__prices_dtype),
+                   "_buy_targets": np.empty((capacity, deltas_count), dtype=self.__prices_dtype),
+                   # [SELL, BUY] label bits per price delta.
+                   "_labels": np.empty((capacity, deltas_count, 2), dtype=bool),
+                   "_features": np.empty(capacity, dtype=object)}
+        if self.__tracks_targets:
+            # End of the longest horizon, and per price delta [SELL, BUY] elapsed nanos to the first touch (-1: not
+            # touched yet).
+            columns["_monitoring_ends"] = np.empty(capacity, dtype=np.int64)
+            columns["_first_touch_times"] = np.empty((capacity, deltas_count, 2), dtype=np.int64)
+        pending_count = self.__tail - self.__head
+        for name in self.__column_names:
+            if pending_count > 0:
+                columns[name][:pending_count] = getattr(self, name)[self.__head:self.__tail]
+            setattr(self, name, columns[name])
+        self.__shift_indexes()
+
+    def __compact(self) -> None:
+        """
+        Moves the cells [head, tail) to the beginning of the columns: the returned cells are dropped.
+        """
+        for name in self.__column_names:
+            column = getattr(self, name)
+            column[:self.__tail - self.__head] = column[self.__head:self.__tail]
+        self.__shift_indexes()
+
+    def __shift_indexes(self) -> None:
+        self.__active_start -= self.__head
+        self.__tail -= self.__head
+        self.__head = 0
 
     def put(self, inserted_time_reference: int, current_bid: float, current_offer: float, feature: tuple) -> None:
         """
         Insert next monitored line. Call the check_profit_levels_on_active_cells separately to update the collection.
+        The lines are inserted in time order.
 
         @param inserted_time_reference: time reference of this inserted line
         @param current_bid: the best price observed on the market right now for SALE
@@ -49,29 +128,32 @@ class FeatureToLabelCollection:
         @param feature: the DATA (1-D or 2-D or N-D) that is representing the Features saved to correspond to the
         Labels calculated during the _causality_timespan
         """
-        current_count = len(self._features)
-        # One for sell, one for buy.
-        for delta_index in range(self._price_deltas_count):
-            # Workaround to add the LIST to the collection.
-            self._labels[delta_index].append(None)
-            self._labels[delta_index][current_count] = [False, False]
-        # One for each level of price.
-        self._features.append(feature)
-
-        self.__monitored_indexes.add(current_count)
-
-        self._end_time_reference.append(inserted_time_reference + self._causality_timespan)
-
+        if self.__tail == len(self._end_times):
+            # Full: drop the returned cells when they are at least half of the columns, otherwise double them.
+            if self.__head >= len(self._end_times) // 2:
+                self.__compact()
+            else:
+                self.__allocate(2 * len(self._end_times))
+        index = self.__tail
+        self._end_times[index] = inserted_time_reference + self._causality_timespan
         # Calculate price targets
-        price_targets = []
-        for price_delta in self._price_deltas:
-            sell_target = current_bid - price_delta
-            sell_target = round(sell_target, constants.PRICE_ROUND_PRECISION)
-            buy_target = current_offer + price_delta
-            buy_target = round(buy_target, constants.PRICE_ROUND_PRECISION)
-            targets = sell_target, buy_target
-            price_targets.append(targets)
-        self._price_targets.append(tuple(price_targets))
+        if self.__price_scale is not None:
+            # Fixed-point: exact ints, nothing to round.
+            for price_delta_index, price_delta_units in enumerate(self.__price_deltas_units):
+                self._sell_targets[index, price_delta_index] = current_bid - price_delta_units
+                self._buy_targets[index, price_delta_index] = current_offer + price_delta_units
+        else:
+            for price_delta_index, price_delta in enumerate(self._price_deltas):
+                self._sell_targets[index, price_delta_index] = round(current_bid - price_delta,
+                                                                     constants.PRICE_ROUND_PRECISION)
+                self._buy_targets[index, price_delta_index] = round(current_offer + price_delta,
+                                                                    constants.PRICE_ROUND_PRECISION)
+        self._labels[index] = False
+        self._features[index] = feature
+        if self.__tracks_targets:
+            self._monitoring_ends[index] = inserted_time_reference + self.__monitoring_timespan
+            self._first_touch_times[index] = -1
+        self.__tail = index + 1
 
     def check_profit_levels_on_active_cells(self, quote_time: int, current_bid: float, current_offer: float) -> None:
         """
@@ -84,78 +166,86 @@ class FeatureToLabelCollection:
         @param current_bid: the [best] bid corresponding to this quote time
         @param current_offer: the [best] offer corresponding to this quote time
         """
-        removed_indexes = set()
-        for index in self.__monitored_indexes:
-            if self._end_time_reference[index] >= quote_time:
-                # We check the prices because the TIME SPAN didn't end.
-                for price_delta_index in range(self._price_deltas_count):
-                    # Check downwards movement (we've Sold at BID. We now Buy out at OFFER)
-                    if self._price_targets[index][price_delta_index][0] >= current_offer \
-                            and not self._labels[price_delta_index][index][0]:
-                        # Mark SELL LABEL as TRUE
-                        self._labels[price_delta_index][index][0] = True
-
-                    # Check upwards movement (we've Bought at OFFER. We now Sell out at BID)
-                    if self._price_targets[index][price_delta_index][1] <= current_bid \
-                            and not self._labels[price_delta_index][index][1]:
-                        # Mark BUY LABEL as TRUE
-                        self._labels[price_delta_index][index][1] = True
-
-                    # If all price targets were hit or it's exactly on the timer:
-                    if self._end_time_reference[index] == quote_time:
-                        removed_indexes.add(index)
-            else:
-                # self._end_time_reference[index] < quote_time
-                # We've passed the monitoring time span: we remove it from the checked indexes and don't check the
-                # prices anymore.
-                removed_indexes.add(index)
+        start, tail = self.__active_start, self.__tail
+        if start == tail:
+            return
+        monitoring_ends = self._monitoring_ends if self.__tracks_targets else self._end_times
+        # We've passed the monitoring time span of the first cells: we don't check their prices anymore.
+        if monitoring_ends[start] < quote_time:
+            start += int(np.searchsorted(monitoring_ends[start:tail], quote_time, side="left"))
+            self.__active_start = start
+            if start == tail:
+                return
+        # Check downwards movement (we've Sold at BID. We now Buy out at OFFER)
+        sell_hits = self._sell_targets[start:tail] >= current_offer
+        # Check upwards movement (we've Bought at OFFER. We now Sell out at BID)
+        buy_hits = self._buy_targets[start:tail] <= current_bid
+        labels = self._labels[start:tail]
+        if self.__tracks_targets:
+            # The labels of the cells past their causality timespan (the first ones) don't change anymore.
+            labels_start = 0
+            if self._end_times[start] < quote_time:
+                labels_start = int(np.searchsorted(self._end_times[start:tail], quote_time, side="left"))
+            labels = labels[labels_start:]
+            self.__mark_first_touches(start, tail, quote_time, sell_hits, buy_hits)
+            sell_hits = sell_hits[labels_start:]
+            buy_hits = buy_hits[labels_start:]
+        # Mark the SELL and BUY LABELS as TRUE
+        labels[:, :, 0] |= sell_hits
+        labels[:, :, 1] |= buy_hits
+        # The cells exactly on the timer are done.
+        if monitoring_ends[start] == quote_time:
+            self.__active_start = start + int(np.searchsorted(monitoring_ends[start:tail], quote_time, side="right"))
+
+    def __mark_first_touches(self, start: int, tail: int, quote_time: int, sell_hits: np.ndarray,
+                             buy_hits: np.ndarray) -> None:
+        first_touch_times = self._first_touch_times[start:tail]
+        elapsed_times = (quote_time + self.__monitoring_timespan - self._monitoring_ends[start:tail])[:, np.newaxis]
+        for side, hits in ((0, sell_hits), (1, buy_hits)):
+            side_touch_times = first_touch_times[:, :, side]
+            is_first_touch = hits & (side_touch_times < 0)
+            if is_first_touch.any():
+                side_touch_times[is_first_touch] = np.broadcast_to(elapsed_times, hits.shape)[is_first_touch]
+
+    def get_ready_targets(self) -> tuple:
+        """
+        Returns the targets of the rows returned by the last get_ready_calculations (or get_ready_batch), in the same
+        order. Only with horizons: empty arrays otherwise.
+        @return: tuple (horizon labels, first touch times). Horizon labels: bool array (rows, horizons, price deltas,
+        [SELL, BUY]), True if the target was touched within the horizon. First touch times: int32 array (rows, price
+        deltas, [SELL, BUY]) of the millis from the row to the first touch of the target, -1 if it wasn't touched
+        within the longest horizon.
+        """
+        return self.__ready_targets
 
-        # Remove the expired/unused keys
-        self.__monitored_indexes.difference_update(removed_indexes)
+    def __build_ready_targets(self, elapsed_nanos: np.ndarray) -> None:
+        is_touched = elapsed_nanos >= 0
+        # Compared in nanos: the millis are truncated.
+        horizon_labels = is_touched[:, np.newaxis] & (elapsed_nanos[:, np.newaxis]
+                                                      <= self.__horizons[np.newaxis, :, np.newaxis, np.newaxis])
+        first_touch_millis = np.where(is_touched, elapsed_nanos // constants.NANOS_IN_ONE_MILLIS, -1).astype(np.int32)
+        self.__ready_targets = (horizon_labels, first_touch_millis)
 
-    def get_ready_calculations(self) -> tuple:
+    def get_ready_batch(self) -> tuple:
         """
-        Returns all the ready calculations from this collection. Doesn't mark those as "returned" and keeps the
-        returned observations in the memory.
-        @return: tuple in form of [labels], [features]
+        Returns the resolved cells not returned yet, without copy, and marks them as returned.
+        @return: tuple (labels, features). Labels: bool array view (rows, price deltas, [SELL, BUY]). Features: 1-D
+        object array view of the inserted features. The views are only valid until the next put.
         """
-        # In case there is no values in __monitored_indexes:
-        first_monitored_index = 0
-        if len(self.__monitored_indexes) > 0:
-            first_monitored_index = min(self.__monitored_indexes)
-        else:
-            if len(self._labels[0]) > 0:
-                first_monitored_index = len(self._labels[0])
+        head, ready_end = self.__head, self.__active_start
+        self.__head = ready_end
+        if self.__tracks_targets:
+            self.__build_ready_targets(self._first_touch_times[head:ready_end])
+        return self._labels[head:ready_end], self._features[head:ready_end]
 
-        if first_monitored_index == 0:
+    def get_ready_calculations(self) -> tuple:
+        """
+        Returns all the ready calculations from this collection (see get_ready_batch) as lists.
+        @return: tuple in form of [labels], [features]. Labels: one list per price delta of [SELL, BUY] per row.
+        """
+        labels, features = self.get_ready_batch()
+        if len(features) == 0:
             # Nothing calculated so far -> we return an empty collection
             return [], []
-
-        # There are some calculations: return the ready ones. Please note that their indexes follow each other.
-        # We don't want any gaps to the future in the observations.
-
-        # Create PRICE DELTAS COUNT lists of NONE x  first_monitored_index equal vectors
-        returned_labels = [[[None] for j in range(first_monitored_index)] for i in range(self._price_deltas_count)]
-        returned_features = [None] * first_monitored_index
-
-        index = 0
-        while index < first_monitored_index:
-            price_delta_index = 0
-            while price_delta_index < self._price_deltas_count:
-                this_delta = self._labels[price_delta_index]
-                returned_labels[price_delta_index][index] = this_delta[index]
-                price_delta_index += 1
-            returned_features[index] = self._features[index]
-            index += 1
-
-        price_delta_index = 0
-        while price_delta_index < self._price_deltas_count:
-            self._labels[price_delta_index] = self._labels[price_delta_index][first_monitored_index:]
-            price_delta_index += 1
-        self._features = self._features[first_monitored_index:]
-        self._price_targets = self._price_targets[first_monitored_index:]
-        self._end_time_reference = self._end_time_reference[first_monitored_index:]
-
-        self.__monitored_indexes = set([x - first_monitored_index for x in self.__monitored_indexes])
-
-        return returned_labels, returned_features
+        return [labels[:, price_delta_index].tolist() for price_delta_index in range(self._price_deltas_count)], \
+            features.tolist()
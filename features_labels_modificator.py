@@ -1,5 +1,4 @@
 from sklearn.utils.class_weight import compute_class_weight
-from imblearn.over_sampling import SMOTE
 import numpy as np
 import constants
 
@@ -8,8 +7,8 @@ class FeatureLabelModificator:
         """
         Initialize with features and labels.
         """
-        self.__features = np.array(features)
-        self.__labels = np.array(labels)
+        self.__features = np.asarray(features)
+        self.__labels = np.asarray(labels)
         self.__strategy = constants.FEATURE_LABEL_MODIFICATION_STRATEGY
 
     def modify(self):
@@ -20,6 +19,8 @@ class FeatureLabelModificator:
                 return self.__compute_class_weights()
             elif self.__strategy == "smote":
                 return self.__apply_smote()
+            elif self.__strategy == "streaming_smote":
+                return self.__create_streaming_oversampler()
             elif self.__strategy == "map_labels":
                 return self.__map_labels()
             else:
@@ -38,6 +39,8 @@ class FeatureLabelModificator:
         """
         Apply SMOTE to oversample the minority classes.
         """
+        # imblearn is only imported by the SMOTE strategy.
+        from imblearn.over_sampling import SMOTE
         features_flat = self.__features.reshape(self.__features.shape[0], -1)
         mapped_labels = self.__map_labels_to_classes(self.__labels)
         smote = SMOTE(sampling_strategy="auto", random_state=42)
@@ -46,6 +49,13 @@ class FeatureLabelModificator:
         labels_resampled = self.__map_classes_to_labels(labels_resampled)
         return features_resampled, labels_resampled
     
+    def __create_streaming_oversampler(self):
+        """
+        SMOTE-like oversampling per training batch, without resampling the whole matrix (see StreamingOversampler).
+        """
+        from streaming_oversampler import StreamingOversampler
+        return StreamingOversampler(self.__features, self.__labels, seed=42)
+
     def __map_labels(self):
         """
         Map labels `[1, 1]` to `[0, 0]`.
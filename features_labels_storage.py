@@ -1,6 +1,7 @@
 import os
 from os.path import exists
 import pickle
+import numpy as np
 from common_utilities import CommonUtilities
 
 
@@ -14,7 +15,8 @@ class FeaturesLabelsStorage:
 
         @param features_labels: list [features, labels]
         @param file_characteristics: tuple (processed file name, stored file name)
-        @param calculation_characteristics: tuple (indicators, profit parameters, ccy parameters)
+        @param calculation_characteristics: tuple (indicator specs, profit parameters, ccy parameters). The specs
+        (see IndicatorSpec) are unpickled without importing the indicator modules.
         @param directory_base: directory in which we must store the ready calculations
         @return: stored file path
         """
@@ -24,6 +26,41 @@ class FeaturesLabelsStorage:
             pickle.dump(stored_data, open_pointer)
         return stored_full_path
 
+    @staticmethod
+    def get_targets_path(stored_full_path: str) -> str:
+        """
+        @param stored_full_path: path of a features-labels file (see store_ready_features_labels).
+        @return: path of its targets file.
+        """
+        return os.path.splitext(stored_full_path)[0] + "_targets.npz"
+
+    @staticmethod
+    def store_targets(targets: tuple, horizons: tuple, stored_full_path: str) -> str:
+        """
+        Stores the multi-horizon labels and first touch times of a features-labels file next to it, as NumPy arrays.
+        @param targets: tuple (horizon labels, first touch times), see ProcessQuotesFile.get_targets_per_configuration
+        @param horizons: the horizons (nanos) of the horizon labels.
+        @param stored_full_path: path of the features-labels file with the same rows.
+        @return: stored file path
+        """
+        targets_path = FeaturesLabelsStorage.get_targets_path(stored_full_path)
+        np.savez(targets_path, horizon_labels=targets[0], first_touch_times=targets[1],
+                 horizons=np.array(horizons, dtype=np.int64))
+        return targets_path
+
+    @staticmethod
+    def restore_targets(stored_full_path: str) -> tuple:
+        """
+        @param stored_full_path: path of a features-labels file.
+        @return: tuple (horizon labels, first touch times, horizons) stored with store_targets. Empty tuple if the file
+        has no targets.
+        """
+        targets_path = FeaturesLabelsStorage.get_targets_path(stored_full_path)
+        if not exists(targets_path):
+            return tuple()
+        with np.load(targets_path) as loaded:
+            return loaded["horizon_labels"], loaded["first_touch_times"], tuple(loaded["horizons"].tolist())
+
     @staticmethod
     def restore_ready_features_labels(index: int = 0, file_name: str = None, directory_base: str = None) -> tuple:
         """
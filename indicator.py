@@ -6,12 +6,20 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     # Evaluates to TRUE only during runtime.
     from order_book import OrderBook
+    from market_state import MarketState
+    from indicator_graph import IndicatorGraph
 # Regular imports
 from abc import ABC, abstractmethod
+from copy import deepcopy
+from indicator_graph import GraphNode
 from quote import Quote
 
 # Abstract Indicator class
 class Indicator(ABC):
+    # Count of order book queries per quote replaced by reads of the market state (see OrderBook.get_market_state).
+    BOOK_CALLS_PER_QUOTE = 0
+    # Attributes linking the indicator to its order book: not part of its state.
+    __LINK_ATTRIBUTES = ("_order_book", "_market_state")
 
     def __init__(self, order_book: OrderBook=None):
         """
@@ -19,9 +27,46 @@ class Indicator(ABC):
         with the set_order_book method.
         """
         self._order_book: OrderBook = order_book
+        self._market_state: MarketState = order_book.get_market_state() if order_book is not None else None
+        if order_book is not None:
+            self.bind_indicator_graph(order_book.get_indicator_graph())
 
     def set_order_book(self, order_book: OrderBook=None):
         self._order_book: OrderBook = order_book
+        # Updated in place by the order book at each quote: the reference stays valid.
+        self._market_state: MarketState = order_book.get_market_state() if order_book is not None else None
+        if order_book is not None:
+            self.bind_indicator_graph(order_book.get_indicator_graph())
+
+    def bind_indicator_graph(self, indicator_graph: IndicatorGraph) -> None:
+        """
+        Requests the shared primitives (series, EMAs, rolling windows) used by the indicator. Called when the
+        indicator is attached to an order book: the graph nodes are updated by the book before incoming_quote.
+        Override it in the indicators built on the graph.
+        @param indicator_graph: graph of the order book.
+        """
+        pass
+
+    def get_state(self) -> dict:
+        """
+        Returns the warm state of the indicator (histories, averages...), unlike __deepcopy__ which only copies the
+        parameters. The links to the order book and its graph nodes are left out: the order book stores them once
+        (see OrderBook.get_state).
+        @return: picklable dict, restored with set_state on an indicator with the same description.
+        """
+        attributes = {name: deepcopy(value) for name, value in self.__dict__.items()
+                      if name not in Indicator.__LINK_ATTRIBUTES and not isinstance(value, GraphNode)}
+        return {"description": self.get_description(), "attributes": attributes}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores the state returned by get_state. The indicator keeps its order book and graph nodes.
+        @param state: dict from get_state of an indicator with the same description.
+        """
+        if state["description"] != self.get_description():
+            raise ValueError("The state of {} can't be restored in {}.".format(state["description"],
+                                                                              self.get_description()))
+        self.__dict__.update(deepcopy(state["attributes"]))
     
     @abstractmethod
     def incoming_quote(self, quote: Quote) -> None:
@@ -39,6 +84,28 @@ class Indicator(ABC):
         """
         pass
 
+    def is_ready(self) -> bool:
+        """
+        Readiness contract: True once get_current_value returns meaningful numbers (warm-up is over).
+        While an indicator is not ready, its cells in the feature row are filled with NaN and its bit in the
+        validity mask is left unset. Override it in the indicators that know cheaper when they are warmed up.
+        @return: True if the current value can be used as a feature.
+        """
+        current_value = self.get_current_value()
+        if current_value is None:
+            return False
+        if isinstance(current_value, (tuple, list)):
+            return None not in current_value
+        return True
+
+    def write_current_value(self, destination) -> None:
+        """
+        Writes the current value into its slice of a preallocated feature row (see FeatureLayout). Override it to
+        avoid building an intermediate tuple.
+        @param destination: 1-D array view sized with get_return_size.
+        """
+        destination[:] = self.get_current_value()
+
     @abstractmethod
     def get_return_size(self) -> tuple:
         """
@@ -5,6 +5,8 @@ from indicator import Indicator
 from quote import Quote
 
 class IndicatorADX(Indicator):
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, period: int = 14):
         self.__period = period
         self.__true_range = deque(maxlen=period)
@@ -17,8 +19,8 @@ class IndicatorADX(Indicator):
         self.__adx = 0.0
 
     def incoming_quote(self, quote: Quote) -> None:
-        best_bid = self._order_book.get_best_price(True)
-        best_offer = self._order_book.get_best_price(False)
+        best_bid = self._market_state.get_best_bid()
+        best_offer = self._market_state.get_best_offer()
 
         # Initialize the first bid if no previous data exists
         if not self.__true_range:
@@ -71,6 +73,9 @@ class IndicatorADX(Indicator):
     def get_current_value(self) -> float:
         return self.__adx
 
+    def is_ready(self) -> bool:
+        return len(self.__dx_list) > 0
+
     def get_return_size(self) -> tuple:
         return (1,)
 
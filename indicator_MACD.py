@@ -1,7 +1,10 @@
 from indicator import Indicator
+from indicator_graph import IndicatorGraph, SeriesNode
 from quote import Quote
 
 class IndicatorMACD(Indicator):
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, short_period=12, long_period=26, signal_period=9):
         """
         MACD (Movering Average Convergence-Divergence) class initialization.
@@ -16,12 +19,11 @@ class IndicatorMACD(Indicator):
         self.__short_period = short_period
         self.__long_period = long_period
         self.__signal_period = signal_period
-        #List for prices storage
-        self.prices = [] 
-        #Storage of MACD values (value of short and long moving average, value of 
-        #MACD line (derives from long and short values) and signal line).
+        #Mid series and its short and long EMAs: shared nodes of the indicator graph (see bind_indicator_graph).
+        self.__mid = None
         self.__short_ema = None
         self.__long_ema = None
+        #Storage of MACD values (value of MACD line (derives from long and short values) and signal line).
         self.__macd_line = []
         self.__signal_line = None
         self.__histogram = None
@@ -29,20 +31,16 @@ class IndicatorMACD(Indicator):
         self.__doc_description = f"MACD Indicator with short={self.__short_period}, long={self.__long_period}, signal={self.__signal_period}."
         self.__description = f"MACD_{self.__short_period}_{self.__long_period}_{self.__signal_period}"
 
-    def __calculate_macd(self, close_price: float):
+    def bind_indicator_graph(self, indicator_graph: IndicatorGraph) -> None:
+        self.__mid = indicator_graph.get_series(SeriesNode.MID)
+        self.__short_ema = indicator_graph.get_ema(self.__mid, self.__short_period)
+        self.__long_ema = indicator_graph.get_ema(self.__mid, self.__long_period)
+
+    def __calculate_macd(self):
         """
-        MACD proper calculation:
+        MACD proper calculation: the EMAs of the mid are already updated by the graph.
         """
-        if self.__short_ema is None:
-            self.__short_ema = close_price
-            self.__long_ema = close_price
-        else:
-            alpha_short = 2 / (self.__short_period + 1)
-            alpha_long = 2 / (self.__long_period + 1)
-            self.__short_ema = alpha_short * close_price + (1 - alpha_short) * self.__short_ema
-            self.__long_ema = alpha_long * close_price + (1 - alpha_long) * self.__long_ema
-
-        macd_line_value = self.__short_ema - self.__long_ema
+        macd_line_value = self.__short_ema.get_value() - self.__long_ema.get_value()
         self.__macd_line.append(macd_line_value)
 
         #Resizing macd_line
@@ -58,14 +56,10 @@ class IndicatorMACD(Indicator):
 
     def incoming_quote(self, quote: Quote) -> None:
         """
-        On new quote, we get median price of the book, deriving from best_bid and best_offer
-        and we actualize MACD indicator with new value.
+        On new quote, the graph updated the EMAs of the median price of the book (deriving from best_bid and
+        best_offer) and we actualize MACD indicator with new value.
         """
-        best_bid = self._order_book.get_best_price(True)
-        best_offer = self._order_book.get_best_price(False)
-        close_price = (best_bid + best_offer) / 2  # Prix médian utilisé comme Close
-        self.prices.append(close_price)  # Stocker les prix
-        self.__calculate_macd(close_price)
+        self.__calculate_macd()
 
     def get_current_value(self) -> tuple:
         """
@@ -80,12 +74,17 @@ class IndicatorMACD(Indicator):
             self.__histogram,
         )
 
+    def write_current_value(self, destination) -> None:
+        destination[0] = self.__macd_line[-1]
+        destination[1] = self.__histogram
+
     def get_return_size(self) -> tuple:
-        return 3,
+        # (macd_line, histogram): the signal line was removed from the output.
+        return 2,
 
     def is_ready(self):
         """Check if data are available"""
-        return len(self.prices) >= max(self.__short_period, self.__long_period)
+        return self.__histogram is not None and self.__mid.get_count() >= max(self.__short_period, self.__long_period)
 
     def get_description(self) -> str:
         return self.__description
@@ -1,3 +1,4 @@
+from collections import deque
 from indicator import Indicator
 from quote import Quote
 
@@ -9,7 +10,9 @@ class IndicatorRSI(Indicator):
         self.__period = period
         self.__gains = []
         self.__losses = []
-        self.prices = []  # Ajouter une liste pour stocker les prix
+        # Derniers prix: is_ready n'a besoin que de savoir si la période est atteinte. Bornée pour que l'état
+        # (get_state) reste compact.
+        self.prices = deque(maxlen=period + 1)
         self._previous_price = None
 
     def incoming_quote(self, quote: Quote) -> None:
@@ -62,7 +65,7 @@ class IndicatorRSI(Indicator):
         return 1,
 
     def is_ready(self):
-        return len(self.prices) >= self.__period
+        return len(self.prices) >= self.__period and hasattr(self, '_avg_gain')
 
     def get_description(self) -> str:
         return self.__description
@@ -42,6 +42,9 @@ class IndicatorVAROC(Indicator):
     def get_current_value(self) -> float:
         return self.__varoc
 
+    def is_ready(self) -> bool:
+        return self.__varoc is not None
+
     def get_return_size(self) -> tuple:
         return (1,)
 
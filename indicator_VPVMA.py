@@ -2,8 +2,11 @@ from indicator import Indicator
 from quote import Quote
 import numpy as np
 from copy import deepcopy
+import recursive_kernels
 
 class IndicatorVPVMA(Indicator):
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, fast_period=12, slow_period=26, signal_period=9, bandwidth=0.1):
         super().__init__()
         self.__fast_period = fast_period
@@ -19,9 +22,11 @@ class IndicatorVPVMA(Indicator):
         #signal
         self.__bandwidthcurrent_signal = "HOLD" # par défaut
 
-        # Historique pour ESVMap et ELVMap
-        self.__esvmap_history = []
-        self.__elvmap_history = []
+        # EMAs de tout l'historique ESVMap et ELVMap, mises à jour à chaque valeur (même résultat que calculate_ema
+        # sur l'historique complet, sans le recalculer depuis le début à chaque quote)
+        self.__esvmap_history_count = 0
+        self.__esvmap_ema = None
+        self.__elvmap_ema = None
 
         # VPVMA-related values
         self.__svwma = None
@@ -50,11 +55,15 @@ class IndicatorVPVMA(Indicator):
         if len(values) < period:
             #print(f"Pas assez de données pour EMA (period: {period}, values: {len(values)}).")
             return None
+        return float(recursive_kernels.ema_series(values, period)[-1])
+
+    @staticmethod
+    def __update_ema(ema, value, period):
+        # Une étape de calculate_ema
+        if ema is None:
+            return value
         alpha = 2 / (period + 1)
-        ema = values[0]
-        for value in values[1:]:
-            ema = alpha * value + (1 - alpha) * ema
-        return ema
+        return alpha * value + (1 - alpha) * ema
 
     def calculate_signals(self):
         """
@@ -78,9 +87,7 @@ class IndicatorVPVMA(Indicator):
 
     def incoming_quote(self, quote: Quote) -> None:
         # Récupération des prix bid et offer, calcul du prix moyen et du volume
-        best_bid = self._order_book.get_best_price(True)
-        best_offer = self._order_book.get_best_price(False)
-        close_price = (best_bid + best_offer) / 2
+        close_price = self._market_state.get_mid()
         volume = quote.get_amount()
 
         # Ajout des données
@@ -102,19 +109,25 @@ class IndicatorVPVMA(Indicator):
 
         # Calcul ESVMap et ELVMap
         if self.__svwma and self.__lvwma and self.__dv:
-            self.__esvmap_history.append(self.__svwma * self.__dv)
-            self.__elvmap_history.append(self.__lvwma * self.__dv)
+            self.__esvmap_history_count += 1
+            self.__esvmap_ema = IndicatorVPVMA.__update_ema(self.__esvmap_ema, self.__svwma * self.__dv,
+                                                            self.__fast_period)
+            self.__elvmap_ema = IndicatorVPVMA.__update_ema(self.__elvmap_ema, self.__lvwma * self.__dv,
+                                                            self.__slow_period)
 
-            if len(self.__esvmap_history) >= self.__fast_period:
-                self.__esvmap = self.calculate_ema(self.__esvmap_history, self.__fast_period)
+            if self.__esvmap_history_count >= self.__fast_period:
+                self.__esvmap = self.__esvmap_ema
 
-            if len(self.__elvmap_history) >= self.__slow_period:
-                self.__elvmap = self.calculate_ema(self.__elvmap_history, self.__slow_period)
+            if self.__esvmap_history_count >= self.__slow_period:
+                self.__elvmap = self.__elvmap_ema
 
             # Calcul VPVMA et signal_line
             if self.__esvmap is not None and self.__elvmap is not None:
                 self.__vpvma = self.__esvmap - self.__elvmap
                 self.__vpvma_histogram.append(self.__vpvma)
+                # Seules les signal_period dernières valeurs sont utilisées
+                if len(self.__vpvma_histogram) > self.__signal_period:
+                    self.__vpvma_histogram.pop(0)
 
                 if len(self.__vpvma_histogram) >= self.__signal_period:
                     self.__signal_line = np.mean(self.__vpvma_histogram[-self.__signal_period:])
@@ -132,7 +145,9 @@ class IndicatorVPVMA(Indicator):
             len(self.__prices) >= max(self.__fast_period, self.__slow_period, self.__signal_period) and
             self.__svwma is not None and
             self.__lvwma is not None and
-            self.__dv is not None
+            self.__dv is not None and
+            self.__vpvma is not None and
+            self.__signal_line is not None
         )
 
     def get_signal(self) -> str:
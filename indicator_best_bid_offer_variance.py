@@ -9,6 +9,8 @@ class IndicatorBestBidOfferVariance(Indicator):
     """
     TOTAL_OBSERVATIONS = 10
 
+    BOOK_CALLS_PER_QUOTE = 1
+
     def __init__(self):
         self.__last_bid_obs = [0] * IndicatorBestBidOfferVariance.TOTAL_OBSERVATIONS
         self.__last_offer_obs = [0] * IndicatorBestBidOfferVariance.TOTAL_OBSERVATIONS
@@ -21,8 +23,12 @@ class IndicatorBestBidOfferVariance(Indicator):
     def incoming_quote(self, quote: Quote) -> None:
         # We will update only when the best price is updated.
         way = quote.get_way()
-        new_price = quote.get_price()
-        is_best_px = CommonUtilities.are_equal(new_price, self._order_book.get_best_price(way))
+        new_price_units = quote.get_price_units()
+        if new_price_units is not None:
+            # Fixed-point prices: exact comparison of the units.
+            is_best_px = new_price_units == self._market_state.get_best_price_units(way)
+        else:
+            is_best_px = CommonUtilities.are_equal(quote.get_price(), self._market_state.get_best_price(way))
         if is_best_px:
             self.__update_px_collection(way, quote.get_price())
 
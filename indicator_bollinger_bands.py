@@ -1,4 +1,5 @@
 from indicator import Indicator
+from indicator_graph import IndicatorGraph, SeriesNode
 from quote import Quote
 
 class IndicatorBollingerBands(Indicator):
@@ -10,6 +11,8 @@ class IndicatorBollingerBands(Indicator):
     these short and long SMA alongside the BB values. 
     """
 
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, periods: int = 20, multiplier: float = 2.0, bbw_short: int = 10, bbw_long: int = 50) -> None:
         """
         Initialize the Bollinger Bands indicator with BBW calculations.
@@ -21,7 +24,8 @@ class IndicatorBollingerBands(Indicator):
         self.__multiplier = multiplier
         self.__bbw_short = bbw_short
         self.__bbw_long = bbw_long
-        self.__prices = []
+        # Rolling window of the mid prices: shared node of the indicator graph (see bind_indicator_graph).
+        self.__prices = None
         self.__bbws = []
         #self.__current_bands = (None, None, None, None, None, None)  # (lower_band, moving_average, upper_band, bb width, short SMA, long SMA)
         self.__current_bands = (None, None, None, None) #Need to change definition after first tests, the unittest where for before first changes.
@@ -32,20 +36,15 @@ class IndicatorBollingerBands(Indicator):
         )
         self.__description = f"BOLL_{self.__periods}_{self.__multiplier}_BBW_{self.__bbw_short}_{self.__bbw_long}"
     
-    def incoming_quote(self, quote: Quote) -> None:
-        # Use the mid-price for the Bollinger Bands calculation
-        mid_price = (self._order_book.get_best_price(True) + self._order_book.get_best_price(False)) / 2
-        self.__prices.append(mid_price)
-
-        # Keep only the latest `periods` prices
-        if len(self.__prices) > self.__periods:
-            self.__prices.pop(0)
+    def bind_indicator_graph(self, indicator_graph: IndicatorGraph) -> None:
+        # Use the mid-price for the Bollinger Bands calculation, over the latest `periods` prices
+        self.__prices = indicator_graph.get_rolling_window(indicator_graph.get_series(SeriesNode.MID), self.__periods)
 
+    def incoming_quote(self, quote: Quote) -> None:
         # Calculate Bollinger Bands when enough data is available
-        if len(self.__prices) == self.__periods:
-            moving_average = sum(self.__prices) / self.__periods
-            variance = sum((price - moving_average) ** 2 for price in self.__prices) / self.__periods
-            std_dev = variance ** 0.5
+        if self.__prices.is_full():
+            moving_average = self.__prices.get_mean()
+            std_dev = self.__prices.get_std()
             lower_band = moving_average - self.__multiplier * std_dev
             upper_band = moving_average + self.__multiplier * std_dev
 
@@ -75,6 +74,9 @@ class IndicatorBollingerBands(Indicator):
     def get_current_value(self):
         return self.__current_bands
 
+    def is_ready(self) -> bool:
+        return self.__current_bands[0] is not None
+
     def get_return_size(self) -> tuple:
         return (4,)
 
@@ -0,0 +1,289 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from market_state import MarketState
+
+
+class GraphNode(ABC):
+    """
+    Primitive computation shared by the indicators: a series read from the market state, an EMA or a rolling window
+    of another node. A node is updated once per quote, after its sources (see IndicatorGraph.update).
+    """
+
+    def __init__(self, key: tuple) -> None:
+        self._key: tuple = key
+        # True if the last quote produced a new value.
+        self._updated: bool = False
+
+    def get_key(self) -> tuple:
+        return self._key
+
+    def is_updated(self) -> bool:
+        """
+        @return: True if the last quote produced a new value. The dependent nodes only move in that case.
+        """
+        return self._updated
+
+    @abstractmethod
+    def update(self) -> None:
+        """
+        Takes the new value of the sources into account. Called once per quote by the graph.
+        """
+        pass
+
+    @abstractmethod
+    def get_state(self) -> tuple:
+        """
+        @return: picklable values of the node, without its sources. See IndicatorGraph.get_state.
+        """
+        pass
+
+    @abstractmethod
+    def set_state(self, state: tuple) -> None:
+        """
+        Restores the values returned by get_state.
+        """
+        pass
+
+    def __repr__(self):
+        return "{}{}".format(self.__class__.__name__, self._key)
+
+
+class SeriesNode(GraphNode):
+    """
+    Series of a market state value, one observation per quote.
+    """
+
+    MID = "mid"
+    TOP_AMOUNT = "top_amount"
+
+    def __init__(self, market_state: MarketState, name: str, two_sided: bool = False) -> None:
+        """
+        @param name: MID (mid price) or TOP_AMOUNT (amount of the best bid + amount of the best offer).
+        @param two_sided: only observe the quotes when the book has both a bid and an offer.
+        """
+        super().__init__(("series", name, two_sided))
+        if name not in (SeriesNode.MID, SeriesNode.TOP_AMOUNT):
+            raise ValueError("Unknown series: {}.".format(name))
+        self.__market_state = market_state
+        self.__is_mid = name == SeriesNode.MID
+        self.__two_sided = two_sided
+        self.__value = None
+        self.__count = 0
+
+    def update(self) -> None:
+        market_state = self.__market_state
+        if self.__two_sided and not (market_state.has_bid() and market_state.has_offer()):
+            self._updated = False
+            return
+        if self.__is_mid:
+            self.__value = market_state.get_mid()
+        else:
+            self.__value = market_state.get_bid_amount() + market_state.get_offer_amount()
+        self.__count += 1
+        self._updated = True
+
+    def get_state(self) -> tuple:
+        return self._updated, self.__value, self.__count
+
+    def set_state(self, state: tuple) -> None:
+        self._updated, self.__value, self.__count = state
+
+    def get_value(self) -> float:
+        """
+        @return: last observation. None before the first one.
+        """
+        return self.__value
+
+    def get_count(self) -> int:
+        """
+        @return: count of observations so far.
+        """
+        return self.__count
+
+
+class EMANode(GraphNode):
+    """
+    Exponential moving average of a node, alpha = 2 / (period + 1), seeded with the first observation.
+    """
+
+    def __init__(self, source: SeriesNode, period: int) -> None:
+        super().__init__(("ema", source.get_key(), period))
+        self.__source = source
+        self.__alpha = 2 / (period + 1)
+        self.__value = None
+
+    def update(self) -> None:
+        self._updated = self.__source.is_updated()
+        if not self._updated:
+            return
+        observation = self.__source.get_value()
+        if self.__value is None:
+            self.__value = observation
+        else:
+            self.__value = self.__alpha * observation + (1 - self.__alpha) * self.__value
+
+    def get_state(self) -> tuple:
+        return self._updated, self.__value
+
+    def set_state(self, state: tuple) -> None:
+        self._updated, self.__value = state
+
+    def get_value(self) -> float:
+        """
+        @return: current average. None before the first observation.
+        """
+        return self.__value
+
+
+class RollingWindowNode(GraphNode):
+    """
+    Last observations of a node. The statistics (mean, standard deviation, min, max) are computed when first asked
+    during a quote, then cached until the next observation: the indicators sharing the window pay for them once.
+    """
+
+    def __init__(self, source: SeriesNode, length: int) -> None:
+        super().__init__(("window", source.get_key(), length))
+        self.__source = source
+        self.__length = length
+        self.__observations = deque(maxlen=length)
+        self.__mean = None
+        self.__std = None
+        self.__min = None
+        self.__max = None
+
+    def update(self) -> None:
+        self._updated = self.__source.is_updated()
+        if not self._updated:
+            return
+        self.__observations.append(self.__source.get_value())
+        self.__mean = None
+        self.__std = None
+        self.__min = None
+        self.__max = None
+
+    def get_state(self) -> tuple:
+        return self._updated, list(self.__observations)
+
+    def set_state(self, state: tuple) -> None:
+        self._updated = state[0]
+        self.__observations = deque(state[1], maxlen=self.__length)
+        self.__mean = None
+        self.__std = None
+        self.__min = None
+        self.__max = None
+
+    def get_length(self) -> int:
+        return self.__length
+
+    def get_count(self) -> int:
+        return len(self.__observations)
+
+    def is_full(self) -> bool:
+        return len(self.__observations) == self.__length
+
+    def get_first(self) -> float:
+        """
+        @return: oldest observation of the window.
+        """
+        return self.__observations[0]
+
+    def get_last(self) -> float:
+        return self.__observations[-1]
+
+    def get_mean(self) -> float:
+        if self.__mean is None:
+            self.__mean = sum(self.__observations) / len(self.__observations)
+        return self.__mean
+
+    def get_std(self) -> float:
+        """
+        @return: population standard deviation.
+        """
+        if self.__std is None:
+            mean = self.get_mean()
+            variance = sum((observation - mean) ** 2 for observation in self.__observations) / len(self.__observations)
+            self.__std = variance ** 0.5
+        return self.__std
+
+    def get_min(self) -> float:
+        if self.__min is None:
+            self.__min = min(self.__observations)
+        return self.__min
+
+    def get_max(self) -> float:
+        if self.__max is None:
+            self.__max = max(self.__observations)
+        return self.__max
+
+
+class IndicatorGraph:
+    """
+    Primitives of the indicators of one order book. The indicators request their nodes when they are attached to the
+    book (see Indicator.bind_indicator_graph): identical requests return the same node, so 2 indicators using the same
+    EMA or window over the same series share its computation. The order book updates all the nodes once per quote,
+    after the market state and before the indicators.
+    """
+
+    def __init__(self, market_state: MarketState) -> None:
+        self.__market_state = market_state
+        # key -> node. Insertion order is a topological order: a node is created after its sources.
+        self.__nodes = {}
+        self.__ordered_nodes: tuple = ()
+        self.__requests_count = 0
+
+    def get_series(self, name: str, two_sided: bool = False) -> SeriesNode:
+        """
+        @param name: SeriesNode.MID or SeriesNode.TOP_AMOUNT.
+        @param two_sided: only observe the quotes when the book has both a bid and an offer.
+        """
+        return self.__get_node(("series", name, two_sided), lambda: SeriesNode(self.__market_state, name, two_sided))
+
+    def get_ema(self, source: SeriesNode, period: int) -> EMANode:
+        return self.__get_node(("ema", source.get_key(), period), lambda: EMANode(source, period))
+
+    def get_rolling_window(self, source: SeriesNode, length: int) -> RollingWindowNode:
+        return self.__get_node(("window", source.get_key(), length), lambda: RollingWindowNode(source, length))
+
+    def __get_node(self, key: tuple, create) -> GraphNode:
+        self.__requests_count += 1
+        node = self.__nodes.get(key)
+        if node is None:
+            node = create()
+            self.__nodes[key] = node
+            self.__ordered_nodes = tuple(self.__nodes.values())
+        return node
+
+    def update(self) -> None:
+        """
+        Updates every node once, sources first.
+        """
+        for node in self.__ordered_nodes:
+            node.update()
+
+    def get_state(self) -> dict:
+        """
+        @return: picklable dict node key -> node values (see GraphNode.get_state).
+        """
+        return {node.get_key(): node.get_state() for node in self.__ordered_nodes}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores the values of the nodes from get_state. The graph must have been built by the same indicators.
+        """
+        missing_keys = [node.get_key() for node in self.__ordered_nodes if node.get_key() not in state]
+        if len(missing_keys) > 0:
+            raise ValueError("The state has no values for the nodes {}.".format(missing_keys))
+        for node in self.__ordered_nodes:
+            node.set_state(state[node.get_key()])
+
+    def get_nodes(self) -> tuple:
+        return self.__ordered_nodes
+
+    def get_nodes_count(self) -> int:
+        return len(self.__ordered_nodes)
+
+    def get_requests_count(self) -> int:
+        """
+        @return: count of node requests of the indicators. Requests - nodes is the count of shared computations.
+        """
+        return self.__requests_count
@@ -1,4 +1,5 @@
 from indicator import Indicator
+from indicator_graph import IndicatorGraph, SeriesNode
 from quote import Quote
 
 
@@ -12,6 +13,8 @@ class IndicatorMoneyFlowIndex(Indicator):
     these data. At the end, our result is that it tracks all lasts x (periods) volumes entering
     and getting out the book.
     """
+    BOOK_CALLS_PER_QUOTE = 6
+
     def __init__(self, periods: int = 14):
         """
         Initialize the Money Flow Index indicator with volume variation.
@@ -19,8 +22,10 @@ class IndicatorMoneyFlowIndex(Indicator):
         """
         super().__init__()
         self.__periods = periods
-        self.__prices = []  # Mid-prices for the period
-        self.__volumes = []  # Total volumes (bid + ask) for the period
+        # Mid-prices and total volumes (bid + ask) for the period, observed when both sides of the book are present:
+        # rolling windows of the indicator graph (see bind_indicator_graph).
+        self.__prices = None
+        self.__volumes = None
         self.__volume_variations = []  # Volume variations over the period
         self.__money_flows = []  # Stores raw money flows for MFI calculation
         self.__current_mfi = None
@@ -32,26 +37,18 @@ class IndicatorMoneyFlowIndex(Indicator):
         )
 
 
-    def incoming_quote(self, quote: Quote):
-        if self._order_book.get_current_snapshot(True) and self._order_book.get_current_snapshot(False):
-            # Calculate the mid-price
-            mid_price =  (self._order_book.get_best_price(True) + self._order_book.get_best_price(False))/ 2
-
-            # Calculate the total volume in the order book
-            total_volume = self._order_book.get_best_quote(True).get_amount() + self._order_book.get_best_quote(False).get_amount()
-
-            # Append mid-price and total volume to storage
-            self.__prices.append(mid_price)
-            self.__volumes.append(total_volume)
-
-            # Keep only the last `periods` values
-            if len(self.__prices) > self.__periods:
-                self.__prices.pop(0)
-                self.__volumes.pop(0)
+    def bind_indicator_graph(self, indicator_graph: IndicatorGraph) -> None:
+        self.__prices = indicator_graph.get_rolling_window(indicator_graph.get_series(SeriesNode.MID, True),
+                                                           self.__periods)
+        self.__volumes = indicator_graph.get_rolling_window(indicator_graph.get_series(SeriesNode.TOP_AMOUNT, True),
+                                                            self.__periods)
 
+    def incoming_quote(self, quote: Quote):
+        # The windows only move when both sides of the book are present
+        if self.__volumes.is_updated():
             # Calculate volume variation if we have enough data
-            if len(self.__volumes) == self.__periods:
-                volume_variation = abs(self.__volumes[-1] - self.__volumes[0])
+            if self.__volumes.is_full():
+                volume_variation = abs(self.__volumes.get_last() - self.__volumes.get_first())
                 self.__volume_variations.append(volume_variation)
 
                 # Keep only the last `periods` volume variations
@@ -59,7 +56,7 @@ class IndicatorMoneyFlowIndex(Indicator):
                     self.__volume_variations.pop(0)
 
                 # Calculate raw money flow based on mid-price and volume variation
-                raw_money_flow = ((max(self.__prices) + min(self.__prices) + self.__prices[-1])/3) * sum(self.__volume_variations)
+                raw_money_flow = ((self.__prices.get_max() + self.__prices.get_min() + self.__prices.get_last())/3) * sum(self.__volume_variations)
                 self.__money_flows.append(raw_money_flow)
 
                 # Keep only the last `periods` money flows
@@ -79,13 +76,16 @@ class IndicatorMoneyFlowIndex(Indicator):
 
                     # Avoid division by zero
                     if negative_money_flow == 0:
-                        self.current_mfi = 100.0
+                        self.__current_mfi = 100.0
                     else:
                         money_flow_ratio = positive_money_flow / negative_money_flow
-                        self.current_mfi = 100.0 - (100.0 / (1 + money_flow_ratio))
+                        self.__current_mfi = 100.0 - (100.0 / (1 + money_flow_ratio))
 
     def get_current_value(self):
-        return self.current_mfi
+        return self.__current_mfi
+
+    def is_ready(self) -> bool:
+        return self.__current_mfi is not None
 
     def get_return_size(self) -> tuple:
         return (1,)
@@ -10,12 +10,16 @@ class IndicatorMovingAverageOnAmount(Indicator):
         # Initialize the array to 0s
         self.__observations: list = [0] * self.__ma_period
         self.__next_updated_value: int = 0
+        # Count of observations received, capped to the period: the average is ready once the array is filled.
+        self.__observations_count: int = 0
         self.__doc_description = "Amount moving average {} periods".format(self.__ma_period)
         self.__description = "MA_AMT_{}".format(self.__ma_period)
 
     def incoming_quote(self, quote: Quote) -> None:
         self.__observations[self.__next_updated_value] = quote.get_amount()
         self.__next_updated_value += 1
+        if self.__observations_count < self.__ma_period:
+            self.__observations_count += 1
         # Reset when we hit the MAX
         if self.__next_updated_value == self.__ma_period:
             self.__next_updated_value = 0
@@ -23,6 +27,9 @@ class IndicatorMovingAverageOnAmount(Indicator):
     def get_current_value(self):
         return sum(self.__observations) / self.__ma_period
 
+    def is_ready(self) -> bool:
+        return self.__observations_count == self.__ma_period
+
     def get_return_size(self) -> tuple:
         # A 1-D sized tuple requires a comma after the number
         return 1,
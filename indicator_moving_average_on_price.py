@@ -5,6 +5,8 @@ from quote import Quote
 class IndicatorMovingAverageOnPrice(Indicator):
     # Creates a Moving average indicator. Filled step by step with new values.
 
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, ma_period: int):
         super().__init__()
         self.__ma_period = ma_period
@@ -12,15 +14,14 @@ class IndicatorMovingAverageOnPrice(Indicator):
         self.__description = "MA_PX_{}".format(self.__ma_period)
         self.__observations = [0.0] * ma_period
         self.__current_updated_cell = 0
+        # Count of observations received, capped to the period: the average is ready once the array is filled.
+        self.__observations_count = 0
         
     def incoming_quote(self, quote: Quote) -> None:
-        # Mid calculation:
-        best_bid = self._order_book.get_best_price(True)
-        best_offer = self._order_book.get_best_price(False)
-        mid = best_bid + best_offer
-        mid /= 2.0
-        self.__observations[self.__current_updated_cell] = mid
+        self.__observations[self.__current_updated_cell] = self._market_state.get_mid()
         self.__current_updated_cell += 1
+        if self.__observations_count < self.__ma_period:
+            self.__observations_count += 1
         if self.__current_updated_cell == self.__ma_period:
             self.__current_updated_cell = 0
 
@@ -30,6 +31,9 @@ class IndicatorMovingAverageOnPrice(Indicator):
             sum += obs
         return sum / self.__ma_period
 
+    def is_ready(self) -> bool:
+        return self.__observations_count == self.__ma_period
+
     def get_return_size(self) -> tuple:
         # A 1-D sized tuple requires a comma after the number
         return 1,
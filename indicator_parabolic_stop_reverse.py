@@ -7,6 +7,8 @@ class IndicatorSAR(Indicator):
     We record the last x (periods) prices, and look at the extreme points. When an extreme point appears,
     then we look at its amplitude to dynamically adjust the acceleration factor (Alpha/AF).
     """
+    BOOK_CALLS_PER_QUOTE = 2
+
     def __init__(self, af: float = 0.02, max_AF: float = 0.2, min_AF: float = -0.2, period: int = 100):
         """
         Initialize the SAR indicator.
@@ -34,7 +36,7 @@ class IndicatorSAR(Indicator):
         )
 
     def incoming_quote(self, quote: Quote):
-        mid_price = (self._order_book.get_best_price(True) + self._order_book.get_best_price(False)) / 2
+        mid_price = self._market_state.get_mid()
 
         # Record the mid-price and get only the last self.__period prices
         self.__price_history.append(mid_price)
@@ -89,6 +91,9 @@ class IndicatorSAR(Indicator):
     def get_current_value(self):
         return self.__current_sar
 
+    def is_ready(self) -> bool:
+        return self.__current_sar is not None
+
     def get_return_size(self) -> tuple:
         return (1,)
 
@@ -0,0 +1,113 @@
+from importlib import import_module
+
+
+class IndicatorRegistry:
+    """
+    Maps the short names of the indicators to their classes. The classes are given as (module, class name) and
+    imported on the first instantiation only: the specs (see IndicatorSpec) can be built, compared and unpickled
+    without importing the indicator modules.
+    """
+
+    # name -> (module, class name) or the class itself (see register).
+    __INDICATORS = {
+        "ADX": ("indicator_ADX", "IndicatorADX"),
+        "BB": ("indicator_bollinger_bands", "IndicatorBollingerBands"),
+        "BBO_VAR": ("indicator_best_bid_offer_variance", "IndicatorBestBidOfferVariance"),
+        "MA_AMT": ("indicator_moving_average_on_amount", "IndicatorMovingAverageOnAmount"),
+        "MA_PX": ("indicator_moving_average_on_price", "IndicatorMovingAverageOnPrice"),
+        "MACD": ("indicator_MACD", "IndicatorMACD"),
+        "MFI": ("indicator_money_flow_index", "IndicatorMoneyFlowIndex"),
+        "QTY_QUOTES": ("indicator_quantity_of_quotes_in_book", "IndicatorQuantityOfQuotesInBook"),
+        "RSI": ("indicator_RSI", "IndicatorRSI"),
+        "SAR": ("indicator_parabolic_stop_reverse", "IndicatorSAR"),
+        "VAROC": ("indicator_VAROC", "IndicatorVAROC"),
+        "VPVMA": ("indicator_VPVMA", "IndicatorVPVMA"),
+    }
+
+    @staticmethod
+    def register(name: str, indicator_class) -> None:
+        """
+        Adds (or replaces) an indicator class. The workers of a process pool only know the classes registered in
+        their own process: register them at the import of a module.
+        @param name: short name used by the specs.
+        @param indicator_class: subclass of Indicator.
+        """
+        IndicatorRegistry.__INDICATORS[name] = indicator_class
+
+    @staticmethod
+    def is_registered(name: str) -> bool:
+        return name in IndicatorRegistry.__INDICATORS
+
+    @staticmethod
+    def get_names() -> tuple:
+        return tuple(sorted(IndicatorRegistry.__INDICATORS))
+
+    @staticmethod
+    def get_class(name: str):
+        """
+        @param name: short name of the indicator.
+        @return: the indicator class. Its module is imported on the first call.
+        """
+        indicator_class = IndicatorRegistry.__INDICATORS.get(name)
+        if indicator_class is None:
+            raise ValueError("Unknown indicator: {}. Registered: {}.".format(name, IndicatorRegistry.get_names()))
+        if isinstance(indicator_class, tuple):
+            module_name, class_name = indicator_class
+            indicator_class = getattr(import_module(module_name), class_name)
+            IndicatorRegistry.__INDICATORS[name] = indicator_class
+        return indicator_class
+
+    @staticmethod
+    def create_indicators(specs: tuple) -> tuple:
+        """
+        @param specs: IndicatorSpec collection.
+        @return: tuple of new indicators, one per spec, in the same order.
+        """
+        return tuple(spec.create() for spec in specs)
+
+
+class IndicatorSpec:
+    """
+    Declarative description of an indicator: its registered name and the parameters of its constructor. A spec is
+    immutable, hashable and cheap to pickle: it is what is sent to the workers, used in the cache keys and stored in
+    the metadata of the features files. The worker instantiates its own indicators with create.
+    """
+
+    __slots__ = ("__name", "__params")
+
+    def __init__(self, name: str, *params) -> None:
+        """
+        @param name: name registered in IndicatorRegistry. For example "MACD".
+        @param params: positional parameters of the indicator constructor. For example 12, 26, 9.
+        """
+        if not IndicatorRegistry.is_registered(name):
+            raise ValueError("Unknown indicator: {}. Registered: {}.".format(name, IndicatorRegistry.get_names()))
+        self.__name = name
+        self.__params = tuple(params)
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def get_params(self) -> tuple:
+        return self.__params
+
+    def get_key(self) -> tuple:
+        """
+        @return: (name, params), to use in cache keys.
+        """
+        return self.__name, self.__params
+
+    def create(self):
+        """
+        @return: a new, cold indicator.
+        """
+        return IndicatorRegistry.get_class(self.__name)(*self.__params)
+
+    def __eq__(self, other):
+        return isinstance(other, IndicatorSpec) and self.get_key() == other.get_key()
+
+    def __hash__(self):
+        return hash(self.get_key())
+
+    def __repr__(self):
+        return "{}({})".format(self.__name, ", ".join(repr(param) for param in self.__params))
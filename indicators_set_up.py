@@ -1,26 +1,14 @@
-from typing import List
-from indicator import Indicator
-from indicator_best_bid_offer_variance import IndicatorBestBidOfferVariance
-from indicator_moving_average_on_price import IndicatorMovingAverageOnPrice
-from indicator_moving_average_on_amount import IndicatorMovingAverageOnAmount
-from indicator_quantity_of_quotes_in_book import IndicatorQuantityOfQuotesInBook
-from indicator_MACD import IndicatorMACD
-from indicator_RSI import IndicatorRSI
-from indicator_bollinger_bands import IndicatorBollingerBands
-from indicator_MACD import IndicatorMACD
-from indicator_RSI import IndicatorRSI
-from indicator_parabolic_stop_reverse import IndicatorSAR
-from indicator_money_flow_index import IndicatorMoneyFlowIndex
-from indicator_VPVMA import IndicatorVPVMA
+from indicator_registry import IndicatorSpec
 
-# Chosen set of indicators
-INDICATORS: tuple = (
-                        IndicatorMACD(24, 52, 18),
-                        IndicatorMACD(12, 26, 9),
-                        IndicatorMoneyFlowIndex(14),
-                        IndicatorMoneyFlowIndex(28),
-                        IndicatorMovingAverageOnAmount(9),
-                        IndicatorBollingerBands(9, 1, 9, 18),
-                        IndicatorBollingerBands(20, 2, 10, 50),
-                        IndicatorVPVMA(12,26,9,0.1),
-                    )
+# Chosen set of indicators, as specs (see IndicatorRegistry): each file processor creates its own indicators. Importing
+# this module creates no indicator: use IndicatorRegistry.create_indicators(INDICATOR_SPECS) for instances.
+INDICATOR_SPECS: tuple = (
+                            IndicatorSpec("MACD", 24, 52, 18),
+                            IndicatorSpec("MACD", 12, 26, 9),
+                            IndicatorSpec("MFI", 14),
+                            IndicatorSpec("MFI", 28),
+                            IndicatorSpec("MA_AMT", 9),
+                            IndicatorSpec("BB", 9, 1, 9, 18),
+                            IndicatorSpec("BB", 20, 2, 10, 50),
+                            IndicatorSpec("VPVMA", 12, 26, 9, 0.1),
+                         )
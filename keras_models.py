@@ -1,8 +1,5 @@
 import keras
 from keras import Model
-from keras_tuner.tuners import RandomSearch
-from keras_tuner.tuners import BayesianOptimization
-from keras_tuner.tuners import GridSearch
 from tensorflow.data import Dataset
 
 import constants
@@ -50,17 +47,19 @@ def build_model(hp, input_vector_length, output_vector_length):
     )
     return model
 
-def get_model_prototype(input_vector_length: int, output_vector_length: int,
-                        train_dataset: Dataset, test_dataset: Dataset) -> Model:
+def create_tuner(input_vector_length: int, output_vector_length: int):
     """
-    This is a prototype model. With optimization of high level parameters using some kind of a SEARCH algo.
-     If you are creating your own neural network model, you can base it out of this model.
-    @param train_dataset: the dataset with the INPUT and OUTPUT layer and sliced by BATCH_SIZE for training the moodel
-    and searching the best model params
-    @param test_dataset: the dataset with the INPUT and OUTPUT layer for validation
+    Creates the tuner of constants.HYPERPARAMETERS_OPTIMIZATION. Also used by the worker processes of the parallel
+    search (see parallel_tuning.py): all the processes must create the same tuner.
     @param input_vector_length: the size 1xN of the input vector (Indicators array)
     @param output_vector_length: the size 1xM of the output vector. Usually equal to 1, 2 or 3 (BUY/SELL/DO NOTHING?)
+    @return: the keras_tuner tuner. None if the optimization is not implemented.
     """
+    # keras_tuner is only imported when the hyperparameters are optimized.
+    from keras_tuner.tuners import RandomSearch
+    from keras_tuner.tuners import BayesianOptimization
+    from keras_tuner.tuners import GridSearch
+    from keras_tuner.tuners import Hyperband
 
     # Build the model according to the hyperparameters
     if constants.HYPERPARAMETERS_OPTIMIZATION == EnumHyperParamsOptimization.BAYESIAN:
@@ -85,14 +84,61 @@ def get_model_prototype(input_vector_length: int, output_vector_length: int,
             max_trials=constants.TRIALS,
             directory='opt_dir_random',
             project_name='accuracy_tuning')
+
+    elif constants.HYPERPARAMETERS_OPTIMIZATION == EnumHyperParamsOptimization.HYPERBAND:
+        tuner = Hyperband(
+            lambda hp: build_model(hp, input_vector_length, output_vector_length),
+            objective='val_accuracy',  # Use 'val_accuracy' for maximizing accuracy
+            max_epochs=constants.EPOCHS_COUNT,
+            factor=constants.HYPERBAND_FACTOR,
+            hyperband_iterations=constants.HYPERBAND_ITERATIONS,
+            directory='opt_dir_hyperband',
+            project_name='accuracy_tuning')
     else:
         print("This HyperParamsOptimization is not yet implemented.")
         return None
 
+    return tuner
+
+
+def get_search_callbacks() -> list:
+    """
+    Callbacks of each trial of the search: prunes the trials whose val_loss plateaus.
+    @return: list of keras callbacks.
+    """
+    if constants.TUNER_EARLY_STOPPING_PATIENCE <= 0:
+        return []
+    return [keras.callbacks.EarlyStopping(monitor='val_loss', patience=constants.TUNER_EARLY_STOPPING_PATIENCE)]
+
+
+def get_model_prototype(input_vector_length: int, output_vector_length: int,
+                        train_dataset: Dataset, test_dataset: Dataset) -> Model:
+    """
+    This is a prototype model. With optimization of high level parameters using some kind of a SEARCH algo.
+     If you are creating your own neural network model, you can base it out of this model.
+    @param train_dataset: the dataset with the INPUT and OUTPUT layer and sliced by BATCH_SIZE for training the moodel
+    and searching the best model params
+    @param test_dataset: the dataset with the INPUT and OUTPUT layer for validation
+    @param input_vector_length: the size 1xN of the input vector (Indicators array)
+    @param output_vector_length: the size 1xM of the output vector. Usually equal to 1, 2 or 3 (BUY/SELL/DO NOTHING?)
+    """
+    if constants.TUNER_WORKERS > 1:
+        # Trials run concurrently in local worker processes.
+        import parallel_tuning
+        best_model = parallel_tuning.search_best_model(input_vector_length, output_vector_length,
+                                                       train_dataset, test_dataset)
+        best_model.summary()
+        return best_model
+
+    tuner = create_tuner(input_vector_length, output_vector_length)
+    if tuner is None:
+        return None
+
     tuner.search_space_summary()
 
     # Perform the tuning
-    tuner.search(train_dataset, epochs=constants.EPOCHS_COUNT, validation_data=(test_dataset,))
+    tuner.search(train_dataset, epochs=constants.EPOCHS_COUNT, validation_data=(test_dataset,),
+                 callbacks=get_search_callbacks())
 
     # Get the best model
     best_model = tuner.get_best_models(num_models=1)[0]
@@ -145,3 +191,70 @@ def get_model_prototype_simple(input_vector_length: int, output_vector_length: i
                   metrics=[keras.metrics.BinaryAccuracy()])
 
     return model
+
+
+def get_head_name(profit_level_index: int) -> str:
+    """
+    @return: the name of the output layer of a profit level in the multi-head models.
+    """
+    return "profit_level_{}".format(profit_level_index)
+
+
+def get_model_prototype_multi_head(input_vector_length: int, output_vector_length: int, heads_count: int) -> Model:
+    """
+    Multi-head version of get_model_prototype_simple: the same trunk of Dense layers is shared by all the profit
+    levels and each profit level has its own output layer (head). All the levels are then trained in one pass over
+    the same features. The outputs are ordered as the profit levels.
+    The heads use a sigmoid: SELL and BUY are 2 independent labels, both can be True (or False) for the same row.
+    @param input_vector_length: the size 1xN of the input vector (Indicators array)
+    @param output_vector_length: the size 1xM of the output vector of each head (SELL/BUY).
+    @param heads_count: count of profit levels.
+    @return: the compiled model, with one loss and one BinaryAccuracy per head.
+    """
+    inputs = keras.layers.Input(shape=(input_vector_length,))
+    trunk = inputs
+    for layer_index in range(3):
+        trunk = keras.layers.Dense(57, activation='relu', name="layer{}".format(layer_index + 1),
+                                   kernel_regularizer=keras.regularizers.l2(0.01))(trunk)
+    outputs = [keras.layers.Dense(output_vector_length, activation="sigmoid", name=get_head_name(head_index))(trunk)
+               for head_index in range(heads_count)]
+    model = keras.Model(inputs=inputs, outputs=outputs)
+
+    model.compile(optimizer=keras.optimizers.SGD(learning_rate=1e-5),
+                  loss=[keras.losses.BinaryCrossentropy() for _ in range(heads_count)],
+                  metrics=[[keras.metrics.BinaryAccuracy()] for _ in range(heads_count)])
+
+    return model
+
+
+def get_model_prototype_sequence(window_length: int, input_vector_length: int, output_vector_length: int,
+                                 sequence_model: str = "lstm") -> Model:
+    """
+    Sequence version of get_model_prototype_simple: the input is the window of the last feature rows (see
+    SlidingWindowDataset), read by an LSTM or by 1-D convolutions, then by the same Dense layers.
+    @param window_length: count K of feature rows of a window.
+    @param input_vector_length: the size 1xN of each feature row (Indicators array)
+    @param output_vector_length: the size 1xM of the output vector (SELL/BUY).
+    @param sequence_model: "lstm" or "conv1d".
+    @return: the compiled model.
+    """
+    layers = [keras.layers.Input(shape=(window_length, input_vector_length))]
+    if sequence_model == "lstm":
+        layers.append(keras.layers.LSTM(32, name="sequence_layer"))
+    elif sequence_model == "conv1d":
+        layers += [keras.layers.Conv1D(32, kernel_size=min(3, window_length), activation='relu', padding='causal',
+                                       name="sequence_layer"),
+                   keras.layers.GlobalAveragePooling1D(name="sequence_pooling")]
+    else:
+        raise ValueError("The sequence model {} is not implemented.".format(sequence_model))
+    layers += [
+        keras.layers.Dense(57, activation='relu', name="layer1", kernel_regularizer=keras.regularizers.l2(0.01)),
+        keras.layers.Dense(57, activation='relu', name="layer2", kernel_regularizer=keras.regularizers.l2(0.01)),
+        # Sigmoid: SELL and BUY are 2 independent labels (see get_model_prototype_multi_head).
+        keras.layers.Dense(output_vector_length, activation="sigmoid", name="output_layer"),
+    ]
+    model = keras.Sequential(layers)
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=1e-3),
+                  loss=keras.losses.BinaryCrossentropy(),
+                  metrics=[keras.metrics.BinaryAccuracy()])
+    return model
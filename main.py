@@ -1,21 +1,84 @@
-import calculate_features_labels
-import train_network
-import backtest_strategy
+# Command line entry point: python -m main {features,train,incremental,schedule,backtest,all,imports}
+# The stage modules are imported inside their subcommand: a features-only run never imports TensorFlow, Keras,
+# keras_tuner or imblearn.
+import argparse
+import subprocess
+import sys
+from time import perf_counter
 
-__SKIP_FEATURES_LABELS_CALCULATION = True
-__SKIP_NN_TRAIN = False
-__SKIP_BACKTEST = True
+# Subcommand -> module of the stage. Each module has a run() function, unless another function is given after ':'.
+STAGES = {
+    "features": "calculate_features_labels",
+    "train": "train_network",
+    "incremental": "train_network:run_incremental",
+    "schedule": "training_scheduler",
+    "backtest": "backtest_strategy",
+}
+# The stages of the all subcommand.
+PIPELINE = ("features", "train", "backtest")
+# The heavy dependencies reported by the imports subcommand.
+HEAVY_MODULES = ("tensorflow", "keras", "keras_tuner", "sklearn", "imblearn", "scipy")
+
+
+def run_stage(stage: str) -> None:
+    """
+    Imports the module of the stage and runs it.
+    @param stage: key of STAGES.
+    """
+    module_name, _, function_name = STAGES[stage].partition(":")
+    started = perf_counter()
+    module = __import__(module_name)
+    print("{}: imported {} in {:.2f} s.".format(stage, module_name, perf_counter() - started))
+    getattr(module, function_name or "run")()
+
+
+def measure_stage_import(stage: str) -> tuple:
+    """
+    Measures the cost of a stage for a fresh process (as a process-pool worker would pay it).
+    @param stage: key of STAGES.
+    @return: tuple (startup + import wall time in seconds, import time in seconds, loaded heavy modules)
+    """
+    code = ("import sys\nfrom time import perf_counter\nstarted = perf_counter()\nimport {}\n"
+            "print(perf_counter() - started)\nprint(','.join(m for m in {} if m in sys.modules))"
+            .format(STAGES[stage].partition(":")[0], HEAVY_MODULES))
+    started = perf_counter()
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    wall_time = perf_counter() - started
+    import_time, heavy_modules = completed.stdout.splitlines()[-2:]
+    return wall_time, float(import_time), heavy_modules
 
-if __name__ == '__main__':
 
-    if not __SKIP_FEATURES_LABELS_CALCULATION:
-        # Prepare Features and Labels
-        calculate_features_labels.run()
+def print_imports_report() -> None:
+    started = perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    print("Bare interpreter startup: {:.2f} s.".format(perf_counter() - started))
+    print("{:<10}{:>14}{:>14}  {}".format("STAGE", "STARTUP (s)", "IMPORT (s)", "HEAVY MODULES"))
+    for stage in STAGES:
+        wall_time, import_time, heavy_modules = measure_stage_import(stage)
+        print("{:<10}{:>14.2f}{:>14.2f}  {}".format(stage, wall_time, import_time, heavy_modules or "-"))
 
-    if not __SKIP_NN_TRAIN:
-        # Train network on prepared data
-        train_network.run()
 
-    if not __SKIP_BACKTEST:
-        # Backtest the trading strategy
-        backtest_strategy.run()
+def main(arguments: list = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m main",
+                                     description="Features/labels calculation, network training and backtest.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("features", help="calculate the features and labels of the raw quote files")
+    subparsers.add_parser("train", help="train the network on the stored features and labels")
+    subparsers.add_parser("incremental", help="fine-tune the most recent model on the new features and labels files")
+    subparsers.add_parser("schedule", help="train one model per job of constants.TRAINING_JOBS in parallel processes")
+    subparsers.add_parser("backtest", help="backtest the most recent model on the backtest quote files")
+    subparsers.add_parser("all", help="features, train then backtest")
+    subparsers.add_parser("imports", help="measure the startup and import time of each stage")
+    parsed = parser.parse_args(arguments)
+
+    if parsed.command == "imports":
+        print_imports_report()
+    elif parsed.command == "all":
+        for stage in PIPELINE:
+            run_stage(stage)
+    else:
+        run_stage(parsed.command)
+
+
+if __name__ == '__main__':
+    main()
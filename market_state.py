@@ -0,0 +1,150 @@
+from quote import Quote
+
+
+class MarketState:
+    """
+    Top of the book after the last quote: best bid/offer, mid, spread, amounts of the best quotes and what the quote
+    changed. The order book computes it once per quote, before the indicators are updated (see
+    OrderBook.get_market_state): the indicators read it instead of querying the book again.
+    A missing side has a 0.0 price and amount, as OrderBook.get_best_price. The object is updated in place: a
+    reference kept by an indicator always holds the current state.
+    With constants.FIXED_POINT_PRICES, the best prices are also kept in fixed-point units (see PriceScale): the
+    labels and the positions compare them as ints.
+    """
+
+    __slots__ = ("__best_bid", "__best_offer", "__bid_amount", "__offer_amount", "__has_bid", "__has_offer",
+                 "__mid", "__spread", "__bid_changed", "__offer_changed", "__mid_changed", "__best_bid_units",
+                 "__best_offer_units")
+
+    def __init__(self) -> None:
+        self.__best_bid = 0.0
+        self.__best_offer = 0.0
+        self.__bid_amount = 0.0
+        self.__offer_amount = 0.0
+        self.__has_bid = False
+        self.__has_offer = False
+        self.__mid = 0.0
+        self.__spread = 0.0
+        self.__bid_changed = False
+        self.__offer_changed = False
+        self.__mid_changed = False
+        self.__best_bid_units = 0
+        self.__best_offer_units = 0
+
+    def update(self, best_bid: Quote, best_offer: Quote) -> None:
+        """
+        Sets the state from the best quotes of the book and compares it with the previous one.
+        @param best_bid: best bid quote. None if there is no bid.
+        @param best_offer: best offer quote. None if there is no offer.
+        """
+        if best_bid is None:
+            bid_price, bid_amount, self.__best_bid_units = 0.0, 0.0, 0
+        else:
+            bid_price, bid_amount = best_bid.get_price(), best_bid.get_amount()
+            self.__best_bid_units = best_bid.get_price_units()
+        if best_offer is None:
+            offer_price, offer_amount, self.__best_offer_units = 0.0, 0.0, 0
+        else:
+            offer_price, offer_amount = best_offer.get_price(), best_offer.get_amount()
+            self.__best_offer_units = best_offer.get_price_units()
+        self.__bid_changed = bid_price != self.__best_bid or bid_amount != self.__bid_amount
+        self.__offer_changed = offer_price != self.__best_offer or offer_amount != self.__offer_amount
+        self.__best_bid = bid_price
+        self.__best_offer = offer_price
+        self.__bid_amount = bid_amount
+        self.__offer_amount = offer_amount
+        self.__has_bid = best_bid is not None
+        self.__has_offer = best_offer is not None
+        # Same formula as the indicators used: a missing side counts as 0.0.
+        mid = (bid_price + offer_price) / 2
+        self.__mid_changed = mid != self.__mid
+        self.__mid = mid
+        self.__spread = offer_price - bid_price
+
+    def get_state(self) -> tuple:
+        """
+        @return: picklable state, see set_state.
+        """
+        return (self.__best_bid, self.__best_offer, self.__bid_amount, self.__offer_amount, self.__has_bid,
+                self.__has_offer, self.__mid, self.__spread, self.__bid_changed, self.__offer_changed,
+                self.__mid_changed, self.__best_bid_units, self.__best_offer_units)
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Restores a state returned by get_state, in place.
+        """
+        (self.__best_bid, self.__best_offer, self.__bid_amount, self.__offer_amount, self.__has_bid,
+         self.__has_offer, self.__mid, self.__spread, self.__bid_changed, self.__offer_changed,
+         self.__mid_changed, self.__best_bid_units, self.__best_offer_units) = state
+
+    def get_best_bid(self) -> float:
+        return self.__best_bid
+
+    def get_best_offer(self) -> float:
+        return self.__best_offer
+
+    def get_best_bid_units(self) -> int:
+        """
+        @return: the best bid in fixed-point units (see PriceScale). 0 if there is no bid, None if the quote wasn't
+        decoded in fixed-point.
+        """
+        return self.__best_bid_units
+
+    def get_best_offer_units(self) -> int:
+        """
+        @return: the best offer in fixed-point units (see PriceScale). 0 if there is no offer, None if the quote wasn't
+        decoded in fixed-point.
+        """
+        return self.__best_offer_units
+
+    def get_best_price_units(self, way: bool) -> int:
+        """
+        @param way: True for the bid, False for the offer.
+        """
+        return self.__best_bid_units if way else self.__best_offer_units
+
+    def get_best_price(self, way: bool) -> float:
+        """
+        @param way: True for the bid, False for the offer.
+        """
+        return self.__best_bid if way else self.__best_offer
+
+    def get_bid_amount(self) -> float:
+        return self.__bid_amount
+
+    def get_offer_amount(self) -> float:
+        return self.__offer_amount
+
+    def has_bid(self) -> bool:
+        return self.__has_bid
+
+    def has_offer(self) -> bool:
+        return self.__has_offer
+
+    def get_mid(self) -> float:
+        return self.__mid
+
+    def get_spread(self) -> float:
+        """
+        @return: best offer - best bid.
+        """
+        return self.__spread
+
+    def is_bid_changed(self) -> bool:
+        """
+        @return: True if the last quote changed the price or the amount of the best bid.
+        """
+        return self.__bid_changed
+
+    def is_offer_changed(self) -> bool:
+        """
+        @return: True if the last quote changed the price or the amount of the best offer.
+        """
+        return self.__offer_changed
+
+    def is_mid_changed(self) -> bool:
+        return self.__mid_changed
+
+    def __repr__(self):
+        return "MarketState(bid={}x{}, offer={}x{})".format(self.__best_bid, self.__bid_amount, self.__best_offer,
+                                                           self.__offer_amount)
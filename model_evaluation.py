@@ -0,0 +1,127 @@
+# Evaluation of the SELL/BUY predictions on whole arrays: confusion matrices, precision/recall per label and a sweep of
+# the decision thresholds, all in NumPy. The sweep sorts the probabilities of each label once, then counts the rows
+# above every threshold with a binary search: any number of thresholds for the cost of one sort.
+import numpy as np
+
+# Names of the 2 labels of a profit level, in order.
+LABEL_NAMES = ("SELL", "BUY")
+
+
+def get_confusion_matrices(expected: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """
+    Same layout as sklearn's multilabel_confusion_matrix.
+    @param expected: (rows, labels) 0/1 or bool.
+    @param predicted: (rows, labels) 0/1 or bool.
+    @return: int64 array (labels, 2, 2): [[true negatives, false positives], [false negatives, true positives]].
+    """
+    expected = np.asarray(expected, dtype=bool)
+    predicted = np.asarray(predicted, dtype=bool)
+    true_positives = np.count_nonzero(expected & predicted, axis=0)
+    false_positives = np.count_nonzero(~expected & predicted, axis=0)
+    false_negatives = np.count_nonzero(expected & ~predicted, axis=0)
+    true_negatives = len(expected) - true_positives - false_positives - false_negatives
+    return np.stack([np.stack([true_negatives, false_positives], axis=-1),
+                     np.stack([false_negatives, true_positives], axis=-1)], axis=1).astype(np.int64)
+
+
+def get_metrics_from_confusion_matrices(confusion_matrices: np.ndarray) -> dict:
+    """
+    @param confusion_matrices: (labels, 2, 2), see get_confusion_matrices.
+    @return: dict label name -> dict "precision", "recall", "f1-score", "support" (as sklearn's classification
+    report, 0.0 when undefined), plus "accuracy" (of each label, averaged).
+    """
+    confusion_matrices = np.asarray(confusion_matrices, dtype=np.float64)
+    true_negatives, false_positives = confusion_matrices[:, 0, 0], confusion_matrices[:, 0, 1]
+    false_negatives, true_positives = confusion_matrices[:, 1, 0], confusion_matrices[:, 1, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.nan_to_num(true_positives / (true_positives + false_positives))
+        recall = np.nan_to_num(true_positives / (true_positives + false_negatives))
+        f1_score = np.nan_to_num(2 * precision * recall / (precision + recall))
+    rows_count = confusion_matrices[0].sum()
+    metrics = {"accuracy": float(np.mean((true_positives + true_negatives) / rows_count)) if rows_count > 0 else 0.0}
+    for label_index in range(len(confusion_matrices)):
+        name = LABEL_NAMES[label_index] if label_index < len(LABEL_NAMES) else str(label_index)
+        metrics[name] = {"precision": float(precision[label_index]), "recall": float(recall[label_index]),
+                         "f1-score": float(f1_score[label_index]),
+                         "support": int(true_positives[label_index] + false_negatives[label_index])}
+    return metrics
+
+
+def sweep_thresholds(expected: np.ndarray, probabilities: np.ndarray, thresholds) -> dict:
+    """
+    Confusion matrices of all the decision thresholds in one pass: a label is predicted when its probability is
+    strictly above the threshold (as the backtest does with 0.5).
+    @param expected: (rows, labels) 0/1 or bool.
+    @param probabilities: (rows, labels) predicted probabilities.
+    @param thresholds: iterable of floats.
+    @return: dict threshold -> confusion matrices (labels, 2, 2).
+    """
+    expected = np.asarray(expected, dtype=bool)
+    probabilities = np.asarray(probabilities)
+    thresholds = np.asarray(list(thresholds), dtype=np.float64)
+    labels_count = expected.shape[1]
+    confusion_matrices = np.zeros((len(thresholds), labels_count, 2, 2), dtype=np.int64)
+    for label_index in range(labels_count):
+        label_expected = expected[:, label_index]
+        positives = np.sort(probabilities[label_expected, label_index])
+        negatives = np.sort(probabilities[~label_expected, label_index])
+        # Count of the rows strictly above each threshold.
+        true_positives = len(positives) - np.searchsorted(positives, thresholds, side='right')
+        false_positives = len(negatives) - np.searchsorted(negatives, thresholds, side='right')
+        confusion_matrices[:, label_index, 0, 0] = len(negatives) - false_positives
+        confusion_matrices[:, label_index, 0, 1] = false_positives
+        confusion_matrices[:, label_index, 1, 0] = len(positives) - true_positives
+        confusion_matrices[:, label_index, 1, 1] = true_positives
+    return {float(threshold): confusion_matrices[threshold_index]
+            for threshold_index, threshold in enumerate(thresholds)}
+
+
+def evaluate(expected: np.ndarray, probabilities: np.ndarray, thresholds=(0.5,), threshold: float = 0.5) -> dict:
+    """
+    @param expected: (rows, labels) 0/1 or bool.
+    @param probabilities: (rows, labels) predicted probabilities.
+    @param thresholds: the swept decision thresholds.
+    @param threshold: the decision threshold of the main metrics.
+    @return: dict with the "confusion_matrix" (as lists) and the metrics (see get_metrics_from_confusion_matrices) of
+    the threshold, plus "thresholds": dict threshold -> metrics of each swept threshold.
+    """
+    swept = sweep_thresholds(expected, probabilities, sorted(set(thresholds) | {threshold}))
+    result = get_metrics_from_confusion_matrices(swept[float(threshold)])
+    result["confusion_matrix"] = swept[float(threshold)].tolist()
+    result["thresholds"] = {swept_threshold: get_metrics_from_confusion_matrices(confusion_matrices)
+                            for swept_threshold, confusion_matrices in swept.items()
+                            if swept_threshold in thresholds}
+    return result
+
+
+def format_metrics(metrics: dict) -> str:
+    """
+    @param metrics: see evaluate.
+    @return: printable table of the metrics per label, then one line per swept threshold.
+    """
+    lines = ["{:>10}{:>11}{:>11}{:>11}{:>11}".format("", "precision", "recall", "f1-score", "support")]
+    label_names = [name for name in metrics if isinstance(metrics[name], dict) and "support" in metrics[name]]
+    for name in label_names:
+        lines.append("{:>10}{:>11.2f}{:>11.2f}{:>11.2f}{:>11}".format(
+            name, metrics[name]["precision"], metrics[name]["recall"], metrics[name]["f1-score"],
+            metrics[name]["support"]))
+    lines.append("{:>10}{:>11.2f}".format("accuracy", metrics["accuracy"]))
+    for swept_threshold, threshold_metrics in metrics.get("thresholds", {}).items():
+        lines.append("threshold {:.2f}: accuracy {:.3f}; ".format(swept_threshold, threshold_metrics["accuracy"]) +
+                     "; ".join("{} precision {:.3f} recall {:.3f}".format(
+                         name, threshold_metrics[name]["precision"], threshold_metrics[name]["recall"])
+                         for name in label_names))
+    return "\n".join(lines)
+
+
+def get_binary_crossentropy(expected: np.ndarray, probabilities: np.ndarray) -> float:
+    """
+    Mean binary cross-entropy, as keras.losses.BinaryCrossentropy (without the regularization penalties of the model).
+    @param expected: (rows, labels) 0/1 or bool.
+    @param probabilities: (rows, labels) predicted probabilities.
+    """
+    # Same clipping as Keras.
+    epsilon = 1e-7
+    probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), epsilon, 1.0 - epsilon)
+    expected = np.asarray(expected, dtype=np.float64)
+    return float(-np.mean(expected * np.log(probabilities) + (1.0 - expected) * np.log(1.0 - probabilities)))
@@ -0,0 +1,195 @@
+import numpy as np
+
+
+class NumpyInferenceModel:
+    """
+    Forward pass of a trained Sequential stack of Dense layers in pure NumPy: no TensorFlow import at inference time.
+    Export the Keras model once with export_keras_model (weights and activations in a compact .npz file), then
+    load it with load. Single rows go through predict_row (a few small dot products), batches through predict
+    (one matrix product per layer).
+    Supported layers: Dense (with the activations of the ACTIVATIONS dict) and Dropout (identity at inference).
+    Multi-head models (one output layer per profit level on a shared trunk) are queried head by head.
+    """
+
+    MODEL_FILE_EXTENSION = ".npz"
+
+    __SELU_ALPHA = 1.6732632423543772
+    __SELU_SCALE = 1.0507009873554805
+    # Keras 3 default negative slope.
+    __LEAKY_RELU_SLOPE = 0.2
+
+    @staticmethod
+    def __softmax(values: np.ndarray) -> np.ndarray:
+        exponents = np.exp(values - np.max(values, axis=-1, keepdims=True))
+        return exponents / np.sum(exponents, axis=-1, keepdims=True)
+
+    @staticmethod
+    def __elu(values: np.ndarray) -> np.ndarray:
+        return np.where(values > 0, values, np.expm1(np.minimum(values, 0)))
+
+    @staticmethod
+    def __selu(values: np.ndarray) -> np.ndarray:
+        return NumpyInferenceModel.__SELU_SCALE * np.where(
+            values > 0, values, NumpyInferenceModel.__SELU_ALPHA * np.expm1(np.minimum(values, 0)))
+
+    # Activation name (as in the Keras layer config) -> function of an array.
+    ACTIVATIONS = {
+        "linear": lambda values: values,
+        "relu": lambda values: np.maximum(values, 0),
+        "leaky_relu": lambda values: np.where(values > 0, values, NumpyInferenceModel.__LEAKY_RELU_SLOPE * values),
+        # Same as 1 / (1 + exp(-x)) without the overflow of exp.
+        "sigmoid": lambda values: 0.5 * (1 + np.tanh(0.5 * values)),
+        "tanh": np.tanh,
+        "elu": __elu,
+        "selu": __selu,
+        "softmax": __softmax,
+    }
+
+    def __init__(self, layers: list, heads: list = None):
+        """
+        @param layers: list of tuples (kernel (inputs, units), bias (units,), activation name), from the input to the
+        output layer. With heads, these are the layers of the shared trunk.
+        @param heads: multi-head models only: one output layer (tuple as in layers) per head, all fed by the last
+        layer of the trunk.
+        """
+        if heads is None:
+            if len(layers) == 0:
+                raise ValueError("Please input at least one layer.")
+            layers, heads = layers[:-1], layers[-1:]
+        if len(heads) == 0:
+            raise ValueError("Please input at least one head.")
+        self.__trunk = self.__compile_layers(layers, None)
+        trunk_units = self.__trunk[-1][0].shape[1] if len(self.__trunk) > 0 else None
+        self.__heads = [self.__compile_layers([head], trunk_units)[0] for head in heads]
+        if trunk_units is None and len({head[0].shape[0] for head in self.__heads}) > 1:
+            raise ValueError("The heads don't have the same inputs count.")
+
+    @staticmethod
+    def __compile_layers(layers: list, previous_units: int) -> list:
+        """
+        @return: list of tuples (float32 kernel, float32 bias, activation name, activation function).
+        """
+        compiled_layers = []
+        for kernel, bias, activation_name in layers:
+            kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+            bias = np.ascontiguousarray(bias, dtype=np.float32)
+            if activation_name not in NumpyInferenceModel.ACTIVATIONS:
+                raise ValueError("The activation {} is not supported.".format(activation_name))
+            if kernel.ndim != 2 or bias.shape != (kernel.shape[1],) \
+                    or (previous_units is not None and previous_units != kernel.shape[0]):
+                raise ValueError("The layer shapes {} and {} don't chain.".format(kernel.shape, bias.shape))
+            previous_units = kernel.shape[1]
+            compiled_layers.append((kernel, bias, activation_name, NumpyInferenceModel.ACTIVATIONS[activation_name]))
+        return compiled_layers
+
+    def get_input_length(self) -> int:
+        first_layer = self.__trunk[0] if len(self.__trunk) > 0 else self.__heads[0]
+        return first_layer[0].shape[0]
+
+    def get_output_length(self, head_index: int = 0) -> int:
+        return self.__heads[head_index][0].shape[1]
+
+    def get_heads_count(self) -> int:
+        return len(self.__heads)
+
+    def predict(self, features: np.ndarray, head_index: int = 0) -> np.ndarray:
+        """
+        Batch forward pass.
+        @param features: 2-D array (rows, input length). A 1-D row is treated as a batch of one.
+        @param head_index: the queried head (profit level) of a multi-head model.
+        @return: 2-D float32 array (rows, output length), as Keras' model.predict.
+        """
+        values = np.asarray(features, dtype=np.float32)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        for kernel, bias, activation_name, activation in self.__trunk:
+            values = activation(values @ kernel + bias)
+        kernel, bias, activation_name, activation = self.__heads[head_index]
+        return activation(values @ kernel + bias)
+
+    def predict_row(self, features_row: np.ndarray, head_index: int = 0) -> np.ndarray:
+        """
+        Forward pass of a single row.
+        @param features_row: 1-D array of the input length.
+        @param head_index: the queried head (profit level) of a multi-head model.
+        @return: 1-D float32 array of the output length.
+        """
+        values = features_row
+        for kernel, bias, activation_name, activation in self.__trunk:
+            values = activation(np.dot(values, kernel) + bias)
+        kernel, bias, activation_name, activation = self.__heads[head_index]
+        return activation(np.dot(values, kernel) + bias)
+
+    def store(self, file_name: str) -> str:
+        """
+        Stores the weights and the activations as a compressed .npz file.
+        @return: the stored file path.
+        """
+        # The single head models are stored as a plain chain of layers.
+        layers = self.__trunk + self.__heads if len(self.__heads) == 1 else self.__trunk
+        arrays = {"activations": np.array([layer[2] for layer in layers])}
+        for layer_index, layer in enumerate(layers):
+            arrays["kernel_{}".format(layer_index)] = layer[0]
+            arrays["bias_{}".format(layer_index)] = layer[1]
+        if len(self.__heads) > 1:
+            arrays["head_activations"] = np.array([head[2] for head in self.__heads])
+            for head_index, head in enumerate(self.__heads):
+                arrays["head_kernel_{}".format(head_index)] = head[0]
+                arrays["head_bias_{}".format(head_index)] = head[1]
+        with open(file_name, 'wb') as open_pointer:
+            np.savez_compressed(open_pointer, **arrays)
+        return file_name
+
+    @staticmethod
+    def load(file_name: str) -> 'NumpyInferenceModel':
+        with np.load(file_name, allow_pickle=False) as arrays:
+            layers = [(arrays["kernel_{}".format(layer_index)], arrays["bias_{}".format(layer_index)],
+                       str(activation_name))
+                      for layer_index, activation_name in enumerate(arrays["activations"])]
+            heads = None
+            if "head_activations" in arrays:
+                heads = [(arrays["head_kernel_{}".format(head_index)], arrays["head_bias_{}".format(head_index)],
+                          str(activation_name))
+                         for head_index, activation_name in enumerate(arrays["head_activations"])]
+            return NumpyInferenceModel(layers, heads)
+
+    @staticmethod
+    def from_keras_model(model) -> 'NumpyInferenceModel':
+        """
+        Extracts the Dense weights and activations of a Keras model. Keras is not imported here.
+        @param model: a built keras.Sequential model, or a multi-head model (see
+        keras_models.get_model_prototype_multi_head): a chain of Dense layers (the trunk) feeding one Dense output
+        layer per head.
+        """
+        output_names = list(model.output_names) if len(model.outputs) > 1 else None
+        trunk = []
+        heads = {}
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            if layer_type == "Dropout" or layer_type == "InputLayer":
+                continue
+            if layer_type != "Dense":
+                raise ValueError("{}: the layer type {} is not supported by the NumPy inference."
+                                 .format(layer.name, layer_type))
+            activation_name = layer.get_config()["activation"]
+            if not isinstance(activation_name, str):
+                raise ValueError("{}: only the built-in activations are supported.".format(layer.name))
+            weights = layer.get_weights()
+            kernel = weights[0]
+            bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[1], dtype=np.float32)
+            if output_names is not None and layer.name in output_names:
+                heads[layer.name] = (kernel, bias, activation_name)
+            else:
+                trunk.append((kernel, bias, activation_name))
+        if output_names is None:
+            return NumpyInferenceModel(trunk)
+        # The heads are ordered as the model outputs.
+        return NumpyInferenceModel(trunk, [heads[output_name] for output_name in output_names])
+
+    @staticmethod
+    def export_keras_model(model, file_name: str) -> str:
+        """
+        Export step: extracts the model (see from_keras_model) and stores it (see store).
+        @return: the stored file path.
+        """
+        return NumpyInferenceModel.from_keras_model(model).store(file_name)
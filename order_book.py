@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+import os
+import pickle
+from time import perf_counter_ns
 from enum_classes import EnumPair
+from indicator_graph import IndicatorGraph
+from market_state import MarketState
+from profiler import Profiler
 from quote import Quote
 import indicator
 indicator: 'indicator'
@@ -16,6 +22,15 @@ class OrderBook(ABC):
         """
         self._indicators: tuple = ()
         self._ccy_pair: EnumPair = ccy_pair
+        # Profiler used to time each indicator. None when profiling is disabled.
+        self._profiler: Profiler = None
+        self._indicators_stages: tuple = ()
+        # Top of the book, refreshed once per quote before the indicators read it.
+        self._market_state: MarketState = MarketState()
+        # Count of book queries per quote that the indicators replaced with the market state.
+        self._book_calls_saved: int = 0
+        # Primitives shared by the indicators, updated once per quote after the market state.
+        self._indicator_graph: IndicatorGraph = IndicatorGraph(self._market_state)
 
     def get_indicators(self) -> tuple:
         """
@@ -30,10 +45,125 @@ class OrderBook(ABC):
         @param indicators: list of Indicator class's objects
         """
         self._indicators = indicators
+        # New indicators, new graph: the nodes are requested again by set_order_book.
+        self._indicator_graph = IndicatorGraph(self._market_state)
         each_indicator: indicator.Indicator
         for each_indicator in self._indicators:
             each_indicator.set_order_book(self)
-            
+        self._indicators_stages = tuple(Profiler.INDICATOR_PREFIX + each_indicator.get_description()
+                                        for each_indicator in self._indicators)
+        self._book_calls_saved = sum(each_indicator.BOOK_CALLS_PER_QUOTE for each_indicator in self._indicators)
+
+    def get_indicator_graph(self) -> IndicatorGraph:
+        """
+        Returns the primitives shared by the indicators of the book.
+        @return: IndicatorGraph object
+        """
+        return self._indicator_graph
+
+    def get_market_state(self) -> MarketState:
+        """
+        Returns the top of the book after the last quote. The same object is updated in place at each quote.
+        @return: MarketState object
+        """
+        return self._market_state
+
+    def get_book_calls_saved(self) -> int:
+        """
+        Returns the count of book queries that the indicators would make per quote without the market state. Counted
+        in the profiler under Profiler.BOOK_CALLS_SAVED.
+        @return: int count per quote
+        """
+        return self._book_calls_saved
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the book and of its indicators: a run can continue from it in another book with the same
+        indicators (next daily file, resumption after a crash, another shard) without replaying the warm-up.
+        @return: picklable dict, restored with set_state.
+        """
+        each_indicator: indicator.Indicator
+        return {"ccy_pair": self._ccy_pair,
+                "book": self._get_book_state(),
+                "market_state": self._market_state.get_state(),
+                "indicator_graph": self._indicator_graph.get_state(),
+                "indicators": [each_indicator.get_state() for each_indicator in self._indicators]}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores the state returned by get_state. Call it after set_indicators, with the same indicators in the same
+        order.
+        @param state: dict from get_state.
+        """
+        if len(state["indicators"]) != len(self._indicators):
+            raise ValueError("The state has {} indicators, the book {}.".format(len(state["indicators"]),
+                                                                               len(self._indicators)))
+        self._ccy_pair = state["ccy_pair"]
+        self._set_book_state(state["book"])
+        self._market_state.set_state(state["market_state"])
+        self._indicator_graph.set_state(state["indicator_graph"])
+        each_indicator: indicator.Indicator
+        for each_indicator, indicator_state in zip(self._indicators, state["indicators"]):
+            each_indicator.set_state(indicator_state)
+
+    @staticmethod
+    def store_checkpoint(state: dict, file_path: str) -> None:
+        """
+        Stores a state (see get_state) as a pickle. The file is replaced atomically: a crash while writing keeps the
+        previous checkpoint.
+        """
+        directory = os.path.dirname(file_path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path + ".tmp", 'wb') as open_pointer:
+            pickle.dump(state, open_pointer, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file_path + ".tmp", file_path)
+
+    @staticmethod
+    def load_checkpoint(file_path: str) -> dict:
+        """
+        @return: the state stored by store_checkpoint.
+        """
+        with open(file_path, 'rb') as open_pointer:
+            return pickle.load(open_pointer)
+
+    def set_profiler(self, profiler: Profiler) -> None:
+        """
+        Times each indicator's incoming_quote in the profiler under "indicator:<description>".
+        @param profiler: Ignored if None or disabled.
+        """
+        if profiler is not None and profiler.is_enabled():
+            self._profiler = profiler
+        else:
+            self._profiler = None
+
+    def _refresh_market_state(self) -> None:
+        """
+        Updates the market state from the best quotes. Override it when the book has a cheaper access to them.
+        """
+        self._market_state.update(self.get_best_quote(True), self.get_best_quote(False))
+
+    def _update_indicators(self, quote: Quote) -> None:
+        """
+        Refreshes the market state and the indicator graph, then forwards the quote to all the indicators. To be
+        called by the implementations of incoming_quote once the book is updated.
+        """
+        self._refresh_market_state()
+        each_indicator: indicator.Indicator
+        if self._profiler is None:
+            self._indicator_graph.update()
+            for each_indicator in self._indicators:
+                each_indicator.incoming_quote(quote)
+            return
+        self._profiler.count(Profiler.BOOK_CALLS_SAVED, self._book_calls_saved)
+        started = perf_counter_ns()
+        self._indicator_graph.update()
+        self._profiler.add_time(Profiler.INDICATOR_GRAPH, perf_counter_ns() - started)
+        for each_indicator, stage in zip(self._indicators, self._indicators_stages):
+            started = perf_counter_ns()
+            each_indicator.incoming_quote(quote)
+            self._profiler.add_time(stage, perf_counter_ns() - started)
+
     def get_ccy_pair(self) -> EnumPair:
         """
         Returns the set CCY pair of the book
@@ -47,6 +177,20 @@ class OrderBook(ABC):
         """
         self._ccy_pair = pair
 
+    @abstractmethod
+    def _get_book_state(self):
+        """
+        Returns the orders of the book as picklable values. Part of get_state.
+        """
+        pass
+
+    @abstractmethod
+    def _set_book_state(self, book_state) -> None:
+        """
+        Restores the orders returned by _get_book_state.
+        """
+        pass
+
     @abstractmethod
     def incoming_quote(self, quote: Quote) -> None:
         """
@@ -27,9 +27,16 @@ class OrderBookDukascopy(OrderBook):
         else:
             self._offer = quote
         # Update indicators with new values.
-        each_indicator: indicator.Indicator
-        for each_indicator in self._indicators:
-            each_indicator.incoming_quote(quote)
+        self._update_indicators(quote)
+
+    def _get_book_state(self):
+        return self._bid, self._offer
+
+    def _set_book_state(self, book_state) -> None:
+        self._bid, self._offer = book_state
+
+    def _refresh_market_state(self) -> None:
+        self._market_state.update(self._bid, self._offer)
     
     def get_current_snapshot(self, way: bool = None) -> list:
         """
@@ -145,6 +152,7 @@ class OrderBookDukascopy(OrderBook):
         self._bid = None
         self._offer = None
         self._ccy_pair: EnumPair = EnumPair.OTHER
+        self._refresh_market_state()
 
     def retrieve_order(self, quote_id) -> tuple:
         """
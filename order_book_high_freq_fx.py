@@ -41,9 +41,21 @@ class OrderBookHighFreqFx(OrderBook):
             self._offers[quote.get_amount()] = quote
             self._offers_id[quote.get_id_ecn()] = quote
         # Update indicators with new values.
-        each_indicator: indicator.Indicator
-        for each_indicator in self._indicators:
-            each_indicator.incoming_quote(quote)
+        self._update_indicators(quote)
+
+    def _get_book_state(self):
+        return list(self._bids.values()), list(self._offers.values())
+
+    def _set_book_state(self, book_state) -> None:
+        bids, offers = book_state
+        self._bids = SortedDict((quote.get_amount(), quote) for quote in bids)
+        self._offers = SortedDict((quote.get_amount(), quote) for quote in offers)
+        self._bids_id = {quote.get_id_ecn(): quote for quote in bids}
+        self._offers_id = {quote.get_id_ecn(): quote for quote in offers}
+
+    def _refresh_market_state(self) -> None:
+        self._market_state.update(self._bids.peekitem(0)[1] if self._bids else None,
+                                  self._offers.peekitem(0)[1] if self._offers else None)
     
     def get_current_snapshot(self, way: bool = None) -> list:
         """
@@ -216,6 +228,7 @@ class OrderBookHighFreqFx(OrderBook):
         self._bids_id = {}
         self._offers_id = {}
         self._ccy_pair: EnumPair = EnumPair.OTHER
+        self._refresh_market_state()
 
     def retrieve_order(self, quote_id) -> tuple:
         """
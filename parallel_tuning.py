@@ -0,0 +1,191 @@
+# Parallel hyperparameters search: keras_tuner's chief/worker protocol on localhost.
+# The chief process holds the oracle (gRPC server). Each worker process asks the chief for the next trial, trains it
+# with its own CPU threads budget and reports the result. The training and test sets are streamed once, batch by
+# batch, into .npy files and memory-mapped by every worker: nothing is rebuilt per trial or per worker.
+import multiprocessing
+import os
+import socket
+import struct
+import tempfile
+import numpy as np
+
+import constants
+
+_LOCALHOST = "127.0.0.1"
+# Bytes of the .npy headers written by store_dataset_batches: the final header replaces a placeholder.
+_NPY_HEADER_LENGTH = 128
+# Names of the memory-mapped arrays.
+DATASET_ARRAYS = ("train_features", "train_labels", "test_features", "test_labels")
+
+
+def get_threads_budget(workers_count: int, threads_per_worker: int = 0) -> int:
+    """
+    @param workers_count: count of worker processes.
+    @param threads_per_worker: forced budget. 0 shares the CPUs between the workers.
+    @return: the CPU threads budget of each worker.
+    """
+    if threads_per_worker > 0:
+        return threads_per_worker
+    return max(1, (os.cpu_count() or 1) // workers_count)
+
+
+def limit_threads(intra_op_threads: int, inter_op_threads: int = 1) -> None:
+    """
+    Limits the CPU threads of TensorFlow (and of the OpenMP kernels) in the current process. Must be called before
+    TensorFlow runs its first operation: in a fresh worker process, before the models are imported.
+    @param intra_op_threads: threads of a single operation (matrix products...).
+    @param inter_op_threads: operations run concurrently.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_op_threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def store_dataset(directory: str, **arrays) -> dict:
+    """
+    Stores the arrays as .npy files, to be memory-mapped by the workers.
+    @param directory: destination directory.
+    @param arrays: name -> array (see DATASET_ARRAYS).
+    @return: dict name -> stored path.
+    """
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(directory, name + ".npy")
+        np.save(paths[name], np.ascontiguousarray(array, dtype=np.float32))
+    return paths
+
+
+def load_dataset(paths: dict) -> dict:
+    """
+    @param paths: dict name -> path, as returned by store_dataset.
+    @return: dict name -> read-only memory-mapped array.
+    """
+    return {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+
+
+def store_dataset_batches(directory: str, dataset, features_name: str, labels_name: str) -> dict:
+    """
+    Streams the batches of a (features, labels) tf Dataset into 2 .npy files, to be memory-mapped by the workers: only
+    one batch is held in memory at a time.
+    @param directory: destination directory.
+    @param features_name: name of the features array (see DATASET_ARRAYS).
+    @param labels_name: name of the labels array.
+    @return: dict name -> stored path.
+    """
+    paths = {features_name: os.path.join(directory, features_name + ".npy"),
+             labels_name: os.path.join(directory, labels_name + ".npy")}
+    with open(paths[features_name], 'wb') as features_pointer, open(paths[labels_name], 'wb') as labels_pointer:
+        open_pointers = (features_pointer, labels_pointer)
+        # The count of rows is only known at the end: the headers are written last.
+        for open_pointer in open_pointers:
+            open_pointer.write(b" " * _NPY_HEADER_LENGTH)
+        rows_count = 0
+        rows_shapes = [(), ()]
+        for batch in dataset.as_numpy_iterator():
+            for index, (open_pointer, array) in enumerate(zip(open_pointers, batch)):
+                array = np.ascontiguousarray(array, dtype=np.float32)
+                open_pointer.write(array.tobytes())
+                rows_shapes[index] = array.shape[1:]
+            rows_count += len(batch[0])
+        for open_pointer, rows_shape in zip(open_pointers, rows_shapes):
+            open_pointer.seek(0)
+            _write_npy_header(open_pointer, (rows_count,) + tuple(rows_shape))
+    return paths
+
+
+def _write_npy_header(open_pointer, shape: tuple) -> None:
+    """
+    Writes the header (.npy format 1.0) of a C-ordered float32 array, padded to _NPY_HEADER_LENGTH bytes.
+    """
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+        np.lib.format.dtype_to_descr(np.dtype(np.float32)), shape)
+    magic = np.lib.format.magic(1, 0)
+    # The magic string, the header length (2 bytes), the header, the padding spaces and a line feed.
+    padding = _NPY_HEADER_LENGTH - len(magic) - 2 - len(header) - 1
+    if padding < 0:
+        raise ValueError("The shape {} doesn't fit in the .npy header.".format(shape))
+    header_bytes = (header + " " * padding + "\n").encode("latin1")
+    open_pointer.write(magic + struct.pack("<H", len(header_bytes)) + header_bytes)
+
+
+def search_best_model(input_vector_length: int, output_vector_length: int, train_dataset, test_dataset):
+    """
+    Runs the search of keras_models.create_tuner in constants.TUNER_WORKERS worker processes and returns the best
+    model. The trials are spread between the workers by the chief oracle.
+    @param train_dataset: (features, labels) tf Dataset for the training.
+    @param test_dataset: (features, labels) tf Dataset for the validation.
+    @return: the best model, reloaded from the trials checkpoints.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        paths = store_dataset_batches(directory, train_dataset, "train_features", "train_labels")
+        paths.update(store_dataset_batches(directory, test_dataset, "test_features", "test_labels"))
+        run_workers(input_vector_length, output_vector_length, paths)
+
+    # The parent reloads the oracle and the trials stored by the chief and the workers.
+    import keras_models
+    tuner = keras_models.create_tuner(input_vector_length, output_vector_length)
+    return tuner.get_best_models(num_models=1)[0]
+
+
+def run_workers(input_vector_length: int, output_vector_length: int, dataset_paths: dict,
+                workers_count: int = None, threads_per_worker: int = None) -> None:
+    """
+    Starts the chief and the workers and waits for the end of the search.
+    @param dataset_paths: see store_dataset.
+    @param workers_count: by default constants.TUNER_WORKERS.
+    @param threads_per_worker: by default constants.TUNER_THREADS_PER_WORKER.
+    """
+    workers_count = constants.TUNER_WORKERS if workers_count is None else workers_count
+    threads_budget = get_threads_budget(workers_count, constants.TUNER_THREADS_PER_WORKER
+                                        if threads_per_worker is None else threads_per_worker)
+    port = _get_free_port()
+    print("Parallel search: {} workers with {} CPU threads each. Chief oracle on port {}."
+          .format(workers_count, threads_budget, port))
+    # Spawn: the workers must not inherit an initialized TensorFlow runtime.
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_run_tuner_process,
+                                 args=("chief", port, 1, input_vector_length, output_vector_length, None))]
+    for worker_index in range(workers_count):
+        processes.append(context.Process(target=_run_tuner_process,
+                                         args=("tuner{}".format(worker_index), port, threads_budget,
+                                               input_vector_length, output_vector_length, dataset_paths)))
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [process.exitcode for process in processes if process.exitcode != 0]
+    if len(failed) > 0:
+        raise RuntimeError("{} tuner processes failed with exit codes {}.".format(len(failed), failed))
+
+
+def _run_tuner_process(tuner_id: str, port: int, threads_budget: int, input_vector_length: int,
+                       output_vector_length: int, dataset_paths: dict) -> None:
+    """
+    Entry point of the chief (dataset_paths is None) and of the workers.
+    """
+    # The tuner role is set before keras_tuner is imported.
+    os.environ["KERASTUNER_TUNER_ID"] = tuner_id
+    os.environ["KERASTUNER_ORACLE_IP"] = _LOCALHOST
+    os.environ["KERASTUNER_ORACLE_PORT"] = str(port)
+    limit_threads(threads_budget)
+    import keras_models
+
+    tuner = keras_models.create_tuner(input_vector_length, output_vector_length)
+    if dataset_paths is None:
+        # The chief serves the oracle until all the trials are done.
+        tuner.search()
+        return
+    dataset = load_dataset(dataset_paths)
+    tuner.search(x=dataset["train_features"], y=dataset["train_labels"], batch_size=constants.BATCH_SIZE,
+                 epochs=constants.EPOCHS_COUNT,
+                 validation_data=(dataset["test_features"], dataset["test_labels"]),
+                 callbacks=keras_models.get_search_callbacks(), verbose=0)
+
+
+def _get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as open_socket:
+        open_socket.bind((_LOCALHOST, 0))
+        return open_socket.getsockname()[1]
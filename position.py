@@ -1,8 +1,10 @@
 import constants
+from price_scale import PriceScale
 
 
 class Position:
-    def __init__(self, is_long_position: bool, price_bid: float, price_offer: float, current_time: int):
+    def __init__(self, is_long_position: bool, price_bid: float, price_offer: float, current_time: int,
+                 price_scale: PriceScale = None):
         """Creates the Position object and initializes the starting parameters for it.
 
         Args:
@@ -10,7 +12,17 @@ class Position:
             price_bid (float): currently observed best bid on the market.
             price_offer (float): currently observer best offer on the market.
             current_time (int): currently observed time on the clock.
+            price_scale (PriceScale): None (default) for float prices. Otherwise the prices (here and in actualize)
+            are fixed-point ints of this scale: the take profit and stop loss are compared in units. The getters
+            still return float prices.
         """
+        self.__price_scale = price_scale
+        if price_scale is None:
+            self.__take_profit = constants.TAKE_PROFIT
+            self.__stop_loss = constants.STOP_LOSS
+        else:
+            self.__take_profit = price_scale.to_units(constants.TAKE_PROFIT)
+            self.__stop_loss = price_scale.to_units(constants.STOP_LOSS)
 
         self.__is_long_position = is_long_position
         if is_long_position:
@@ -43,7 +55,7 @@ class Position:
 
             duration = self.__last_price_update_time - self.__opening_time
             # Close position with condition price and time
-            if (delta_price > constants.TAKE_PROFIT or delta_price < constants.STOP_LOSS
+            if (delta_price > self.__take_profit or delta_price < self.__stop_loss
                     or duration >= constants.MAX_TIME_POSITION):
                 self.close_position(price_update_bid, price_update_offer)
 
@@ -80,11 +92,16 @@ class Position:
     def get_opening_time(self) -> int:
         return self.__opening_time
 
+    def __to_price(self, price) -> float:
+        if self.__price_scale is None:
+            return price
+        return self.__price_scale.to_price(price)
+
     def get_opening_price(self) -> float:
-        return self.__opening_price
+        return self.__to_price(self.__opening_price)
 
     def get_closing_price(self) -> float:
-        return self.__last_update_on_closing_price
+        return self.__to_price(self.__last_update_on_closing_price)
 
     def get_duration(self) -> int:
         """
@@ -106,16 +123,16 @@ class Position:
         @return: an absolute float with the amount lost. The Max DD should always be populated with a minimum of
         the initial spread.
         """
-        return self.__max_draw_down
+        return self.__to_price(self.__max_draw_down)
 
     def get_position_pnl(self) -> float:
         if self.__is_long_position:
-            return self.__last_update_on_closing_price - self.__opening_price
-        return self.__opening_price - self.__last_update_on_closing_price
+            return self.__to_price(self.__last_update_on_closing_price - self.__opening_price)
+        return self.__to_price(self.__opening_price - self.__last_update_on_closing_price)
 
     def get_calmar_ratio(self) -> float:
         if self.__max_draw_down < 0.0:
-            return self.get_position_pnl() / (-self.__max_draw_down)
+            return self.get_position_pnl() / (-self.get_max_draw_down())
         else:
             return self.get_position_pnl()
 
@@ -0,0 +1,78 @@
+import constants
+from enum_classes import EnumPair
+
+
+class PriceScale:
+    """
+    Fixed-point prices (constants.FIXED_POINT_PRICES): a price is an int count of the smallest price increment of
+    its pair (10^-decimals), for example 1.10234 EUR/USD -> 110234. The quotes are decoded once in the reader, then
+    the order books, the labels and the positions compare ints: exact equality and no rounding of the targets.
+    """
+
+    # Decimals of the pairs quoted with another precision than constants.PRICE_ROUND_PRECISION.
+    __PAIR_DECIMALS = {
+        EnumPair.EURJPY: 3,
+        EnumPair.USDJPY: 3,
+    }
+
+    def __init__(self, decimals: int) -> None:
+        """
+        @param decimals: count of decimals of the price increment.
+        """
+        if decimals < 0:
+            raise ValueError("Please input a positive count of decimals.")
+        self.__decimals = decimals
+        self.__scale = 10 ** decimals
+
+    @staticmethod
+    def for_pair(currency_pair: EnumPair):
+        """
+        @return: the PriceScale of the pair. constants.PRICE_ROUND_PRECISION decimals by default.
+        """
+        return PriceScale(PriceScale.__PAIR_DECIMALS.get(currency_pair, constants.PRICE_ROUND_PRECISION))
+
+    def get_decimals(self) -> int:
+        return self.__decimals
+
+    def get_scale(self) -> int:
+        """
+        @return: count of price units in 1.0.
+        """
+        return self.__scale
+
+    def to_units(self, price: float) -> int:
+        """
+        @return: the price rounded to the nearest unit.
+        """
+        return round(price * self.__scale)
+
+    def to_price(self, units: int) -> float:
+        """
+        @return: the float price of the units, the nearest float of the decimal price.
+        """
+        return units / self.__scale
+
+    def parse_units(self, text) -> int:
+        """
+        Decodes a decimal price without going through a float, for example b"1.10234" -> 110234.
+        @param text: str or bytes of a positive decimal number.
+        @return: the price in units. The decimals beyond the scale are rounded half up.
+        """
+        if isinstance(text, bytes):
+            text = text.decode()
+        integer_part, _, fraction = text.strip().partition(".")
+        decimals = self.__decimals
+        units = int(integer_part or "0") * self.__scale
+        if len(fraction) <= decimals:
+            return units + int(fraction.ljust(decimals, "0") or "0")
+        rounded_up = fraction[decimals] >= "5"
+        return units + int(fraction[:decimals] or "0") + rounded_up
+
+    def __eq__(self, other):
+        return isinstance(other, PriceScale) and self.__decimals == other.get_decimals()
+
+    def __hash__(self):
+        return hash(self.__decimals)
+
+    def __repr__(self):
+        return "PriceScale({})".format(self.__decimals)
@@ -1,12 +1,20 @@
 import os
 import copy
+from time import perf_counter_ns
+from itertools import compress
+import numpy as np
 import constants
 from common_utilities import CommonUtilities
 from enum_classes import EnumPair
+from feature_layout import FeatureLayout
+from feature_rows_buffer import FeatureRowsBuffer
 from feature_to_label_collection import FeatureToLabelCollection
-from indicator import Indicator
+from indicator_registry import IndicatorSpec
+from price_scale import PriceScale
+from profiler import Profiler
 from quote import Quote
 from quotes_reader import QuotesReader
+from run_configuration import RunConfiguration
 
 
 class ProcessQuotesFile:
@@ -15,111 +23,268 @@ class ProcessQuotesFile:
     of indicators that are implemented within.
     """
 
-    def __init__(self, file_name: str, profit_levels: tuple, lookback_timer: int):
+    def __init__(self, file_name: str, profit_levels: tuple, lookback_timer: int, run_configurations: tuple = None):
         """
         Constructor of the QUOTES FILE processor
         @param file_name: str. Path to file name. Absolute or relative.
         @param profit_levels: tuple containing the levels of take profit (to measure how big of a movement there was
         during some time).
+        @param run_configurations: RunConfiguration collection to compute in the same pass over the file, each one
+        with its own features-labels (see get_features_labels_per_configuration). None (default): a single
+        configuration of profit_levels, lookback_timer and constants.EACH_STEP_TIMER.
         """
         self.__profit_levels = profit_levels
         self.__file_name = file_name
         self.__file_name_short = os.path.basename(self.__file_name)
         self.__lookback_timer = lookback_timer
+        self.__run_configurations: tuple = run_configurations
         self.__features_labels = [None, None]
+        self.__features_labels_per_configuration: list = []
+        self.__targets_per_configuration: list = []
         self.__is_done = False
         self._quantity_processed = 0
+        self.__profiler: Profiler = None
+        self.__order_book_state: dict = None
 
     def get_features_labels(self) -> list:
         """
         Returns the features and labels array when the process is done.
-        @return: tuple (features, labels)
+        @return: tuple (features, labels) of the first run configuration.
         """
         if not self.__is_done:
             raise ValueError("Please calculate the Features -> labels" +
                              "before calling this method with start_process method.")
         return self.__features_labels
 
-    def start_process(self, indicators_arg: tuple, currency_pair: EnumPair) -> bool:
+    def get_features_labels_per_configuration(self) -> list:
+        """
+        Returns the features and labels of each run configuration when the process is done.
+        @return: list of [labels per profit level, features], in the order of get_run_configurations.
+        """
+        if not self.__is_done:
+            raise ValueError("Please calculate the Features -> labels" +
+                             "before calling this method with start_process method.")
+        return self.__features_labels_per_configuration
+
+    def get_targets_per_configuration(self) -> list:
+        """
+        Returns the multi-horizon labels and first touch times of each run configuration when the process is done,
+        aligned with the rows of get_features_labels_per_configuration.
+        @return: list of (horizon labels, first touch times), see FeatureToLabelCollection.get_ready_targets. Empty
+        arrays for the configurations without horizons.
+        """
+        if not self.__is_done:
+            raise ValueError("Please calculate the Features -> labels" +
+                             "before calling this method with start_process method.")
+        return self.__targets_per_configuration
+
+    def get_run_configurations(self) -> tuple:
+        """
+        @return: the RunConfiguration collection of the last start_process. None before start_process.
+        """
+        return self.__run_configurations
+
+    def get_profiler(self) -> Profiler:
+        """
+        Returns the profiler of the last start_process. Disabled unless constants.PROFILING is set.
+        @return: Profiler object. None before start_process.
+        """
+        return self.__profiler
+
+    def get_order_book_state(self) -> dict:
+        """
+        Returns the state of the order book and the indicators at the end of the file (see OrderBook.get_state): the
+        next file can continue from it.
+        @return: dict. None before start_process.
+        """
+        return self.__order_book_state
+
+    def start_process(self, indicators_arg: tuple, currency_pair: EnumPair, order_book_state: dict = None) -> bool:
         """
         Starts the transformation process
         @param currency_pair: currency pair on which we will perform calculations
-        @param indicators_arg: list of indicators for this process
+        @param indicators_arg: IndicatorSpec collection of the indicators for this process (see
+        indicators_set_up.INDICATOR_SPECS). Indicator instances are still accepted: they are deep copied.
+        @param order_book_state: state of the order book and the same indicators at the end of the previous file (see
+        get_order_book_state). None (default) starts from an empty book and cold indicators.
         @return: returns True if all done correctly. Returns False if there were errors or not enough data.
         """
         # Reset:
-        profit_levels_length = len(self.__profit_levels)
-        self.__features_labels = [[[] for i in range(profit_levels_length)], list()]
+        if self.__run_configurations is None:
+            self.__run_configurations = (RunConfiguration("default", self.__lookback_timer, constants.EACH_STEP_TIMER,
+                                                          self.__profit_levels, constants.LABEL_HORIZONS),)
+        run_configurations = self.__run_configurations
+        configurations_range = range(len(run_configurations))
+        step_timers = [configuration.get_each_step_timer() for configuration in run_configurations]
+        # Labels per profit level of each configuration.
+        # Label arrays (rows, profit levels, [SELL, BUY]) of each extraction, per configuration.
+        configurations_labels = [[] for _ in configurations_range]
+        # (horizon labels, first touch times) arrays of each extraction, per configuration.
+        configurations_targets = [[] for _ in configurations_range]
         self._quantity_processed = 0
 
-        # Create a deep copy of the indicators: we could be processing several indicators at the same time.
-        indicators: tuple = ProcessQuotesFile.deep_copy_indicators(indicators_arg)
+        # Own indicators: we could be processing several files at the same time.
+        indicators: tuple = ProcessQuotesFile.create_indicators(indicators_arg)
 
         order_book = CommonUtilities.init_globally_chosen_order_book(currency_pair)
 
         order_book.set_indicators(indicators)
+        # Warm start: no quotes to skip while the book is built.
+        is_warm_started = order_book_state is not None
+        if is_warm_started:
+            order_book.set_state(order_book_state)
+        # Top of the book, refreshed by the order book at each quote.
+        market_state = order_book.get_market_state()
+        # Fixed-point prices: the labels compare the int units decoded by the reader.
+        price_scale = PriceScale.for_pair(currency_pair) if constants.FIXED_POINT_PRICES else None
+        if price_scale is None:
+            get_best_bid, get_best_offer = market_state.get_best_bid, market_state.get_best_offer
+        else:
+            get_best_bid, get_best_offer = market_state.get_best_bid_units, market_state.get_best_offer_units
 
-        indicators_return_size = 0
-        for indicator in indicators:
-            # TO CHANGE IF YOU WILL USE N-M-x-D quotes return size! Currently supports N-1:
-            indicators_return_size += indicator.get_return_size()[0]
+        # Fixed offsets per indicator. The rows are written in place in a preallocated 2-D buffer per configuration.
+        feature_layout = FeatureLayout(indicators)
+        features_buffers = [FeatureRowsBuffer(feature_layout.get_width()) for _ in configurations_range]
+        # The collections work with the buffer row indexes: the ready rows are always a prefix of the buffer.
+        reported_rows_counts = [0 for _ in configurations_range]
+
+        # Per-stage timers. When profiling is disabled, the loop only tests the local boolean.
+        self.__profiler = Profiler(self.__file_name_short)
+        profiler = self.__profiler
+        profiling = profiler.is_enabled()
+        order_book.set_profiler(profiler)
 
         reader = QuotesReader(self.__file_name, currency_pair)
 
-        feature_label_collection = FeatureToLabelCollection(self.__lookback_timer, self.__profit_levels)
+        feature_label_collections = [FeatureToLabelCollection(configuration.get_lookback_time(),
+                                                              configuration.get_profit_levels(),
+                                                              configuration.get_horizons(),
+                                                              price_scale=price_scale)
+                                     for configuration in run_configurations]
         # This is an object that can be shared between several processes inside this class/method:
 
+        started = perf_counter_ns() if profiling else 0
         each_quote: Quote = reader.read_line()
+        if profiling:
+            profiler.add_time(Profiler.READ_PARSE, perf_counter_ns() - started)
 
-        previous_report_time = 0
+        previous_report_times = [0 for _ in configurations_range]
         # Process each quote in the file.
         while each_quote is not None:
-            order_book.incoming_quote(each_quote)
+            if profiling:
+                started = perf_counter_ns()
+                order_book.incoming_quote(each_quote)
+                profiler.add_time(Profiler.ORDER_BOOK, perf_counter_ns() - started)
+            else:
+                order_book.incoming_quote(each_quote)
             # How many quotes did we process so far
             self._quantity_processed += 1
+            quote_time = each_quote.get_local_timestamp()
+            # Feature row collected for this quote: the other configurations reporting on the same quote copy it.
+            collected_row = None
+            collected_validity_mask = 0
+
+            for index in configurations_range:
+                # Modify this condition at will!
+                # For example, you might as well use: self._is_next_step() if you want to count steps
+                # Do not report for the first 100 quotes as we are building the order book (unless warm started).
+                if (ProcessQuotesFile.is_next_step_timer(previous_report_times[index], step_timers[index], quote_time)
+                        and (is_warm_started or self._quantity_processed > 100)):
+
+                    previous_report_times[index] = quote_time
+                    # Each 10 quotes (OR AS YOUR CONDITION)
+                    # -> put one in the feature_label_collection
+                    if profiling:
+                        started = perf_counter_ns()
+                    row_index, features_row = features_buffers[index].next_row()
+                    if collected_row is None:
+                        collected_validity_mask = feature_layout.collect_indicators_values(features_row)
+                        collected_row = features_row
+                    else:
+                        features_row[:] = collected_row
+                    features_buffers[index].set_validity_mask(row_index, collected_validity_mask)
+                    if profiling:
+                        profiler.add_time(Profiler.FEATURE_COLLECTION, perf_counter_ns() - started)
+                        started = perf_counter_ns()
+                    feature_label_collections[index].put(quote_time,
+                                                         get_best_bid(),
+                                                         get_best_offer(),
+                                                         row_index)
+                    if profiling:
+                        profiler.add_time(Profiler.LABELS_PUT, perf_counter_ns() - started)
 
-            # Modify this condition at will!
-            # For example, you might as well use: self._is_next_step() if you want to count steps
-            # Do not report for the first 100 quotes as we are building the order book.
-            if (ProcessQuotesFile.is_next_step_timer(previous_report_time,
-                                                     constants.EACH_STEP_TIMER,
-                                                     each_quote.get_local_timestamp())
-                    and self._quantity_processed > 100):
-
-                previous_report_time = each_quote.get_local_timestamp()
-                # Each 10 quotes (OR AS YOUR CONDITION)
-                # -> put one in the feature_label_collection
-                collected_features: tuple = self.collect_indicators_values(indicators, indicators_return_size)
-                feature_label_collection.put(each_quote.get_local_timestamp(),
-                                             order_book.get_best_price(True),
-                                             order_book.get_best_price(False),
-                                             collected_features)
-
-            # Each step: check the profit levels of the existing reported features.
-            feature_label_collection.check_profit_levels_on_active_cells(each_quote.get_local_timestamp(),
-                                                                         order_book.get_best_price(True),
-                                                                         order_book.get_best_price(False))
+                # Each step: check the profit levels of the existing reported features.
+                if profiling:
+                    started = perf_counter_ns()
+                feature_label_collections[index].check_profit_levels_on_active_cells(quote_time,
+                                                                                     get_best_bid(),
+                                                                                     get_best_offer())
+                if profiling:
+                    profiler.add_time(Profiler.LABELS_CHECK, perf_counter_ns() - started)
 
             if self._quantity_processed % constants.FREQUENCY_OF_DATA_TRANSFERS == 0:
-                reported_cell = feature_label_collection.get_ready_calculations()
-                for level in range(min(profit_levels_length, len(reported_cell[0]))):
-                    self.__features_labels[0][level] += reported_cell[0][level]
-                self.__features_labels[1] += reported_cell[1]
+                with profiler.measure(Profiler.LABELS_EXTRACTION):
+                    for index in configurations_range:
+                        reported_rows_counts[index] += ProcessQuotesFile.__extract_ready_calculations(
+                            feature_label_collections[index], configurations_labels[index],
+                            configurations_targets[index])
                 # Report each 10000 lines
                 if constants.TRACE:
                     print("{}: processed {} quotes.".format(self.__file_name_short, self._quantity_processed))
 
-            each_quote = reader.read_line()
+            if profiling:
+                started = perf_counter_ns()
+                each_quote = reader.read_line()
+                profiler.add_time(Profiler.READ_PARSE, perf_counter_ns() - started)
+            else:
+                each_quote = reader.read_line()
 
         # Done processing: collect the data
         reader.close_reader()
-        reported_cell = feature_label_collection.get_ready_calculations()
-        for level in range(min(profit_levels_length, len(reported_cell[0]))):
-            self.__features_labels[0][level] += reported_cell[0][level]
-        self.__features_labels[1] += reported_cell[1]
+        self.__order_book_state = order_book.get_state()
+        with profiler.measure(Profiler.LABELS_EXTRACTION):
+            for index in configurations_range:
+                reported_rows_counts[index] += ProcessQuotesFile.__extract_ready_calculations(
+                    feature_label_collections[index], configurations_labels[index], configurations_targets[index])
+        # Drop the rows collected while some indicators were still warming up.
+        with profiler.measure(Profiler.WARM_UP_DROP):
+            self.__features_labels_per_configuration = [
+                ProcessQuotesFile.drop_warm_up_rows(np.concatenate(configurations_labels[index]),
+                                                    features_buffers[index].get_rows(0, reported_rows_counts[index]),
+                                                    features_buffers[index].get_validity_masks(
+                                                        0, reported_rows_counts[index]),
+                                                    feature_layout.get_full_validity_mask())
+                for index in configurations_range]
+            self.__targets_per_configuration = [
+                ProcessQuotesFile.drop_warm_up_targets(configurations_targets[index],
+                                                       features_buffers[index].get_validity_masks(
+                                                           0, reported_rows_counts[index]),
+                                                       feature_layout.get_full_validity_mask())
+                for index in configurations_range]
+        self.__features_labels = self.__features_labels_per_configuration[0]
+        profiler.count("quotes", self._quantity_processed)
+        profiler.count("run_configurations", len(run_configurations))
+        profiler.count("feature_rows", sum(len(features_buffer) for features_buffer in features_buffers))
+        profiler.count("labelled_rows", sum(reported_rows_counts))
+        profiler.count("valid_rows", sum(len(features_labels[1])
+                                         for features_labels in self.__features_labels_per_configuration))
         self.__is_done = True
         return self.__is_done
 
+    @staticmethod
+    def __extract_ready_calculations(feature_label_collection: FeatureToLabelCollection, labels: list,
+                                     targets: list) -> int:
+        """
+        Appends the ready labels of a collection to the label arrays of its configuration, and its ready targets to the
+        targets list.
+        @return: count of the extracted rows.
+        """
+        ready_labels, ready_features = feature_label_collection.get_ready_batch()
+        # The batch is a view on the collection columns: only valid until the next put.
+        labels.append(ready_labels.copy())
+        targets.append(feature_label_collection.get_ready_targets())
+        return len(ready_features)
+
     # START Step conditions section
     def _is_next_step(self) -> bool:
         """
@@ -146,6 +311,16 @@ class ProcessQuotesFile:
     # END Step conditions section
 
     # START Utility methods
+    @staticmethod
+    def create_indicators(indicators: tuple) -> tuple:
+        """
+        Creates new indicators from their specs. The indicator instances of the collection are deep copied.
+        @param indicators: collection of IndicatorSpec or Indicator.
+        @return: a tuple of new indicators, in the same order.
+        """
+        return tuple(indicator.create() if isinstance(indicator, IndicatorSpec) else copy.deepcopy(indicator)
+                     for indicator in indicators)
+
     @staticmethod
     def deep_copy_indicators(indicators: tuple) -> tuple:
         """
@@ -160,26 +335,42 @@ class ProcessQuotesFile:
         return tuple(indicators_clone)
 
     @staticmethod
-    def collect_indicators_values(indicators: tuple, indicators_return_size: int) -> tuple:
+    def drop_warm_up_rows(labels: list, features: np.ndarray, validity_masks: np.ndarray,
+                          full_validity_mask: int) -> list:
         """
-        Collects the current values of the indicators and returns a 1-D array with it.
-        If you will use N-M-x-D arrays, please reformat the method accordingly!
-        @param indicators_return_size: the size of the return for all the indicators
-        @param indicators: all the indicators that are being calculated
-        @return: list of all current observations in the indicators.
+        Drops in bulk the rows whose validity mask isn't full (some indicator was in warm-up).
+        @param labels: [labels per profit level] as collected from FeatureToLabelCollection.get_ready_calculations, or
+        bool array (rows, profit levels, [SELL, BUY]) from get_ready_batch
+        @param features: 2-D float32 array of the feature rows corresponding to the labels
+        @param validity_masks: 1-D array with the validity mask of each row (see FeatureLayout)
+        @param full_validity_mask: mask of a row where all the indicators were ready.
+        @return: [[labels per profit level], 2-D float32 features array] with only the valid rows. The features are
+        a copy: the buffer they come from can be released.
         """
-        indicator: Indicator
-        collected_features = [0.0] * indicators_return_size
-        index = 0
-        for indicator in indicators:
-            current_values = indicator.get_current_value()
-            if indicator.get_return_size()[0] == 1:
-                collected_features[index] = current_values
-                index += 1
-            else:
-                for current_value in current_values:
-                    collected_features[index] = current_value
-                    index += 1
-        return tuple(collected_features)
+        is_valid = validity_masks == np.uint64(full_validity_mask)
+        valid_features = features[is_valid]
+        if isinstance(labels, np.ndarray):
+            valid_label_rows = labels[is_valid]
+            valid_labels = [valid_label_rows[:, level].tolist() for level in range(labels.shape[1])]
+        else:
+            valid_labels = [list(compress(level_labels, is_valid)) for level_labels in labels]
+        return [valid_labels, valid_features]
+
+    @staticmethod
+    def drop_warm_up_targets(targets: list, validity_masks: np.ndarray, full_validity_mask: int) -> tuple:
+        """
+        Concatenates the targets of the extractions and drops the rows of drop_warm_up_rows.
+        @param targets: list of (horizon labels, first touch times) from FeatureToLabelCollection.get_ready_targets.
+        @param validity_masks: 1-D array with the validity mask of each row (see FeatureLayout)
+        @param full_validity_mask: mask of a row where all the indicators were ready.
+        @return: tuple (horizon labels, first touch times) of the valid rows.
+        """
+        is_valid = validity_masks == np.uint64(full_validity_mask)
+        horizon_labels = np.concatenate([each_targets[0] for each_targets in targets])
+        first_touch_times = np.concatenate([each_targets[1] for each_targets in targets])
+        if len(horizon_labels) == 0:
+            # No horizons: the arrays have no rows at all.
+            return horizon_labels, first_touch_times
+        return horizon_labels[is_valid], first_touch_times[is_valid]
 
     # END Utility methods
@@ -0,0 +1,149 @@
+import glob
+import json
+import os
+from contextlib import contextmanager
+from time import perf_counter_ns
+import constants
+
+
+class Profiler:
+    """
+    Per-stage timers and counters of one processed file. When disabled (constants.PROFILING = False) the hot loops
+    only test a local boolean: see ProcessQuotesFile.start_process and OrderBook.set_profiler.
+    The reports are plain dicts, stored as JSON (one per file) and summed across files/workers with
+    aggregate_reports. The stages are sorted by total time: the first one is the one to optimize.
+    """
+
+    # Stage names used by the pipelines.
+    READ_PARSE = "read_parse"
+    ORDER_BOOK = "order_book"
+    INDICATOR_PREFIX = "indicator:"
+    INDICATOR_GRAPH = "indicator_graph"
+    FEATURE_COLLECTION = "feature_collection"
+    LABELS_PUT = "labels_put"
+    LABELS_CHECK = "labels_check"
+    LABELS_EXTRACTION = "labels_extraction"
+    WARM_UP_DROP = "warm_up_drop"
+    NORMALIZATION = "normalization"
+    STORAGE = "storage"
+    INFERENCE = "inference"
+    POSITIONS_ACTUALIZE = "positions_actualize"
+    # Counter of the order book queries replaced by the per-quote market state (see OrderBook.get_book_calls_saved).
+    BOOK_CALLS_SAVED = "book_calls_saved"
+
+    def __init__(self, name: str, enabled: bool = None):
+        """
+        @param name: name of the report. Usually the short name of the processed file.
+        @param enabled: override of constants.PROFILING.
+        """
+        self.__name = name
+        self.__enabled = constants.PROFILING if enabled is None else enabled
+        # stage -> [total nanos, calls]
+        self.__timers = {}
+        self.__counters = {}
+        self.__created_time = perf_counter_ns()
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def add_time(self, stage: str, elapsed_nanos: int, calls: int = 1) -> None:
+        """
+        Accumulates the time spent in a stage. Call it with perf_counter_ns differences.
+        """
+        timer = self.__timers.get(stage)
+        if timer is None:
+            self.__timers[stage] = [elapsed_nanos, calls]
+        else:
+            timer[0] += elapsed_nanos
+            timer[1] += calls
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Context manager for the coarse stages (normalization, storage...). Don't use it in the per-quote loops.
+        """
+        if not self.__enabled:
+            yield
+            return
+        started = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_time(stage, perf_counter_ns() - started)
+
+    def count(self, counter: str, increment: int = 1) -> None:
+        if self.__enabled:
+            self.__counters[counter] = self.__counters.get(counter, 0) + increment
+
+    def get_report(self) -> dict:
+        """
+        @return: machine-readable report: {"name", "wall_time_ns", "stages": {stage: {"total_ns", "calls",
+        "mean_ns"}}, "counters": {counter: value}}
+        """
+        stages = {stage: {"total_ns": total_nanos, "calls": calls}
+                  for stage, (total_nanos, calls) in self.__timers.items()}
+        return Profiler.__format_report(self.__name, perf_counter_ns() - self.__created_time, stages,
+                                        dict(self.__counters))
+
+    def store_report(self, file_name: str, directory_base: str = constants.PROFILING_PATH) -> str:
+        """
+        Stores the report as JSON.
+        @return: the stored file path. None if the profiler is disabled.
+        """
+        if not self.__enabled:
+            return None
+        return Profiler.store(self.get_report(), file_name, directory_base)
+
+    @staticmethod
+    def store(report: dict, file_name: str, directory_base: str = constants.PROFILING_PATH) -> str:
+        os.makedirs(directory_base, exist_ok=True)
+        stored_full_path = os.path.join(directory_base, file_name)
+        with open(stored_full_path, 'w') as open_pointer:
+            json.dump(report, open_pointer, indent=2)
+        return stored_full_path
+
+    @staticmethod
+    def load_reports(file_name_prefix: str, directory_base: str = constants.PROFILING_PATH) -> list:
+        """
+        Loads all the per-file JSON reports whose name starts with the prefix. Aggregated reports are skipped.
+        """
+        reports = []
+        for file_name in sorted(glob.glob(file_name_prefix + "*.json", root_dir=directory_base)):
+            with open(os.path.join(directory_base, file_name), 'r') as open_pointer:
+                report = json.load(open_pointer)
+            if "reports_count" not in report:
+                reports.append(report)
+        return reports
+
+    @staticmethod
+    def aggregate_reports(reports: list, name: str = "aggregated") -> dict:
+        """
+        Sums the stages and the counters of several reports (several files and/or workers).
+        The wall time is the sum of the wall times of each report (CPU-time like when running in parallel).
+        """
+        stages = {}
+        counters = {}
+        wall_time = 0
+        for report in reports:
+            wall_time += report["wall_time_ns"]
+            for stage, timer in report["stages"].items():
+                aggregated = stages.setdefault(stage, {"total_ns": 0, "calls": 0})
+                aggregated["total_ns"] += timer["total_ns"]
+                aggregated["calls"] += timer["calls"]
+            for counter, value in report["counters"].items():
+                counters[counter] = counters.get(counter, 0) + value
+        aggregated_report = Profiler.__format_report(name, wall_time, stages, counters)
+        aggregated_report["reports_count"] = len(reports)
+        return aggregated_report
+
+    @staticmethod
+    def __format_report(name: str, wall_time: int, stages: dict, counters: dict) -> dict:
+        sorted_stages = {}
+        for stage, timer in sorted(stages.items(), key=lambda item: item[1]["total_ns"], reverse=True):
+            sorted_stages[stage] = {"total_ns": timer["total_ns"],
+                                    "calls": timer["calls"],
+                                    "mean_ns": timer["total_ns"] // timer["calls"] if timer["calls"] > 0 else 0}
+        return {"name": name, "wall_time_ns": wall_time, "stages": sorted_stages, "counters": counters}
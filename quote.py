@@ -9,9 +9,11 @@ class Quote:
 
     def __init__(self, quote_id_arg, currency1_arg, currency2_arg, local_timestamp_arg: int, ecn_timestamp_arg: int,
                  amount_arg: float = None, minqty_arg: float = None, lotsize_arg: float = None,
-                 price_arg: float = None, way_arg: str = 'B'):
+                 price_arg: float = None, way_arg: str = 'B', price_units_arg: int = None):
         """
         Initializes the instance of the Quote.
+        @param price_units_arg: the price in fixed-point units (see PriceScale), decoded by the reader when
+        constants.FIXED_POINT_PRICES is set. None otherwise.
         """
         self.__quote_internal_id = Quote.generate_next_id()
         # try converting to int it can be stored as INT
@@ -40,6 +42,7 @@ class Quote:
         self.__minimum_quantity = float(minqty_arg)
         self.__lot_size = float(lotsize_arg)
         self.__price = float(price_arg)
+        self.__price_units: int = price_units_arg
         if way_arg =='B':
             self.__order_way: bool = True
         elif way_arg =='S':
@@ -108,6 +111,12 @@ class Quote:
         print("A price equal to 0.00 was returned. Please check if this is normal.")
         return 0.00
 
+    def get_price_units(self) -> int:
+        """
+        @return: the price in fixed-point units (see PriceScale). None if the quote wasn't decoded in fixed-point.
+        """
+        return self.__price_units
+
     def get_way(self) -> bool:
         return self.__order_way
 
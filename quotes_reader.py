@@ -1,54 +1,86 @@
 import os
 import re
 from datetime import datetime, timedelta
+import numpy as np
 
 import constants
 from quote import Quote
-from common_utilities import CommonUtilities
 from enum_classes import EnumPair, EnumOrderBook
+from price_scale import PriceScale
 
 
 class QuotesReader:
+    """
+    Reads the quotes of one currency pair from a file, quote by quote.
+    HIGH_FREQ_FX files are read as raw bytes in large buffers (constants.QUOTES_READER_BUFFER_SIZE). Each line goes
+    through a fast path: the pair is checked at its fixed position after the 2nd ';' and the line is split on bytes.
+    The strict regex is only used in the audit mode (one line every constants.QUOTES_READER_AUDIT_EVERY) and by
+    deserialize_quote. Malformed lines are counted (see get_rejected_lines_count), not printed.
+    DUKASKOPY lines hold the bid and the offer: each line is decoded once into both quotes. The timestamps are decoded
+    arithmetically from the cached epoch of the current date. load_dukascopy is the vectorized path for bulk loads.
+    With constants.FIXED_POINT_PRICES, the prices are decoded once into fixed-point units of the pair (see PriceScale)
+    and the float price of the quote is derived from them.
+    """
 
     __START_OF_TIMES = datetime(1970, 1, 1)
+    # N;id;CCY/CCY;local nanos;ecn millis;amount;min qty;lot size;price;way;other
+    __HIGH_FREQ_FX_FIELDS_COUNT = 11
+    # "dd.mm.yyyy HH:MM:SS.fff" -> "yyyy-mm-ddTHH:MM:SS.fff": the characters of the ISO time, then its separators.
+    __DUKASCOPY_TO_ISO = np.array((6, 7, 8, 9, 2, 3, 4, 5, 0, 1) + tuple(range(10, 23)))
+    __DUKASCOPY_TIME_LENGTH = 23
 
-    def __init__(self, file_name: str, currency_pair_arg: EnumPair, info: bool = False) -> None:
+    def __init__(self, file_name: str, currency_pair_arg: EnumPair, info: bool = False,
+                 audit_every: int = None) -> None:
         """
         Constructor for single currency reader.
         @param file_name: file path. Absolute or relative.
         @param currency_pair_arg: ENUM pair as EnumPair object. Containing the information of CCY Pair that is being
         monitored.
         @param info: True if you want to get reading status (True by default).
-        @param debug:  true if you want to get more reading status (False by default).
+        @param audit_every: HIGH_FREQ_FX only. Validates one accepted line every audit_every lines with the strict
+        regex. 0 disables the audit. By default, constants.QUOTES_READER_AUDIT_EVERY.
         """
 
         self.__file_name = file_name
-        self.__reader = open(self.__file_name)
         self.__file_name_short = os.path.basename(self.__file_name)
         self.__is_reader_closed = False
         self.currency_pair_enum = currency_pair_arg
         self.currency_pair_str = currency_pair_arg.get_ccy_pair_with_slash()
+        self.__audit_every = constants.QUOTES_READER_AUDIT_EVERY if audit_every is None else audit_every
+        self.__lines_count = 0
+        self.__rejected_lines_count = 0
+        self.__audit_failures_count = 0
+        self.__accepted_lines_count = 0
+        self.__price_scale: PriceScale = PriceScale.for_pair(currency_pair_arg) \
+            if constants.FIXED_POINT_PRICES else None
         if constants.ORDER_BOOK_TYPE == EnumOrderBook.HIGH_FREQ_FX:
-            self.__new_pattern = r"N;[0-9-]+;" + self.currency_pair_str +\
-                                 r";[0-9]+;[0-9]+;[0-9]+.[0-9]{2};[0-9]+.[0-9]{2};[0-9]+.[0-9]{2};[0-9]+.[0-9]+;[BS];[0-9]"
+            self.__reader = open(self.__file_name, 'rb')
+            self.__lines_iterator = self.__iterate_lines()
+            # The pair field, with the next separator: checked at a fixed offset after the 2nd ';'.
+            self.__pair_field = (self.currency_pair_str + ";").encode()
+            self.__ccy_first = currency_pair_arg.get_ccy_first()
+            self.__ccy_second = currency_pair_arg.get_ccy_second()
+            self.__strict_pattern = re.compile(
+                rb"N;[0-9-]+;" + re.escape(self.currency_pair_str.encode()) +
+                rb";[0-9]+;[0-9]+;[0-9]+\.[0-9]{2};[0-9]+\.[0-9]{2};[0-9]+\.[0-9]{2};[0-9]+\.[0-9]+;[BS];[0-9]")
         elif constants.ORDER_BOOK_TYPE == EnumOrderBook.DUKASKOPY:
+            self.__reader = open(self.__file_name)
             # Skip 1st line with title head.
             self.__reader.readline()
-            self.__current_line = ""
-            # The data in the DUKASKOPY files are arranged BID+OFFER on the same line. Therefore we will alternate
-            # Bid first, then Offer. Then we read a new line.
-            self.__gets_bid = True
+            # The data in the DUKASKOPY files are arranged BID+OFFER on the same line. The line is decoded once: the
+            # Bid is returned first, the Offer is kept for the next call. Then we read a new line.
+            self.__pending_offer: Quote = None
+            # Epoch (nanos) of the date of the last decoded timestamp: the files are sorted by time.
+            self.__date_prefix = None
+            self.__date_epoch_nanos = 0
             # FORMAT: Gmt time,Ask,Bid,AskVolume,BidVolume
-            self.__new_pattern = r"[0-9]{2}.[0-9]{2}.[0-9]{4} [0-9]{2}:[0-9]{2}:[0-9]{2}.[0-9]{3},[0-9]+.[0-9]+,[0-9]+.[0-9]+[0-9]+,[0-9]+"
+            self.__strict_pattern = re.compile(
+                r"[0-9]{2}.[0-9]{2}.[0-9]{4} [0-9]{2}:[0-9]{2}:[0-9]{2}.[0-9]{3},[0-9]+.[0-9]+,[0-9]+.[0-9]+[0-9]+,[0-9]+")
         self._info = info
 
         if constants.DEBUG:
             # Force INFO when debugging.
             self._info = True
-            self.__line_by_line_reader_counter = 0
-
-        if self._info:
-            self.__line_quote_by_quote_reader_counter = 0
 
         if self._info:
             print("{}: created reader for file. Reading {} ccy pair.".format(self.__file_name_short,
@@ -62,46 +94,102 @@ class QuotesReader:
         """
         if self.__is_reader_closed:
             return None  # This is intended.
-
         if constants.ORDER_BOOK_TYPE == EnumOrderBook.HIGH_FREQ_FX:
-            line = self.__reader.readline()
-        elif constants.ORDER_BOOK_TYPE == EnumOrderBook.DUKASKOPY:
-            if self.__gets_bid:
-                # because we skip reading line when we try to get a SELL
-                self.__current_line = self.__reader.readline()
-            line = self.__current_line
-        quote = None
+            return self.__read_high_freq_fx()
+        return self.__read_dukascopy()
+
+    def __read_high_freq_fx(self) -> Quote:
+        pair_field = self.__pair_field
+        pair_field_length = len(pair_field)
         # Read the lines while you haven't met next QUOTE with necessary CCYies
-        while quote is None:
-            if constants.DEBUG:
-                self.__line_by_line_reader_counter += 1
-                if self.__line_by_line_reader_counter % constants.FREQUENCY_OF_DATA_TRANSFERS * 5 == 0:
-                    print("\r{}: read {} lines in the file".format(self.__file_name_short,
-                                                                  self.__line_by_line_reader_counter), end=' ')
+        for line in self.__lines_iterator:
+            self.__lines_count += 1
+            if constants.DEBUG and self.__lines_count % (constants.FREQUENCY_OF_DATA_TRANSFERS * 5) == 0:
+                print("\r{}: read {} lines in the file".format(self.__file_name_short, self.__lines_count), end=' ')
+            # The pair starts right after the 2nd ';'. The first field is a one-char record type.
+            pair_start = line.find(b";", 2) + 1
+            if pair_start == 0 or line[pair_start:pair_start + pair_field_length] != pair_field:
+                # Other ccy pair
+                continue
+            quote = self.__parse_high_freq_fx(line)
+            if quote is not None:
+                return quote
+        # Problem reading/end of file -> exit
+        self.__end_of_file()
+        return None  # This is intended.
+
+    def __parse_high_freq_fx(self, line: bytes) -> Quote:
+        """
+        Fast path: splits on bytes and converts the fields. The strict regex only runs on the audited lines.
+        @return: the quote. None if the line is malformed (counted as rejected).
+        """
+        fields = line.split(b";")
+        if len(fields) != QuotesReader.__HIGH_FREQ_FX_FIELDS_COUNT or fields[0] != b"N":
+            self.__rejected_lines_count += 1
+            return None
+        way = fields[9]
+        if way != b"B" and way != b"S":
+            self.__rejected_lines_count += 1
+            return None
+        self.__accepted_lines_count += 1
+        if self.__audit_every > 0 and self.__accepted_lines_count % self.__audit_every == 0 \
+                and self.__strict_pattern.match(line) is None:
+            self.__audit_failures_count += 1
+            self.__rejected_lines_count += 1
+            return None
+        try:
+            if self.__price_scale is not None:
+                price_units = self.__price_scale.parse_units(fields[8])
+                return Quote(fields[1].decode(), self.__ccy_first, self.__ccy_second, int(fields[3]),
+                             int(fields[4]), float(fields[5]), float(fields[6]), float(fields[7]),
+                             self.__price_scale.to_price(price_units), way == b"B", price_units)
+            return Quote(fields[1].decode(), self.__ccy_first, self.__ccy_second, int(fields[3]), int(fields[4]),
+                         float(fields[5]), float(fields[6]), float(fields[7]), float(fields[8]), way == b"B")
+        except ValueError:
+            self.__rejected_lines_count += 1
+            return None
+
+    def __iterate_lines(self):
+        """
+        Generator of the lines of the file (without the b"\\n"), read in large raw buffers.
+        """
+        remainder = b""
+        while True:
+            chunk = self.__reader.read(constants.QUOTES_READER_BUFFER_SIZE)
+            if not chunk:
+                break
+            lines = (remainder + chunk).split(b"\n")
+            remainder = lines.pop()
+            yield from lines
+        if remainder:
+            # Last line without a line feed.
+            yield remainder
+
+    def __read_dukascopy(self) -> Quote:
+        if self.__pending_offer is not None:
+            # The Offer of the line read by the previous call.
+            quote = self.__pending_offer
+            self.__pending_offer = None
+            return quote
+        # Read the lines while you haven't met a well-formed one
+        while True:
+            line = self.__reader.readline()
+            self.__lines_count += 1
             if not line:
-                # Problem reading/end of file -> exit
-                # Close: resource leakage
-                self.__reader.close()
-                self.__is_reader_closed = True
-                if self._info:
-                    print("\n{}: done reading file: no lines remaining in the file.".format(self.__file_name_short))
+                self.__end_of_file()
                 return None  # This is intended.
-            if constants.ORDER_BOOK_TYPE != EnumOrderBook.HIGH_FREQ_FX or self._is_has_currency(line):
-                quote = self.deserialize_quote(line)
-                if constants.ORDER_BOOK_TYPE != EnumOrderBook.HIGH_FREQ_FX:
-                    # Fetch the Offer next time if it was a Bid this time
-                    self.__gets_bid = not self.__gets_bid
-            else:
-                line = self.__reader.readline()
+            quotes = self.deserialize_dukascopy_line(line)
+            if quotes is not None:
+                self.__pending_offer = quotes[1]
+                return quotes[0]
 
-        # Found another quote.
-
-        if constants.TRACE:
-            self.__line_quote_by_quote_reader_counter += 1
-            if self.__line_quote_by_quote_reader_counter % constants.FREQUENCY_OF_DATA_TRANSFERS * 5 == 0:
-                print("{}: read {} quotes from file".format(self.__file_name_short,
-                                                            self.__line_quote_by_quote_reader_counter))
-        return quote
+    def __end_of_file(self) -> None:
+        # Close: resource leakage
+        self.close_reader()
+        if self._info:
+            print("\n{}: done reading file: {} lines read, {} rejected ({} failed the audit)."
+                  .format(self.__file_name_short, self.__lines_count, self.__rejected_lines_count,
+                          self.__audit_failures_count))
 
     def close_reader(self) -> None:
         """
@@ -110,76 +198,151 @@ class QuotesReader:
         self.__reader.close()
         self.__is_reader_closed = True
 
+    def get_lines_count(self) -> int:
+        """
+        @return: count of lines read so far (all the pairs).
+        """
+        return self.__lines_count
+
+    def get_rejected_lines_count(self) -> int:
+        """
+        @return: count of malformed lines of the monitored pair, including the ones that failed the audit.
+        """
+        return self.__rejected_lines_count
+
+    def get_audit_failures_count(self) -> int:
+        """
+        @return: count of lines accepted by the fast path that failed the strict regex of the audit mode.
+        """
+        return self.__audit_failures_count
+
     def deserialize_quote(self, quote_line: str) -> Quote:
         """
         @param deserializes the quote_line into a Quote object
-        Function that determines which quotes it is by using the regex
-        The regex allows to determine if it matches the correct pattern and is not in error
+        Strict path: the line is validated with the regex first. Malformed lines are counted as rejected.
+        @return: the quote. For a DUKASKOPY line, the side of the next quote of the reader: the Offer right after
+        read_line returned a Bid, otherwise the Bid (see deserialize_dukascopy_line for both). None if the line
+        doesn't match the pattern.
         """
-        if bool(re.match(self.__new_pattern, quote_line)):
-            if constants.ORDER_BOOK_TYPE == EnumOrderBook.HIGH_FREQ_FX:
-                line_list = CommonUtilities.split_quote_line_to_list(quote_line)[1:-1]
-            else:
-                # We will read a BID one time. then read an OFFER a second time.
-                split_line = quote_line.split(",")
-                # Convert time to number
-                utc_time = datetime.strptime(split_line[0], '%d.%m.%Y %H:%M:%S.%f')
-                milliseconds = (utc_time - QuotesReader.__START_OF_TIMES) // timedelta(milliseconds=1)
-                long_time = milliseconds * constants.NANOS_IN_ONE_MILLIS
-                px: float
-                amt: float
-                if self.__gets_bid:
-                    px = float(split_line[1])
-                    amt = float(split_line[3])
-                else:
-                    px = float(split_line[2])
-                    amt = float(split_line[4])
-                # time is in format '21.10.2024 00:00:00.161' equivalent to '%d-%m-%Y %H:%M:%S.%f'
-                line_list = [0, self.currency_pair_enum.get_ccy_first(), self.currency_pair_enum.get_ccy_second(),
-                             long_time, long_time, amt, 0.0, 0.0, px, self.__gets_bid]
-            return Quote(*line_list)
-        if constants.DEBUG:
-            print("{}: the quote line number {} couldn't be matched vs regex: {}"
-                  .format(self.__file_name_short, self.__line_by_line_reader_counter, quote_line))
+        if constants.ORDER_BOOK_TYPE == EnumOrderBook.HIGH_FREQ_FX:
+            line_bytes = quote_line.rstrip("\r\n").encode()
+            if self.__strict_pattern.match(line_bytes) is not None:
+                return self.__parse_high_freq_fx(line_bytes)
+        else:
+            quotes = self.deserialize_dukascopy_line(quote_line)
+            if quotes is None:
+                return None
+            return quotes[0] if self.__pending_offer is None else quotes[1]
+        self.__rejected_lines_count += 1
         return None
 
-    def _is_has_currency(self, quote_line: str) -> bool:
-        """
-        Checks the line for the CCY pair in the known position.
-        """
-        count_of_point_comma: int = 0
-        count_of_read_chars: int = 0
-        count_chars = len(quote_line)
-        while count_of_read_chars < count_chars:
-            if quote_line[count_of_read_chars] == ";":
-                count_of_point_comma += 1
-            if count_of_point_comma == 2:
-                # Check that we will not overflow the count of characters in this line.
-                if count_of_read_chars + 8 < count_chars:
-                    if quote_line[count_of_read_chars+1:count_of_read_chars+8] == self.currency_pair_str:
-                        # Correct ccy pair
-                        return True
-                    else:
-                        # Other ccy pair
-                        return False
-            if count_of_point_comma > 2:
-                return False
-            count_of_read_chars += 1
-        # we haven't found enough ';'
-        return False
+    def deserialize_dukascopy_line(self, quote_line: str) -> tuple:
+        """
+        Decodes a DUKASKOPY line once into its two quotes. The line is validated with the regex first.
+        @param quote_line: time is in format '21.10.2024 00:00:00.161' equivalent to '%d.%m.%Y %H:%M:%S.%f'.
+        @return: tuple (Bid quote, Offer quote). None if the line is malformed (counted as rejected).
+        """
+        if self.__strict_pattern.match(quote_line) is None:
+            self.__rejected_lines_count += 1
+            return None
+        split_line = quote_line.split(",")
+        try:
+            long_time = self.__decode_dukascopy_time(split_line[0])
+            bid_amount = float(split_line[3])
+            offer_amount = float(split_line[4])
+            if self.__price_scale is not None:
+                bid_units = self.__price_scale.parse_units(split_line[1])
+                offer_units = self.__price_scale.parse_units(split_line[2])
+                bid_px = self.__price_scale.to_price(bid_units)
+                offer_px = self.__price_scale.to_price(offer_units)
+            else:
+                bid_units = offer_units = None
+                bid_px = float(split_line[1])
+                offer_px = float(split_line[2])
+        except ValueError:
+            self.__rejected_lines_count += 1
+            return None
+        ccy_first = self.currency_pair_enum.get_ccy_first()
+        ccy_second = self.currency_pair_enum.get_ccy_second()
+        return (Quote(0, ccy_first, ccy_second, long_time, long_time, bid_amount, 0.0, 0.0, bid_px, True, bid_units),
+                Quote(0, ccy_first, ccy_second, long_time, long_time, offer_amount, 0.0, 0.0, offer_px, False,
+                      offer_units))
+
+    def __decode_dukascopy_time(self, time_field: str) -> int:
+        """
+        Same result as strptime with '%d.%m.%Y %H:%M:%S.%f' (3 digits of millis), without its per-line cost: the epoch
+        of the date is only computed when the date changes, the time of the day is computed arithmetically.
+        @return: nanos since the epoch.
+        @raise ValueError: if the date or the time is out of range.
+        """
+        date_prefix = time_field[:10]
+        if date_prefix != self.__date_prefix:
+            day_start = datetime(int(time_field[6:10]), int(time_field[3:5]), int(time_field[0:2]))
+            self.__date_epoch_nanos = (day_start - QuotesReader.__START_OF_TIMES) // timedelta(milliseconds=1) \
+                * constants.NANOS_IN_ONE_MILLIS
+            self.__date_prefix = date_prefix
+        hours = int(time_field[11:13])
+        minutes = int(time_field[14:16])
+        seconds = int(time_field[17:19])
+        if hours > 23 or minutes > 59 or seconds > 59:
+            raise ValueError("Time out of range: {}.".format(time_field))
+        milliseconds = ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(time_field[20:23])
+        return self.__date_epoch_nanos + milliseconds * constants.NANOS_IN_ONE_MILLIS
+
+    @staticmethod
+    def decode_dukascopy_times(time_fields) -> np.ndarray:
+        """
+        Vectorized decoding of DUKASKOPY timestamps: the characters are reordered into ISO times parsed by numpy.
+        @param time_fields: sequence or array of 'dd.mm.yyyy HH:MM:SS.fff' strings.
+        @return: int64 array of nanos since the epoch.
+        @raise ValueError: if a time is malformed (length, separators of the date, date or time out of range).
+        """
+        time_length = QuotesReader.__DUKASCOPY_TIME_LENGTH
+        times = np.asarray(time_fields, dtype=str)
+        # A cast to a shorter string type would silently truncate the longer times.
+        malformed = np.flatnonzero(np.char.str_len(times).reshape(-1) != time_length)
+        if len(malformed) > 0:
+            raise ValueError("{} malformed times, the first one: {!r}.".format(len(malformed),
+                                                                               times.reshape(-1)[malformed[0]]))
+        times = np.ascontiguousarray(times, dtype="U{}".format(time_length))
+        characters = times.reshape(-1).view("U1").reshape(-1, time_length)
+        # The separators replaced by the ISO ones. The others are checked by the numpy parser.
+        malformed = np.flatnonzero((characters[:, 2] != ".") | (characters[:, 5] != ".") | (characters[:, 10] != " "))
+        if len(malformed) > 0:
+            raise ValueError("{} malformed times, the first one: {!r}.".format(len(malformed),
+                                                                               times.reshape(-1)[malformed[0]]))
+        iso_characters = characters[:, QuotesReader.__DUKASCOPY_TO_ISO]
+        iso_characters[:, (4, 7)] = "-"
+        iso_characters[:, 10] = "T"
+        iso_times = np.ascontiguousarray(iso_characters).view("U{}".format(time_length)).reshape(times.shape)
+        return iso_times.astype("datetime64[ms]").astype(np.int64) * constants.NANOS_IN_ONE_MILLIS
+
+    @staticmethod
+    def load_dukascopy(file_name: str) -> tuple:
+        """
+        Bulk load of a whole DUKASKOPY file (header line then 'Gmt time,Ask,Bid,AskVolume,BidVolume' lines) into
+        columns. Unlike the reader, the lines are not validated one by one: a malformed line raises a ValueError.
+        @return: tuple (int64 nanos times, then the float64 columns in the order of the file). The reader uses the
+        first price and volume for its Bid quotes and the second ones for its Offer quotes.
+        """
+        columns = np.loadtxt(file_name, dtype=str, delimiter=",", skiprows=1, ndmin=2)
+        prices_volumes = columns[:, 1:5].astype(np.float64)
+        return (QuotesReader.decode_dukascopy_times(columns[:, 0]),) + tuple(prices_volumes.T)
+
+    def _is_has_currency(self, quote_line: bytes) -> bool:
+        """
+        Checks the line for the CCY pair in the known position: right after the 2nd ';'.
+        """
+        pair_start = quote_line.find(b";", 2) + 1
+        return pair_start > 0 and quote_line[pair_start:pair_start + len(self.__pair_field)] == self.__pair_field
 
     def __count_instances_of_ccy_pair(self) -> int:
         """
         Counts the number of CCY pair occurrences in the file
         """
         total_found = 0
-        reader = open(self.__file_name)
-        line = reader.readline()
-
-        while line:
-            if self._is_has_currency(line):
-                total_found += 1
-            line = reader.readline()
-
-        reader.close()
+        with open(self.__file_name, 'rb') as reader:
+            for line in reader:
+                if self._is_has_currency(line):
+                    total_found += 1
         return total_found
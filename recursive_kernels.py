@@ -0,0 +1,164 @@
+# Batch kernels of the sequential recursions of the indicators (EMA, Wilder smoothing, parabolic SAR) over whole
+# NumPy series: each output depends on the previous one, so they can't be vectorized with plain NumPy. They are
+# compiled with Numba when it is installed (and constants.NUMBA_KERNELS is True), otherwise they run as plain Python.
+# Both run the same operations in the same order as the per-quote indicators: the values are the same.
+import numpy as np
+
+import constants
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _jit(function):
+    if NUMBA_AVAILABLE and constants.NUMBA_KERNELS:
+        return njit(cache=True, nogil=True)(function)
+    return function
+
+
+def get_backend() -> str:
+    """
+    @return: "numba" if the kernels are compiled, "python" otherwise.
+    """
+    return "numba" if NUMBA_AVAILABLE and constants.NUMBA_KERNELS else "python"
+
+
+@_jit
+def _ema_kernel(values, alpha, result):
+    ema = values[0]
+    result[0] = ema
+    for index in range(1, len(values)):
+        ema = alpha * values[index] + (1 - alpha) * ema
+        result[index] = ema
+
+
+@_jit
+def _wilder_average_kernel(values, period, result):
+    total = 0.0
+    for index in range(period):
+        total += values[index]
+    average = total / period
+    result[period - 1] = average
+    for index in range(period, len(values)):
+        average = (average * (period - 1) + values[index]) / period
+        result[index] = average
+
+
+@_jit
+def _wilder_sum_kernel(values, period, result):
+    smoothed = 0.0
+    for index in range(period):
+        smoothed += values[index]
+    result[period - 1] = smoothed
+    for index in range(period, len(values)):
+        smoothed = smoothed - (smoothed / period) + values[index]
+        result[index] = smoothed
+
+
+@_jit
+def _sar_kernel(prices, af, max_af, min_af, result):
+    sar = prices[0]
+    is_up = True
+    extreme_price = prices[0]
+    acceleration_factor = af
+    result[0] = sar
+    for index in range(1, len(prices)):
+        price = prices[index]
+        if is_up:
+            sar += acceleration_factor * (extreme_price - sar)
+            if price > extreme_price:
+                old_extreme_price = extreme_price
+                extreme_price = price
+                acceleration_factor = min(acceleration_factor + (extreme_price - old_extreme_price), max_af)
+            if price < sar:
+                is_up = False
+                sar = extreme_price
+                extreme_price = price
+                acceleration_factor = af
+        else:
+            sar -= acceleration_factor * (sar - extreme_price)
+            if price < extreme_price:
+                old_extreme_price = extreme_price
+                extreme_price = price
+                acceleration_factor = max(acceleration_factor - (old_extreme_price - extreme_price), min_af)
+            if price > sar:
+                is_up = True
+                sar = extreme_price
+                extreme_price = price
+                acceleration_factor = af
+        result[index] = sar
+
+
+def ema_series(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    EMA seeded with the first value, alpha = 2 / (period + 1): IndicatorMACD, IndicatorVPVMA and the EMA nodes of
+    IndicatorGraph.
+    @param values: 1-D series.
+    @return: float64 array of the EMA after each value.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    result = np.empty(len(values), dtype=np.float64)
+    if len(values) > 0:
+        _ema_kernel(values, 2 / (period + 1), result)
+    return result
+
+
+def wilder_average_series(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder average (IndicatorRSI): the mean of the first period values, then (average * (period - 1) + value) / period.
+    @param values: 1-D series.
+    @return: float64 array of the average after each value. NaN before the first period values.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        _wilder_average_kernel(values, period, result)
+    return result
+
+
+def wilder_sum_series(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder running sum (IndicatorADX): the sum of the first period values, then sum - sum / period + value.
+    @param values: 1-D series.
+    @return: float64 array of the smoothed sum after each value. NaN before the first period values.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        _wilder_sum_kernel(values, period, result)
+    return result
+
+
+def sar_series(prices: np.ndarray, af: float = 0.02, max_af: float = 0.2, min_af: float = -0.2) -> np.ndarray:
+    """
+    Parabolic SAR with the dynamic acceleration factor of IndicatorSAR: starts in an up trend on the first price.
+    @param prices: 1-D series of mid prices.
+    @return: float64 array of the SAR after each price.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    result = np.empty(len(prices), dtype=np.float64)
+    if len(prices) > 0:
+        _sar_kernel(prices, af, max_af, min_af, result)
+    return result
+
+
+def rsi_series(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    RSI of IndicatorRSI: Wilder averages of the gains and losses between consecutive prices.
+    @param prices: 1-D series.
+    @return: float64 array of the RSI after each price. 50.0 until the averages are available.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    changes = np.diff(prices)
+    average_gains = wilder_average_series(np.maximum(changes, 0), period)
+    average_losses = wilder_average_series(np.abs(np.minimum(changes, 0)), period)
+    result = np.full(len(prices), 50.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + average_gains / average_losses))
+    rsi[average_losses == 0] = 100.0
+    available = ~np.isnan(average_gains)
+    result[1:][available] = rsi[available]
+    return result
@@ -0,0 +1,63 @@
+import constants
+
+
+class RunConfiguration:
+    """
+    Sampling and labelling parameters of one features-labels output: the lookback time of the labels, the step
+    timer between 2 feature rows and the profit levels. Several configurations are computed in a single pass over a
+    quotes file (see ProcessQuotesFile): they share the reader, the order book and the indicators.
+    """
+
+    def __init__(self, name: str, lookback_time: int, each_step_timer: int, profit_levels: tuple,
+                 horizons: tuple = ()) -> None:
+        """
+        @param name: short name of the configuration, used as the folder of its outputs. For example "lb_120s".
+        @param lookback_time: how long (nanos) the take profit is checked after each feature row.
+        @param each_step_timer: minimum time (nanos) between 2 feature rows.
+        @param profit_levels: the levels of take profit.
+        @param horizons: horizons (nanos) of the multi-horizon labels and first touch times (see
+        FeatureToLabelCollection.get_ready_targets). Empty: none.
+        """
+        if lookback_time <= 0 or each_step_timer < 0:
+            raise ValueError("Please input a positive lookback time and step timer for the configuration {}."
+                             .format(name))
+        if len(profit_levels) == 0:
+            raise ValueError("Please input at least one profit level for the configuration {}.".format(name))
+        self.__name = name
+        self.__lookback_time = lookback_time
+        self.__each_step_timer = each_step_timer
+        self.__profit_levels = tuple(profit_levels)
+        self.__horizons = tuple(horizons)
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def get_lookback_time(self) -> int:
+        return self.__lookback_time
+
+    def get_each_step_timer(self) -> int:
+        return self.__each_step_timer
+
+    def get_profit_levels(self) -> tuple:
+        return self.__profit_levels
+
+    def get_horizons(self) -> tuple:
+        return self.__horizons
+
+    @staticmethod
+    def get_configured_runs() -> tuple:
+        """
+        @return: tuple of the configurations of constants.RUN_CONFIGURATIONS. Empty if there are none: the single
+        run of LOOKBACK_TIME, EACH_STEP_TIMER and PROFIT_LEVELS is used.
+        """
+        configurations = tuple(RunConfiguration(*parameters) if len(parameters) > 4
+                               else RunConfiguration(*parameters, constants.LABEL_HORIZONS)
+                               for parameters in constants.RUN_CONFIGURATIONS)
+        names = [configuration.get_name() for configuration in configurations]
+        if len(set(names)) != len(names):
+            raise ValueError("The names of constants.RUN_CONFIGURATIONS must be unique: {}.".format(names))
+        return configurations
+
+    def __repr__(self):
+        return "RunConfiguration({}, lookback={}, step={}, profit_levels={}, horizons={})".format(
+            self.__name, self.__lookback_time, self.__each_step_timer, self.__profit_levels, self.__horizons)
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class SlidingWindowDataset:
+    """
+    Training examples made of the last K feature rows, for the sequence models (see
+    keras_models.get_model_prototype_sequence): the example of a row is the (K, features) window that ends with it,
+    its label is the label of that row.
+    The windows are a strided view of the feature matrix (numpy sliding_window_view): no row is duplicated. Only the
+    windows of a batch are gathered, when the batch is produced. A window never spans 2 files: the first K - 1 rows
+    of each file only appear as history of the next windows.
+    """
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, window_length: int, file_rows_counts: list = None,
+                 window_starts: np.ndarray = None):
+        """
+        @param features: (rows, features) array or memory map: the rows of the files one after the other, in time
+        order.
+        @param labels: (rows, 2) SELL/BUY labels of the rows.
+        @param window_length: K, count of rows of each window.
+        @param file_rows_counts: count of rows of each file, in order. By default, the rows are a single file.
+        @param window_starts: the first rows of the windows of this dataset. By default, all the windows within the
+        files (see split).
+        """
+        if window_length < 1:
+            raise ValueError("Please input a window length of at least 1 row.")
+        if len(features) != len(labels):
+            raise ValueError("There are {} feature rows for {} labels.".format(len(features), len(labels)))
+        self.__features = features
+        self.__labels = labels
+        self.__window_length = window_length
+        # (rows - K + 1, K, features) view. No copy.
+        if len(features) >= window_length:
+            self.__windows = np.lib.stride_tricks.sliding_window_view(features, window_length, axis=0) \
+                .transpose(0, 2, 1)
+        else:
+            self.__windows = np.empty((0, window_length, features.shape[1]), features.dtype)
+        if window_starts is None:
+            file_rows_counts = [len(features)] if file_rows_counts is None else file_rows_counts
+            if sum(file_rows_counts) != len(features):
+                raise ValueError("The files have {} rows, the features {}.".format(sum(file_rows_counts),
+                                                                                 len(features)))
+            file_starts = np.cumsum([0] + list(file_rows_counts[:-1]))
+            window_starts = np.concatenate(
+                [np.arange(file_start, file_start + file_rows_count - window_length + 1, dtype=np.int64)
+                 for file_start, file_rows_count in zip(file_starts, file_rows_counts)] + [np.empty(0, np.int64)])
+        self.__window_starts = np.asarray(window_starts, dtype=np.int64)
+
+    def get_window_length(self) -> int:
+        return self.__window_length
+
+    def get_features_count(self) -> int:
+        return self.__features.shape[1]
+
+    def get_windows_count(self) -> int:
+        return len(self.__window_starts)
+
+    def get_window_starts(self) -> np.ndarray:
+        return self.__window_starts
+
+    def get_window(self, index: int) -> np.ndarray:
+        """
+        @return: the (K, features) view of the window. Not a copy.
+        """
+        return self.__windows[self.__window_starts[index]]
+
+    def get_labels(self) -> np.ndarray:
+        """
+        @return: (windows, 2) labels of the last rows of the windows.
+        """
+        return np.asarray(self.__labels[self.__window_starts + self.__window_length - 1])
+
+    def split(self, test_fraction: float) -> tuple:
+        """
+        Time split: the last windows are the test set. Both datasets are views of the same matrix.
+        @return: tuple (train dataset, test dataset).
+        """
+        train_count = self.get_windows_count() - int(round(self.get_windows_count() * test_fraction))
+        return (SlidingWindowDataset(self.__features, self.__labels, self.__window_length,
+                                     window_starts=self.__window_starts[:train_count]),
+                SlidingWindowDataset(self.__features, self.__labels, self.__window_length,
+                                     window_starts=self.__window_starts[train_count:]))
+
+    def iterate_batches(self, batch_size: int, shuffle: bool = False, rng: np.random.Generator = None):
+        """
+        @param batch_size: count of windows per batch.
+        @param shuffle: random order of the windows, drawn again at each call.
+        @return: generator of tuples (float32 windows (batch, K, features), float32 labels (batch, 2)). Only these
+        arrays are copies.
+        """
+        window_starts = self.__window_starts
+        if shuffle:
+            window_starts = (np.random.default_rng() if rng is None else rng).permutation(window_starts)
+        for batch_start in range(0, len(window_starts), batch_size):
+            batch_window_starts = window_starts[batch_start:batch_start + batch_size]
+            yield (np.asarray(self.__windows[batch_window_starts], dtype=np.float32),
+                   np.asarray(self.__labels[batch_window_starts + self.__window_length - 1], dtype=np.float32))
+
+    def get_dataset(self, batch_size: int, shuffle: bool = False, seed: int = None):
+        """
+        @return: tf Dataset of (windows, labels) batches (see iterate_batches).
+        """
+        from tensorflow import TensorSpec, float32
+        from tensorflow.data import Dataset
+        from tensorflow.data.experimental import assert_cardinality
+
+        rng = np.random.default_rng(seed)
+        dataset = Dataset.from_generator(lambda: self.iterate_batches(batch_size, shuffle, rng),
+                                         output_signature=(
+                                             TensorSpec(shape=(None, self.__window_length, self.get_features_count()),
+                                                        dtype=float32),
+                                             TensorSpec(shape=(None, 2), dtype=float32)))
+        # Known count of batches: Keras knows where an epoch ends.
+        return dataset.apply(assert_cardinality(-(-self.get_windows_count() // batch_size)))
@@ -0,0 +1,118 @@
+import numpy as np
+
+import constants
+
+
+class StreamingOversampler:
+    """
+    SMOTE-like rebalancing inside the input pipeline: the training rows are never copied or resampled as a whole.
+    A nearest-neighbour index is precomputed over the rows of the minority classes only ([0, 0], [1, 0], [0, 1] and
+    [1, 1] are the 4 classes, as in FeatureLabelModificator). Each training batch of real rows then receives its share
+    of synthetic minority rows, each interpolated between a minority row and one of its k nearest neighbours of the
+    same class. Over an epoch, each minority class gets as many synthetic rows as SMOTE "auto" would add.
+    The features can be a read-only memory-mapped array (see parallel_tuning.load_dataset): only the rows of the
+    current batch and of the minority classes are read in memory.
+    """
+
+    CLASSES_COUNT = 4
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, k_neighbors: int = None, seed: int = None):
+        """
+        @param features: (rows, features) array or memory map.
+        @param labels: (rows, 2) SELL/BUY labels, 0/1 or bool.
+        @param k_neighbors: neighbours of each minority row. By default, constants.SMOTE_NEIGHBORS.
+        @param seed: random generator seed.
+        """
+        # sklearn is only imported by the oversampling strategies.
+        from sklearn.neighbors import NearestNeighbors
+
+        self.__features = features
+        self.__labels = np.asarray(labels, dtype=np.float32)
+        self.__seed = seed
+        k_neighbors = constants.SMOTE_NEIGHBORS if k_neighbors is None else k_neighbors
+        # [0, 0] -> 0, [1, 0] -> 1, [0, 1] -> 2, [1, 1] -> 3
+        classes = (self.__labels[:, 0] + 2 * self.__labels[:, 1]).astype(np.int64)
+        counts = np.bincount(classes, minlength=StreamingOversampler.CLASSES_COUNT)
+        majority_count = counts.max()
+        # Class -> (rows of the class, (class rows, k) global rows of their neighbours, synthetic rows per epoch).
+        self.__minority_classes = {}
+        for class_id in range(StreamingOversampler.CLASSES_COUNT):
+            if counts[class_id] == 0 or counts[class_id] == majority_count:
+                continue
+            rows = np.flatnonzero(classes == class_id)
+            class_features = np.asarray(features[rows], dtype=np.float32)
+            neighbors_count = min(k_neighbors + 1, len(rows))
+            neighbors_index = NearestNeighbors(n_neighbors=neighbors_count).fit(class_features)
+            # The first neighbour is the row itself. A single row is interpolated with itself (duplicated).
+            neighbors = neighbors_index.kneighbors(class_features, return_distance=False)
+            neighbors = neighbors[:, 1:] if neighbors_count > 1 else neighbors
+            self.__minority_classes[class_id] = (rows, rows[neighbors], int(majority_count - counts[class_id]))
+        self.__synthetic_rows_count = sum(minority[2] for minority in self.__minority_classes.values())
+
+    def get_rows_count(self) -> int:
+        """
+        @return: count of real rows per epoch.
+        """
+        return len(self.__labels)
+
+    def get_synthetic_rows_count(self) -> int:
+        """
+        @return: count of synthetic rows per epoch.
+        """
+        return self.__synthetic_rows_count
+
+    def iterate_batches(self, batch_size: int, rng: np.random.Generator = None):
+        """
+        One epoch: the real rows in a random order, by batches, each batch extended by its share of synthetic rows.
+        @param batch_size: count of real rows per batch.
+        @return: generator of tuples (float32 features (rows, features), float32 labels (rows, 2)).
+        """
+        rng = np.random.default_rng(self.__seed) if rng is None else rng
+        rows_count = self.get_rows_count()
+        order = rng.permutation(rows_count)
+        # The synthetic rows of each class are spread over the batches of the epoch.
+        remaining = {class_id: minority[2] for class_id, minority in self.__minority_classes.items()}
+        for batch_start in range(0, rows_count, batch_size):
+            # Sorted: the memory-mapped rows are read in order.
+            batch_rows = np.sort(order[batch_start:batch_start + batch_size])
+            batch_features = [np.asarray(self.__features[batch_rows], dtype=np.float32)]
+            batch_labels = [self.__labels[batch_rows]]
+            remaining_rows_count = rows_count - batch_start
+            for class_id, (rows, neighbors, _) in self.__minority_classes.items():
+                count = int(round(remaining[class_id] * len(batch_rows) / remaining_rows_count))
+                if count == 0:
+                    continue
+                remaining[class_id] -= count
+                base = rng.integers(0, len(rows), count)
+                origins = rows[base]
+                targets = neighbors[base, rng.integers(0, neighbors.shape[1], count)]
+                # Each row is read once, in order, then gathered.
+                read_rows, inverse = np.unique(np.concatenate([origins, targets]), return_inverse=True)
+                read_features = np.asarray(self.__features[read_rows], dtype=np.float32)
+                origin_features = read_features[inverse[:count]]
+                target_features = read_features[inverse[count:]]
+                gaps = rng.random((count, 1), dtype=np.float32)
+                batch_features.append(origin_features + gaps * (target_features - origin_features))
+                batch_labels.append(np.repeat(self.__labels[rows[:1]], count, axis=0))
+            features = np.concatenate(batch_features)
+            labels = np.concatenate(batch_labels)
+            # The synthetic rows are mixed with the real ones.
+            mixed = rng.permutation(len(features))
+            yield features[mixed], labels[mixed]
+
+    def get_dataset(self, batch_size: int):
+        """
+        @param batch_size: count of real rows per batch.
+        @return: tf Dataset of (features, labels) batches. Each epoch draws new synthetic rows.
+        """
+        from tensorflow import TensorSpec, float32
+        from tensorflow.data import Dataset
+        from tensorflow.data.experimental import assert_cardinality
+
+        rng = np.random.default_rng(self.__seed)
+        features_count = self.__features.shape[1]
+        dataset = Dataset.from_generator(lambda: self.iterate_batches(batch_size, rng),
+                                         output_signature=(TensorSpec(shape=(None, features_count), dtype=float32),
+                                                           TensorSpec(shape=(None, 2), dtype=float32)))
+        # Known count of batches: Keras knows where an epoch ends.
+        return dataset.apply(assert_cardinality(-(-self.get_rows_count() // batch_size)))
@@ -0,0 +1,121 @@
+import random
+from datetime import datetime, timedelta
+import constants
+from enum_classes import EnumPair
+
+
+class SyntheticQuotesGenerator:
+    """
+    Seeded generator of synthetic quote files in the formats read by QuotesReader. Used by the benchmarks and the
+    tests since the raw folders are shipped empty.
+    The mid of each pair is a random walk of ticks (a tenth of a pip). Each step of the walk quotes a multi-level
+    book around the mid: each level (amount) has its own spread and is refreshed with a given probability.
+    The same seed and the same arguments always produce the same file.
+    """
+
+    # Default mids of the random walks.
+    __START_MIDS = {
+        EnumPair.GBPUSD: 1.27000, EnumPair.EURUSD: 1.10000, EnumPair.EURJPY: 160.000, EnumPair.GBPAUD: 1.92000,
+        EnumPair.USDCHF: 0.88000, EnumPair.USDJPY: 145.000, EnumPair.NZDUSD: 0.60000, EnumPair.AUDUSD: 0.66000,
+        EnumPair.NOKSEK: 0.98000, EnumPair.USDCAD: 1.36000, EnumPair.OTHER: 1.10000,
+    }
+    # Amounts of the book levels. The HIGH_FREQ_FX order book keys its levels on the amount.
+    DEFAULT_LEVELS = (1000000.00, 3000000.00, 5000000.00)
+    __DUKASCOPY_HEADER = "Gmt time,Ask,Bid,AskVolume,BidVolume\n"
+
+    def __init__(self, seed: int = 0, start_time: datetime = datetime(2024, 10, 21)):
+        """
+        @param seed: seed of the random generator.
+        @param start_time: time of the first quote.
+        """
+        self.__seed = seed
+        self.__start_time = start_time
+
+    @staticmethod
+    def get_price_digits(currency_pair: EnumPair) -> int:
+        """
+        @return: the number of digits of the prices: 3 for the JPY pairs, constants.PRICE_ROUND_PRECISION otherwise.
+        """
+        return 3 if currency_pair.name.endswith("JPY") else constants.PRICE_ROUND_PRECISION
+
+    def generate_high_freq_fx(self, file_name: str, steps: int, pairs_weights: dict = None,
+                              levels: tuple = DEFAULT_LEVELS, level_refresh_probability: float = 0.5,
+                              mean_step_millis: int = 25) -> int:
+        """
+        Writes a HIGH_FREQ_FX file: N;id;CCY/CCY;local nanos;ecn millis;amount;min qty;lot size;price;B|S;0
+        @param file_name: path of the written file.
+        @param steps: count of steps of the random walk. Each step moves one pair, picked with pairs_weights.
+        @param pairs_weights: dict EnumPair -> weight of the pair in the mix. EURUSD only by default.
+        @param levels: amounts of the book levels. The level i is quoted at (i + 1) ticks around the mid.
+        @param level_refresh_probability: probability to refresh each level (both ways) at each step.
+        @param mean_step_millis: mean time between two steps.
+        @return: count of written quotes.
+        """
+        if pairs_weights is None:
+            pairs_weights = {EnumPair.EURUSD: 1}
+        if EnumPair.OTHER in pairs_weights:
+            raise ValueError("HIGH_FREQ_FX files need named currency pairs.")
+        generator = random.Random(self.__seed)
+        pairs = tuple(pairs_weights.keys())
+        weights = tuple(pairs_weights.values())
+        pairs_states = {pair: self.__init_pair_state(pair) for pair in pairs}
+        # Naive UTC times, as in the DUKASKOPY files: the output doesn't depend on the local time zone.
+        start_millis = (self.__start_time - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
+        local_nanos = 0
+        written_count = 0
+        with open(file_name, 'w') as open_pointer:
+            for step in range(steps):
+                pair = generator.choices(pairs, weights)[0]
+                pair_state = pairs_states[pair]
+                pair_state[0] += generator.choice((-1, 0, 1)) * pair_state[1]
+                local_nanos += generator.randint(1, 2 * mean_step_millis) * constants.NANOS_IN_ONE_MILLIS
+                ecn_millis = start_millis + local_nanos // constants.NANOS_IN_ONE_MILLIS
+                lines = []
+                for level_index, amount in enumerate(levels):
+                    if generator.random() >= level_refresh_probability and step > 0:
+                        continue
+                    half_spread = (level_index + 1) * pair_state[1]
+                    quote_id = "{}-{:.0f}--1".format(ecn_millis, amount)
+                    for way, price in (("B", pair_state[0] - half_spread), ("S", pair_state[0] + half_spread)):
+                        lines.append("N;{};{};{};{};{:.2f};0.00;0.00;{:.{}f};{};0\n"
+                                     .format(quote_id, pair_state[2], local_nanos, ecn_millis, amount,
+                                             price, pair_state[3], way))
+                open_pointer.writelines(lines)
+                written_count += len(lines)
+        return written_count
+
+    def generate_dukascopy(self, file_name: str, steps: int, currency_pair: EnumPair = EnumPair.OTHER,
+                           mean_step_millis: int = 25) -> int:
+        """
+        Writes a DUKASKOPY file: one header line then "dd.mm.yyyy HH:MM:SS.fff,Ask,Bid,AskVolume,BidVolume" lines.
+        @param file_name: path of the written file.
+        @param steps: count of lines (steps of the random walk).
+        @param currency_pair: sets the mid and the price digits.
+        @param mean_step_millis: mean time between two lines.
+        @return: count of written quotes (two per line: the reader alternates the two sides).
+        """
+        generator = random.Random(self.__seed)
+        pair_state = self.__init_pair_state(currency_pair)
+        current_time = self.__start_time
+        with open(file_name, 'w') as open_pointer:
+            open_pointer.write(SyntheticQuotesGenerator.__DUKASCOPY_HEADER)
+            for step in range(steps):
+                pair_state[0] += generator.choice((-1, 0, 1)) * pair_state[1]
+                current_time += timedelta(milliseconds=generator.randint(1, 2 * mean_step_millis))
+                half_spread = generator.randint(1, 3) * pair_state[1]
+                open_pointer.write("{}.{:03d},{:.{}f},{:.{}f},{:.2f},{:.2f}\n"
+                                   .format(current_time.strftime("%d.%m.%Y %H:%M:%S"),
+                                           current_time.microsecond // 1000,
+                                           pair_state[0] + half_spread, pair_state[3],
+                                           pair_state[0] - half_spread, pair_state[3],
+                                           generator.randint(1, 500) / 100, generator.randint(1, 500) / 100))
+        return 2 * steps
+
+    @staticmethod
+    def __init_pair_state(currency_pair: EnumPair) -> list:
+        """
+        @return: mutable state of the walk of a pair: [mid, tick, pair with slash, price digits]
+        """
+        price_digits = SyntheticQuotesGenerator.get_price_digits(currency_pair)
+        return [SyntheticQuotesGenerator.__START_MIDS[currency_pair], pow(10, -price_digits),
+                currency_pair.get_ccy_pair_with_slash(), price_digits]
@@ -0,0 +1,78 @@
+from unittest import TestCase
+import numpy as np
+
+from enum_classes import EnumPair, EnumCcy
+from feature_layout import FeatureLayout
+from feature_rows_buffer import FeatureRowsBuffer
+from indicator_best_bid_offer_variance import IndicatorBestBidOfferVariance
+from indicator_MACD import IndicatorMACD
+from indicator_moving_average_on_price import IndicatorMovingAverageOnPrice
+from order_book_high_freq_fx import OrderBookHighFreqFx
+from quote import Quote
+
+
+class IndicatorWrongWidth(IndicatorMovingAverageOnPrice):
+    # Declares 3 values but returns only one.
+
+    def get_return_size(self) -> tuple:
+        return 3,
+
+
+class TestFeatureLayout(TestCase):
+
+    def test_layout(self):
+        layout = FeatureLayout((IndicatorMACD(12, 26, 9), IndicatorMovingAverageOnPrice(3),
+                                IndicatorBestBidOfferVariance()))
+        self.assertEqual(5, layout.get_width())
+        self.assertEqual(((0, 2), (2, 3), (3, 5)), layout.get_slices())
+        self.assertEqual(0b111, layout.get_full_validity_mask())
+        self.assertEqual(["MACD_12_26_9[0]", "MACD_12_26_9[1]", "MA_PX_3",
+                          "VAR_BBID_BOFFER_10[0]", "VAR_BBID_BOFFER_10[1]"], layout.get_column_names())
+
+    def test_collect_indicators_values(self):
+        order_book = OrderBookHighFreqFx(EnumPair.EURUSD)
+        indicators = (IndicatorMovingAverageOnPrice(3), IndicatorBestBidOfferVariance())
+        order_book.set_indicators(indicators)
+        layout = FeatureLayout(indicators)
+        features_row = np.empty(layout.get_width(), dtype=np.float32)
+
+        order_book.incoming_quote(Quote(1, EnumCcy.EUR, EnumCcy.USD, 1, 1, 1000.00, 0.00, 0.00, 1.10000, True))
+        order_book.incoming_quote(Quote(2, EnumCcy.EUR, EnumCcy.USD, 2, 2, 1000.00, 0.00, 0.00, 1.10010, False))
+        validity_mask = layout.collect_indicators_values(features_row)
+        # The moving average is still in warm-up: NaN and its bit is not set.
+        self.assertEqual(0b10, validity_mask)
+        self.assertTrue(np.isnan(features_row[0]))
+        self.assertFalse(np.isnan(features_row[1:]).any())
+
+        order_book.incoming_quote(Quote(3, EnumCcy.EUR, EnumCcy.USD, 3, 3, 1000.00, 0.00, 0.00, 1.10020, False))
+        validity_mask = layout.collect_indicators_values(features_row)
+        self.assertEqual(layout.get_full_validity_mask(), validity_mask)
+        # The first mid is computed with an empty offers side. The third offer replaces the second (same amount).
+        expected_mid_average = (1.10000 / 2 + (1.10000 + 1.10010) / 2 + (1.10000 + 1.10020) / 2) / 3
+        self.assertAlmostEqual(expected_mid_average, features_row[0], 5)
+
+    def test_validate_width(self):
+        order_book = OrderBookHighFreqFx(EnumPair.EURUSD)
+        indicators = (IndicatorWrongWidth(1),)
+        order_book.set_indicators(indicators)
+        layout = FeatureLayout(indicators)
+        features_row = np.empty(layout.get_width(), dtype=np.float32)
+        order_book.incoming_quote(Quote(1, EnumCcy.EUR, EnumCcy.USD, 1, 1, 1000.00, 0.00, 0.00, 1.10000, True))
+        with self.assertRaises(ValueError):
+            layout.collect_indicators_values(features_row)
+
+
+class TestFeatureRowsBuffer(TestCase):
+
+    def test_grow_by_chunks(self):
+        features_buffer = FeatureRowsBuffer(2, chunk_rows=2)
+        for i in range(5):
+            row_index, features_row = features_buffer.next_row()
+            self.assertEqual(i, row_index)
+            features_row[:] = (i, -i)
+            features_buffer.set_validity_mask(row_index, i % 2)
+
+        self.assertEqual(5, len(features_buffer))
+        self.assertEqual(6, features_buffer.get_capacity())
+        self.assertEqual([[0, 0], [1, -1], [2, -2], [3, -3], [4, -4]], features_buffer.get_rows().tolist())
+        self.assertEqual([1, 0, 1], features_buffer.get_validity_masks(1, 4).tolist())
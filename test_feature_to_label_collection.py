@@ -1,5 +1,7 @@
 from unittest import TestCase
+import numpy as np
 
+import constants
 from feature_to_label_collection import FeatureToLabelCollection
 
 
@@ -179,3 +181,46 @@ class TestFeatureToLabelCollection(TestCase):
         self.assertEqual(10, len(append_features_labels[0][1]))
         self.assertEqual(10, len(append_features_labels[1]))
 
+    def test_horizons(self):
+        millis = constants.NANOS_IN_ONE_MILLIS
+        collection = FeatureToLabelCollection(2 * millis, (0.001,), (millis, 3 * millis))
+        collection_without_horizons = FeatureToLabelCollection(2 * millis, (0.001,))
+        for each_collection in (collection, collection_without_horizons):
+            each_collection.put(0, 1.000, 1.001, (1, 2))
+            # BUY target touched after 1.5 ms, SELL target after 2.5 ms: out of the causality timespan.
+            for quote_time, bid, offer in ((0, 1.000, 1.001), (1500000, 1.0025, 1.0035), (2500000, 0.997, 0.998),
+                                           (4 * millis, 1.000, 1.001)):
+                each_collection.check_profit_levels_on_active_cells(quote_time, bid, offer)
+
+        labels, features = collection.get_ready_calculations()
+        self.assertEqual(collection_without_horizons.get_ready_calculations(), (labels, features))
+        self.assertEqual([[[False, True]]], labels)
+        horizon_labels, first_touch_times = collection.get_ready_targets()
+        self.assertEqual(np.int32, first_touch_times.dtype)
+        self.assertEqual([[[2, 1]]], first_touch_times.tolist())
+        # (rows, horizons, price deltas, [SELL, BUY])
+        self.assertEqual([[[[False, False]], [[True, True]]]], horizon_labels.tolist())
+        self.assertEqual((millis, 3 * millis), collection.get_horizons())
+
+    def test_ready_batch(self):
+        # Small columns: they are grown, then compacted once the returned cells are half of them.
+        collection = FeatureToLabelCollection(3, (0.001,), capacity=4)
+        returned_features = []
+        for quote_time in range(40):
+            collection.put(quote_time, 1.000, 1.001, quote_time)
+            # The BUY target of the cells put at even times is hit at the next quote.
+            bid = 1.0025 if quote_time % 2 == 1 else 1.000
+            collection.check_profit_levels_on_active_cells(quote_time, bid, bid + 0.001)
+            if quote_time % 5 == 4:
+                labels, features = collection.get_ready_batch()
+                self.assertEqual(bool, labels.dtype)
+                self.assertEqual((len(features), 1, 2), labels.shape)
+                for label in labels[:, 0].tolist():
+                    self.assertEqual([False, True], label)
+                returned_features += features.tolist()
+        # 40 cells in 16: the returned ones were dropped.
+        self.assertEqual(16, collection.get_capacity())
+        # The cells are returned once, in order, when their 3 nanos are over: the last one was put at 36.
+        self.assertEqual(list(range(37)), returned_features)
+        self.assertEqual(0, len(collection.get_ready_batch()[1]))
+        self.assertEqual(([], []), collection.get_ready_calculations())
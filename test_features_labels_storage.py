@@ -3,6 +3,7 @@ from os import remove
 from os.path import exists
 from datetime import datetime
 from unittest import TestCase
+import numpy as np
 
 from features_labels_storage import FeaturesLabelsStorage
 
@@ -63,4 +64,16 @@ class TestFeaturesLabelsStorage(TestCase):
         # Remove test file
         remove(stored)
 
-
+    def test_targets(self):
+        stored = os.path.join(os.getcwd(), "targets_test_0.pkl")
+        horizon_labels = np.array([[[[False, True]], [[True, True]]]])
+        first_touch_times = np.array([[[2, 1]]], dtype=np.int32)
+        self.assertEqual(tuple(), FeaturesLabelsStorage.restore_targets(stored))
+        targets_path = FeaturesLabelsStorage.store_targets((horizon_labels, first_touch_times), (1000, 3000), stored)
+        try:
+            restored_labels, restored_times, horizons = FeaturesLabelsStorage.restore_targets(stored)
+        finally:
+            remove(targets_path)
+        np.testing.assert_array_equal(horizon_labels, restored_labels)
+        self.assertEqual(np.int32, restored_times.dtype)
+        self.assertEqual((1000, 3000), horizons)
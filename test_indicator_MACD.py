@@ -17,7 +17,7 @@ class TestIndicatorMACD(TestCase):
         self.assertEqual("MACD_12_26_9", macd.get_description())
         return_size = macd.get_return_size()
         self.assertEqual(tuple, type(return_size))
-        self.assertEqual((3, ), return_size)
+        self.assertEqual((2, ), return_size)
         self.assertEqual(1, len(return_size))
 
     def test_insert_quotes(self):
@@ -57,5 +57,19 @@ class TestIndicatorMovingAverage(TestCase):
         self.assertEqual("RSI_5", rsi_deep_copy.get_description())
         self.assertTrue(rsi != rsi_deep_copy)
 
+    def test_bounded_state(self):
+        ob = OrderBookHighFreqFx(EnumPair.EURUSD)
+        rsi = IndicatorRSI(5)
+        ob.set_indicators([rsi])
+        for index in range(200):
+            ob.incoming_quote(Quote(index, EnumCcy.EUR, EnumCcy.USD, index, index, 1000.00, 0.00, 0.00,
+                                    10.00 + index % 7, True))
+        self.assertTrue(rsi.is_ready())
+        # Only the last prices are kept: the warm start state doesn't grow with the count of quotes.
+        self.assertEqual(6, len(rsi.get_state()["attributes"]["prices"]))
+        restored = IndicatorRSI(5)
+        restored.set_state(rsi.get_state())
+        self.assertEqual(rsi.get_current_value(), restored.get_current_value())
+
 if __name__ == "__main__":
      unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+from unittest import TestCase
+import numpy as np
+
+from enum_classes import EnumCcy, EnumPair
+from indicator_bollinger_bands import IndicatorBollingerBands
+from indicator_graph import IndicatorGraph, SeriesNode
+from indicator_MACD import IndicatorMACD
+from indicator_money_flow_index import IndicatorMoneyFlowIndex
+from market_state import MarketState
+from order_book_dukaskopy import OrderBookDukascopy
+from quote import Quote
+
+
+class TestIndicatorGraph(TestCase):
+
+    @staticmethod
+    def __feed(order_book, quotes_count: int = 300) -> None:
+        rng = np.random.default_rng(0)
+        price = 1.1
+        for index in range(quotes_count):
+            price += rng.normal() * 1e-4
+            way = bool(index % 2)
+            order_book.incoming_quote(Quote(index, EnumCcy.EUR, EnumCcy.USD, index, index,
+                                            float(rng.choice([1e5, 1e6])), 0.00, 0.00, price, way))
+
+    def test_shared_nodes(self):
+        graph = IndicatorGraph(MarketState())
+        mid = graph.get_series(SeriesNode.MID)
+        self.assertIs(mid, graph.get_series(SeriesNode.MID))
+        self.assertIsNot(mid, graph.get_series(SeriesNode.MID, True))
+        self.assertIs(graph.get_ema(mid, 12), graph.get_ema(mid, 12))
+        self.assertIs(graph.get_rolling_window(mid, 20), graph.get_rolling_window(mid, 20))
+        # Sources first.
+        self.assertEqual([("series", "mid", False), ("series", "mid", True), ("ema", ("series", "mid", False), 12),
+                          ("window", ("series", "mid", False), 20)],
+                         [node.get_key() for node in graph.get_nodes()])
+        self.assertEqual(7, graph.get_requests_count())
+        with self.assertRaises(ValueError):
+            graph.get_series("spread")
+
+    def test_rolling_window(self):
+        market_state = MarketState()
+        graph = IndicatorGraph(market_state)
+        window = graph.get_rolling_window(graph.get_series(SeriesNode.MID), 3)
+        for price in (1.0, 3.0, 2.0, 6.0):
+            market_state.update(Quote(1, EnumCcy.EUR, EnumCcy.USD, 0, 0, 1.0, 0.0, 0.0, price, True),
+                                Quote(2, EnumCcy.EUR, EnumCcy.USD, 0, 0, 1.0, 0.0, 0.0, price, False))
+            graph.update()
+        self.assertTrue(window.is_full())
+        self.assertEqual((3.0, 6.0), (window.get_first(), window.get_last()))
+        self.assertEqual((2.0, 6.0), (window.get_min(), window.get_max()))
+        self.assertAlmostEqual(11.0 / 3, window.get_mean())
+        self.assertAlmostEqual(np.std([3.0, 2.0, 6.0]), window.get_std())
+
+    def test_same_values_as_separate_books(self):
+        indicators = (IndicatorMACD(12, 26, 9), IndicatorMACD(12, 52, 9), IndicatorBollingerBands(20, 2, 10, 50),
+                      IndicatorMoneyFlowIndex(14), IndicatorMoneyFlowIndex(20))
+        shared_book = OrderBookDukascopy(EnumPair.EURUSD)
+        shared_book.set_indicators(indicators)
+        # 3 series (mid, two-sided mid and amount), EMA 12, 26 and 52, 5 windows. The EMA 12 and the series are shared.
+        self.assertEqual(11, shared_book.get_indicator_graph().get_nodes_count())
+        self.assertEqual(16, shared_book.get_indicator_graph().get_requests_count())
+        self.__feed(shared_book)
+
+        for each_indicator in indicators:
+            separate_indicator = each_indicator.__deepcopy__({})
+            separate_book = OrderBookDukascopy(EnumPair.EURUSD)
+            separate_book.set_indicators((separate_indicator,))
+            self.__feed(separate_book)
+            self.assertTrue(each_indicator.is_ready())
+            self.assertEqual(separate_indicator.get_current_value(), each_indicator.get_current_value())
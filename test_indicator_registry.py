@@ -0,0 +1,58 @@
+from unittest import TestCase
+import pickle
+import subprocess
+import sys
+
+import indicators_set_up
+from indicator_MACD import IndicatorMACD
+from indicator_registry import IndicatorRegistry, IndicatorSpec
+from process_quotes_file import ProcessQuotesFile
+
+
+class TestIndicatorRegistry(TestCase):
+
+    def test_create(self):
+        spec = IndicatorSpec("MACD", 12, 26, 9)
+        indicator = spec.create()
+        self.assertIsInstance(indicator, IndicatorMACD)
+        self.assertEqual("MACD_12_26_9", indicator.get_description())
+        self.assertIsNot(indicator, spec.create())
+        self.assertEqual([each_indicator.get_description() for each_indicator in
+                          IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS)],
+                         [each_spec.create().get_description() for each_spec in indicators_set_up.INDICATOR_SPECS])
+        with self.assertRaises(ValueError):
+            IndicatorSpec("UNKNOWN", 1)
+
+    def test_keys(self):
+        self.assertEqual(IndicatorSpec("MFI", 14), IndicatorSpec("MFI", 14))
+        self.assertNotEqual(IndicatorSpec("MFI", 14), IndicatorSpec("MFI", 28))
+        self.assertEqual(1, len({IndicatorSpec("MFI", 14), IndicatorSpec("MFI", 14)}))
+        self.assertEqual(("BB", (20, 2, 10, 50)), IndicatorSpec("BB", 20, 2, 10, 50).get_key())
+        self.assertEqual("VPVMA(12, 26, 9, 0.1)", repr(IndicatorSpec("VPVMA", 12, 26, 9, 0.1)))
+
+    def test_pickle(self):
+        specs = indicators_set_up.INDICATOR_SPECS
+        pickled = pickle.dumps(specs)
+        self.assertEqual(specs, pickle.loads(pickled))
+        # The specs are loaded without importing the indicator modules.
+        script = ("import pickle, sys; specs = pickle.loads(sys.stdin.buffer.read()); "
+                  "print(len(specs), any(name.startswith('indicator_') and name != 'indicator_registry' "
+                  "for name in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], input=pickled, capture_output=True, check=True)
+        self.assertEqual("{} False".format(len(specs)), output.stdout.decode().strip())
+        # Neither does the import of the chosen set.
+        script = ("import sys, indicators_set_up; print(any(name.startswith('indicator_') and "
+                  "name != 'indicator_registry' for name in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True)
+        self.assertEqual("False", output.stdout.decode().strip())
+
+    def test_register(self):
+        IndicatorRegistry.register("MACD_TEST", IndicatorMACD)
+        self.assertIn("MACD_TEST", IndicatorRegistry.get_names())
+        self.assertEqual("MACD_5_10_3", IndicatorSpec("MACD_TEST", 5, 10, 3).create().get_description())
+
+    def test_process_quotes_file_indicators(self):
+        macd = IndicatorMACD(12, 26, 9)
+        indicators = ProcessQuotesFile.create_indicators((IndicatorSpec("MFI", 14), macd))
+        self.assertEqual(["MFI_14", "MACD_12_26_9"], [indicator.get_description() for indicator in indicators])
+        self.assertIsNot(macd, indicators[1])
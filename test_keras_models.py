@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import constants
+import keras_models
+from enum_classes import EnumHyperParamsOptimization
+
+
+class TestKerasModels(TestCase):
+
+    def setUp(self):
+        self.__optimization = constants.HYPERPARAMETERS_OPTIMIZATION
+        self.__patience = constants.TUNER_EARLY_STOPPING_PATIENCE
+        self.__working_directory = os.getcwd()
+        self.__directory = tempfile.TemporaryDirectory()
+        # The tuners write their projects in the working directory.
+        os.chdir(self.__directory.name)
+
+    def tearDown(self):
+        constants.HYPERPARAMETERS_OPTIMIZATION = self.__optimization
+        constants.TUNER_EARLY_STOPPING_PATIENCE = self.__patience
+        os.chdir(self.__working_directory)
+        self.__directory.cleanup()
+
+    def test_hyperband_tuner(self):
+        constants.HYPERPARAMETERS_OPTIMIZATION = EnumHyperParamsOptimization.HYPERBAND
+        tuner = keras_models.create_tuner(8, 2)
+        self.assertEqual("Hyperband", type(tuner).__name__)
+        self.assertEqual(constants.EPOCHS_COUNT, tuner.oracle.max_epochs)
+        self.assertEqual(constants.HYPERBAND_FACTOR, tuner.oracle.factor)
+
+    def test_search_callbacks(self):
+        constants.TUNER_EARLY_STOPPING_PATIENCE = 2
+        callbacks = keras_models.get_search_callbacks()
+        self.assertEqual(1, len(callbacks))
+        self.assertEqual("val_loss", callbacks[0].monitor)
+        self.assertEqual(2, callbacks[0].patience)
+        constants.TUNER_EARLY_STOPPING_PATIENCE = 0
+        self.assertEqual([], keras_models.get_search_callbacks())
+
+    def test_multi_head_training(self):
+        import numpy as np
+        import train_network
+        epochs_count = constants.EPOCHS_COUNT
+        constants.EPOCHS_COUNT = 1
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(60, 5)).astype(np.float32).tolist()
+        labels_per_level = [rng.integers(0, 2, size=(60, 2)).astype(bool).tolist() for _ in range(3)]
+        try:
+            metrics = train_network.train_multi_head(labels_per_level, features, (), (1, 2, 3),
+                                                     os.path.join(self.__directory.name, "model.keras"))
+        finally:
+            constants.EPOCHS_COUNT = epochs_count
+        self.assertEqual([0, 1, 2], sorted(metrics.keys()))
+        for level_metrics in metrics.values():
+            self.assertTrue(0.0 <= level_metrics["accuracy"] <= 1.0)
+            self.assertEqual((2, 2, 2), np.array(level_metrics["confusion_matrix"]).shape)
+        self.assertTrue(os.path.exists(os.path.join(self.__directory.name, "model.npz")))
+
+    def test_split_validation_train(self):
+        import train_network
+        features = list(range(20))
+        validation_features, validation_labels, train_features, train_labels = \
+            train_network.split_validation_train(features, features, 0.25)
+        self.assertEqual(list(range(5)), validation_features)
+        self.assertEqual(list(range(5, 20)), train_labels)
@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+import main
+
+
+class TestMain(TestCase):
+
+    def test_features_stage_imports(self):
+        # A features-only run (or worker) must not import the training dependencies.
+        wall_time, import_time, heavy_modules = main.measure_stage_import("features")
+        self.assertEqual("", heavy_modules)
+        self.assertLess(import_time, wall_time)
+
+    def test_backtest_stage_imports(self):
+        # The backtest runs the NumPy export of the model by default: TensorFlow is imported on demand only.
+        self.assertEqual("", main.measure_stage_import("backtest")[2])
+
+    def test_unknown_command(self):
+        with self.assertRaises(SystemExit):
+            main.main(["unknown"])
@@ -0,0 +1,49 @@
+from unittest import TestCase
+import numpy as np
+from sklearn.metrics import multilabel_confusion_matrix, precision_recall_fscore_support
+
+import model_evaluation
+
+
+class TestModelEvaluation(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.__expected = rng.integers(0, 2, size=(500, 2))
+        self.__probabilities = rng.random(size=(500, 2)).astype(np.float32)
+
+    def test_same_as_sklearn(self):
+        for threshold in (0.3, 0.5, 0.8):
+            predicted = (self.__probabilities > threshold).astype(int)
+            expected_matrices = multilabel_confusion_matrix(self.__expected, predicted)
+            np.testing.assert_array_equal(expected_matrices,
+                                          model_evaluation.get_confusion_matrices(self.__expected, predicted))
+            swept = model_evaluation.sweep_thresholds(self.__expected, self.__probabilities, (0.3, 0.5, 0.8))
+            np.testing.assert_array_equal(expected_matrices, swept[threshold])
+
+            precision, recall, f1_score, support = precision_recall_fscore_support(self.__expected, predicted,
+                                                                                   zero_division=0)
+            metrics = model_evaluation.get_metrics_from_confusion_matrices(swept[threshold])
+            for label_index, name in enumerate(model_evaluation.LABEL_NAMES):
+                self.assertAlmostEqual(precision[label_index], metrics[name]["precision"])
+                self.assertAlmostEqual(recall[label_index], metrics[name]["recall"])
+                self.assertAlmostEqual(f1_score[label_index], metrics[name]["f1-score"])
+                self.assertEqual(support[label_index], metrics[name]["support"])
+            self.assertAlmostEqual(np.mean(self.__expected == predicted), metrics["accuracy"])
+
+    def test_evaluate(self):
+        metrics = model_evaluation.evaluate(self.__expected, self.__probabilities, (0.4, 0.6))
+        self.assertEqual([0.4, 0.6], list(metrics["thresholds"].keys()))
+        self.assertEqual((2, 2, 2), np.array(metrics["confusion_matrix"]).shape)
+        self.assertAlmostEqual(np.mean(self.__expected == (self.__probabilities > 0.5)), metrics["accuracy"])
+        self.assertIn("threshold 0.60", model_evaluation.format_metrics(metrics))
+        # Nothing predicted: the undefined precision is 0.
+        metrics = model_evaluation.evaluate(self.__expected, np.zeros((500, 2)))
+        self.assertEqual(0.0, metrics["BUY"]["precision"])
+
+    def test_binary_crossentropy(self):
+        import keras
+        expected_loss = keras.losses.BinaryCrossentropy()(self.__expected.astype(np.float32), self.__probabilities)
+        self.assertAlmostEqual(float(expected_loss),
+                               model_evaluation.get_binary_crossentropy(self.__expected, self.__probabilities),
+                               places=5)
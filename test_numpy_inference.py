@@ -0,0 +1,66 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+import keras
+
+from numpy_inference import NumpyInferenceModel
+
+
+class TestNumpyInferenceModel(TestCase):
+
+    @staticmethod
+    def __build_keras_model(input_length: int, activations: tuple) -> keras.Model:
+        keras.utils.set_random_seed(1)
+        layers = [keras.layers.Input(shape=(input_length,))]
+        for layer_index, activation in enumerate(activations):
+            layers.append(keras.layers.Dense(7 + layer_index, activation=activation))
+            layers.append(keras.layers.Dropout(0.1))
+        layers.append(keras.layers.Dense(2, activation="softmax"))
+        return keras.Sequential(layers)
+
+    def test_parity_with_keras(self):
+        features = np.random.default_rng(0).normal(scale=3.0, size=(64, 11)).astype(np.float32)
+        model = self.__build_keras_model(11, ("relu", "leaky_relu", "sigmoid", "tanh", "elu", "selu", "linear"))
+        expected = model.predict(features, verbose=0)
+
+        numpy_model = NumpyInferenceModel.from_keras_model(model)
+        self.assertEqual(11, numpy_model.get_input_length())
+        self.assertEqual(2, numpy_model.get_output_length())
+        np.testing.assert_allclose(expected, numpy_model.predict(features), atol=1e-5)
+        for row_index in range(3):
+            np.testing.assert_allclose(expected[row_index], numpy_model.predict_row(features[row_index]), atol=1e-5)
+
+    def test_export_load(self):
+        features = np.random.default_rng(1).normal(size=(5, 4)).astype(np.float32)
+        model = self.__build_keras_model(4, ("relu",))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = NumpyInferenceModel.export_keras_model(model, os.path.join(directory, "model.npz"))
+            numpy_model = NumpyInferenceModel.load(file_name)
+        np.testing.assert_allclose(model.predict(features, verbose=0), numpy_model.predict(features), atol=1e-5)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            NumpyInferenceModel([(np.ones((3, 2)), np.zeros(2), "gelu")])
+        with self.assertRaises(ValueError):
+            # The second layer doesn't take 2 inputs.
+            NumpyInferenceModel([(np.ones((3, 2)), np.zeros(2), "relu"), (np.ones((3, 1)), np.zeros(1), "relu")])
+        model = keras.Sequential([keras.layers.Input(shape=(4,)), keras.layers.BatchNormalization(),
+                                  keras.layers.Dense(2)])
+        with self.assertRaises(ValueError):
+            NumpyInferenceModel.from_keras_model(model)
+
+    def test_multi_head_export(self):
+        import keras_models
+        keras.utils.set_random_seed(2)
+        features = np.random.default_rng(2).normal(size=(9, 6)).astype(np.float32)
+        model = keras_models.get_model_prototype_multi_head(6, 2, 3)
+        expected = model.predict(features, verbose=0)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = NumpyInferenceModel.export_keras_model(model, os.path.join(directory, "model.npz"))
+            numpy_model = NumpyInferenceModel.load(file_name)
+        self.assertEqual(3, numpy_model.get_heads_count())
+        for head_index in range(3):
+            np.testing.assert_allclose(expected[head_index], numpy_model.predict(features, head_index), atol=1e-5)
+            np.testing.assert_allclose(expected[head_index][0], numpy_model.predict_row(features[0], head_index),
+                                       atol=1e-5)
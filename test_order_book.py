@@ -1,9 +1,19 @@
+import os
+import tempfile
 from unittest import TestCase
+import numpy as np
 
 import constants
+import indicators_set_up
 import enum_classes
+from indicator_bollinger_bands import IndicatorBollingerBands
+from indicator_money_flow_index import IndicatorMoneyFlowIndex
+from indicator_registry import IndicatorRegistry
 from order_book import OrderBook
+from order_book_dukaskopy import OrderBookDukascopy
 from order_book_high_freq_fx import OrderBookHighFreqFx
+from profiler import Profiler
+from quote import Quote
 from quotes_reader import QuotesReader
 
 
@@ -189,3 +199,79 @@ class TestOrderBook(TestCase):
 
         best_quote = test_order_book.get_best_price(False)
         self.assertEqual(118.600, best_quote)
+
+    def test_market_state(self):
+        eur, usd = enum_classes.EnumCcy.EUR, enum_classes.EnumCcy.USD
+        for test_order_book in (OrderBookHighFreqFx(enum_classes.EnumPair.EURUSD),
+                                OrderBookDukascopy(enum_classes.EnumPair.EURUSD)):
+            market_state = test_order_book.get_market_state()
+            test_order_book.incoming_quote(Quote(1, eur, usd, 0, 0, 1000.00, 0.00, 0.00, 1.1000, True))
+            self.assertTrue(market_state.has_bid())
+            self.assertFalse(market_state.has_offer())
+            self.assertTrue(market_state.is_bid_changed())
+            self.assertFalse(market_state.is_offer_changed())
+            self.assertEqual(test_order_book.get_best_price(False), market_state.get_best_offer())
+
+            test_order_book.incoming_quote(Quote(2, eur, usd, 1, 1, 2000.00, 0.00, 0.00, 1.1002, False))
+            self.assertIs(market_state, test_order_book.get_market_state())
+            self.assertEqual(test_order_book.get_best_price(True), market_state.get_best_bid())
+            self.assertEqual(test_order_book.get_best_price(False), market_state.get_best_offer())
+            self.assertAlmostEqual(1.1001, market_state.get_mid())
+            self.assertAlmostEqual(0.0002, market_state.get_spread())
+            self.assertEqual(1000.00, market_state.get_bid_amount())
+            self.assertEqual(2000.00, market_state.get_offer_amount())
+            self.assertFalse(market_state.is_bid_changed())
+            self.assertTrue(market_state.is_offer_changed())
+            self.assertTrue(market_state.is_mid_changed())
+
+            test_order_book.clear_orderbook()
+            self.assertFalse(market_state.has_bid())
+            self.assertEqual(0.0, market_state.get_mid())
+
+    def test_book_calls_saved(self):
+        eur, usd = enum_classes.EnumCcy.EUR, enum_classes.EnumCcy.USD
+        test_order_book = OrderBookDukascopy(enum_classes.EnumPair.EURUSD)
+        test_order_book.set_indicators((IndicatorBollingerBands(), IndicatorMoneyFlowIndex()))
+        self.assertEqual(8, test_order_book.get_book_calls_saved())
+        profiler = Profiler("test", enabled=True)
+        test_order_book.set_profiler(profiler)
+        test_order_book.incoming_quote(Quote(1, eur, usd, 0, 0, 1000.00, 0.00, 0.00, 1.1000, True))
+        test_order_book.incoming_quote(Quote(2, eur, usd, 1, 1, 1000.00, 0.00, 0.00, 1.1002, False))
+        self.assertEqual(16, profiler.get_report()["counters"][Profiler.BOOK_CALLS_SAVED])
+
+    def test_state_round_trip(self):
+        eur, usd = enum_classes.EnumCcy.EUR, enum_classes.EnumCcy.USD
+        rng = np.random.default_rng(0)
+        quotes = [Quote(index, eur, usd, index, index, float(rng.choice([1e5, 1e6])), 0.00, 0.00,
+                        1.1 + rng.normal() * 1e-3, index % 2 == 0) for index in range(1200)]
+        for book_class in (OrderBookHighFreqFx, OrderBookDukascopy):
+            test_order_book = book_class(enum_classes.EnumPair.EURUSD)
+            test_order_book.set_indicators(IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS))
+            for quote in quotes[:600]:
+                test_order_book.incoming_quote(quote)
+            with tempfile.TemporaryDirectory() as directory:
+                checkpoint_path = os.path.join(directory, "checkpoints", "book.ckpt")
+                OrderBook.store_checkpoint(test_order_book.get_state(), checkpoint_path)
+                state = OrderBook.load_checkpoint(checkpoint_path)
+
+            # A new book with cold indicators continues exactly where the first one stopped.
+            resumed_order_book = book_class()
+            resumed_order_book.set_indicators(IndicatorRegistry.create_indicators(indicators_set_up.INDICATOR_SPECS))
+            resumed_order_book.set_state(state)
+            self.assertEqual(enum_classes.EnumPair.EURUSD, resumed_order_book.get_ccy_pair())
+            self.assertEqual(test_order_book.get_quotes_count(), resumed_order_book.get_quotes_count())
+            for each_indicator in resumed_order_book.get_indicators():
+                self.assertTrue(each_indicator.is_ready())
+            for quote in quotes[600:]:
+                test_order_book.incoming_quote(quote)
+                resumed_order_book.incoming_quote(quote)
+                self.assertEqual([each_indicator.get_current_value()
+                                  for each_indicator in test_order_book.get_indicators()],
+                                 [each_indicator.get_current_value()
+                                  for each_indicator in resumed_order_book.get_indicators()])
+
+            other_order_book = book_class()
+            other_order_book.set_indicators((IndicatorBollingerBands(),) * len(indicators_set_up.INDICATOR_SPECS))
+            with self.assertRaises(ValueError):
+                other_order_book.set_state(state)
+
@@ -0,0 +1,44 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+
+import parallel_tuning
+
+
+class TestParallelTuning(TestCase):
+
+    def test_threads_budget(self):
+        self.assertEqual(3, parallel_tuning.get_threads_budget(4, 3))
+        self.assertEqual(max(1, (os.cpu_count() or 1) // 2), parallel_tuning.get_threads_budget(2))
+        self.assertEqual(1, parallel_tuning.get_threads_budget(10 * (os.cpu_count() or 1)))
+
+    def test_memory_mapped_dataset(self):
+        features = np.arange(12, dtype=np.float64).reshape(4, 3)
+        labels = np.array([[0, 1], [1, 0], [0, 0], [1, 1]])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = parallel_tuning.store_dataset(directory, train_features=features, train_labels=labels)
+            dataset = parallel_tuning.load_dataset(paths)
+            self.assertIsInstance(dataset["train_features"], np.memmap)
+            self.assertEqual(np.float32, dataset["train_features"].dtype)
+            np.testing.assert_array_equal(features, dataset["train_features"])
+            np.testing.assert_array_equal(labels, dataset["train_labels"])
+            self.assertFalse(dataset["train_labels"].flags.writeable)
+            del dataset
+
+    def test_streamed_dataset(self):
+        from tensorflow.data import Dataset
+        features = np.arange(30, dtype=np.float64).reshape(10, 3)
+        labels = np.arange(20).reshape(10, 2) % 2
+        with tempfile.TemporaryDirectory() as directory:
+            paths = parallel_tuning.store_dataset_batches(directory, Dataset.from_tensor_slices((features, labels))
+                                                          .batch(4), "train_features", "train_labels")
+            empty_paths = parallel_tuning.store_dataset_batches(directory, Dataset.from_tensor_slices(
+                (features[:0], labels[:0])).batch(4), "test_features", "test_labels")
+            dataset = parallel_tuning.load_dataset(paths)
+            self.assertIsInstance(dataset["train_features"], np.memmap)
+            self.assertEqual(np.float32, dataset["train_labels"].dtype)
+            np.testing.assert_array_equal(features, dataset["train_features"])
+            np.testing.assert_array_equal(labels, dataset["train_labels"])
+            self.assertEqual(0, len(parallel_tuning.load_dataset(empty_paths)["test_features"]))
+            del dataset
@@ -0,0 +1,69 @@
+from unittest import TestCase
+import random
+
+import constants
+from enum_classes import EnumPair
+from feature_to_label_collection import FeatureToLabelCollection
+from position import Position
+from price_scale import PriceScale
+
+
+class TestPriceScale(TestCase):
+
+    def test_parse_units(self):
+        scale = PriceScale(5)
+        self.assertEqual(110234, scale.parse_units("1.10234"))
+        self.assertEqual(110234, scale.parse_units(b"1.10234"))
+        self.assertEqual(110230, scale.parse_units("1.1023"))
+        self.assertEqual(100000, scale.parse_units("1"))
+        self.assertEqual(110235, scale.parse_units("1.102345"))
+        self.assertEqual(110234, scale.parse_units("1.102344"))
+        self.assertEqual(15123, PriceScale(3).parse_units("15.123\n"))
+
+    def test_for_pair(self):
+        self.assertEqual(PriceScale(3), PriceScale.for_pair(EnumPair.USDJPY))
+        self.assertEqual(PriceScale(constants.PRICE_ROUND_PRECISION), PriceScale.for_pair(EnumPair.EURUSD))
+        with self.assertRaises(ValueError):
+            PriceScale(-1)
+
+    def test_round_trip(self):
+        scale = PriceScale(5)
+        for units in range(109000, 111000, 7):
+            price = scale.to_price(units)
+            self.assertEqual(units, scale.to_units(price))
+            self.assertEqual(units, scale.parse_units("{:.5f}".format(price)))
+
+    def test_position(self):
+        # Same position with fixed-point prices as with float prices.
+        scale = PriceScale(5)
+        prices = ((110000, 110010), (109990, 110000), (110020, 110030), (110150, 110160))
+        for is_long in (True, False):
+            position = Position(is_long, scale.to_price(prices[0][0]), scale.to_price(prices[0][1]), 0)
+            fixed_position = Position(is_long, prices[0][0], prices[0][1], 0, scale)
+            for timestamp, (bid, offer) in enumerate(prices[1:], 1):
+                position.actualize(scale.to_price(bid), scale.to_price(offer), timestamp)
+                fixed_position.actualize(bid, offer, timestamp)
+            self.assertEqual(scale.to_price(prices[0][1] if is_long else prices[0][0]),
+                             fixed_position.get_opening_price())
+            self.assertEqual(position.is_position_closed(), fixed_position.is_position_closed())
+            self.assertEqual(scale.to_units(position.get_closing_price()),
+                             scale.to_units(fixed_position.get_closing_price()))
+            self.assertEqual(scale.to_units(position.get_position_pnl()),
+                             scale.to_units(fixed_position.get_position_pnl()))
+
+    def test_labels(self):
+        # Same labels with fixed-point prices as with float prices.
+        scale = PriceScale(5)
+        price_deltas = (0.0005, 0.0010)
+        collection = FeatureToLabelCollection(20, price_deltas, capacity=4)
+        fixed_collection = FeatureToLabelCollection(20, price_deltas, capacity=4, price_scale=scale)
+        generator = random.Random(3)
+        bid = 110000
+        for timestamp in range(1000):
+            bid += generator.randint(-3, 3)
+            offer = bid + generator.randint(1, 4)
+            collection.put(timestamp, scale.to_price(bid), scale.to_price(offer), (timestamp,))
+            collection.check_profit_levels_on_active_cells(timestamp, scale.to_price(bid), scale.to_price(offer))
+            fixed_collection.put(timestamp, bid, offer, (timestamp,))
+            fixed_collection.check_profit_levels_on_active_cells(timestamp, bid, offer)
+        self.assertEqual(collection.get_ready_calculations(), fixed_collection.get_ready_calculations())
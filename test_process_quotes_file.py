@@ -1,9 +1,15 @@
+import os
+import tempfile
 from unittest import TestCase
+import numpy as np
 import constants
+import indicators_set_up
 from enum_classes import EnumPair, EnumOrderBook
 from indicator_best_bid_offer_variance import IndicatorBestBidOfferVariance
 from indicator_quantity_of_quotes_in_book import IndicatorQuantityOfQuotesInBook
 from process_quotes_file import ProcessQuotesFile
+from run_configuration import RunConfiguration
+from synthetic_quotes_generator import SyntheticQuotesGenerator
 
 
 class TestProcessQuotesFile(TestCase):
@@ -24,3 +30,72 @@ class TestProcessQuotesFile(TestCase):
 
         self.assertIsNotNone(processor.get_features_labels())
 
+    def test_warm_start(self):
+        order_book_type = constants.ORDER_BOOK_TYPE
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.DUKASKOPY
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                file_names = [os.path.join(directory, "day_{}.csv".format(day)) for day in range(2)]
+                for day, file_name in enumerate(file_names):
+                    SyntheticQuotesGenerator(day).generate_dukascopy(file_name, 600)
+                # Short lookback: the rows of the ~15 s files get their labels.
+                lookback_time = 2 * constants.NANOS_IN_ONE_SECOND
+                first_day = ProcessQuotesFile(file_names[0], constants.PROFIT_LEVELS, lookback_time)
+                first_day.start_process(indicators_set_up.INDICATOR_SPECS, EnumPair.OTHER)
+                cold_second_day = ProcessQuotesFile(file_names[1], constants.PROFIT_LEVELS, lookback_time)
+                cold_second_day.start_process(indicators_set_up.INDICATOR_SPECS, EnumPair.OTHER)
+                second_day = ProcessQuotesFile(file_names[1], constants.PROFIT_LEVELS, lookback_time)
+                second_day.start_process(indicators_set_up.INDICATOR_SPECS, EnumPair.OTHER,
+                                         first_day.get_order_book_state())
+        finally:
+            constants.ORDER_BOOK_TYPE = order_book_type
+        # The chained day has no warm-up: it keeps more rows than the cold one.
+        self.assertLess(len(cold_second_day.get_features_labels()[1]), len(second_day.get_features_labels()[1]))
+        self.assertFalse(np.isnan(second_day.get_features_labels()[1]).any())
+
+    def test_run_configurations(self):
+        order_book_type = constants.ORDER_BOOK_TYPE
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.DUKASKOPY
+        configurations = (RunConfiguration("lb_2s", 2 * constants.NANOS_IN_ONE_SECOND, constants.EACH_STEP_TIMER,
+                                           constants.PROFIT_LEVELS),
+                          RunConfiguration("lb_1s", constants.NANOS_IN_ONE_SECOND, 300 * constants.NANOS_IN_ONE_MILLIS,
+                                           (0.00005, 0.0001)))
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, "day.csv")
+                SyntheticQuotesGenerator(0).generate_dukascopy(file_name, 600)
+                processor = ProcessQuotesFile(file_name, constants.PROFIT_LEVELS, 0, configurations)
+                processor.start_process(indicators_set_up.INDICATOR_SPECS, EnumPair.OTHER)
+                # Each configuration gives the same result as its own pass over the file.
+                separate_results = []
+                for configuration in configurations:
+                    separate_processor = ProcessQuotesFile(file_name, constants.PROFIT_LEVELS, 0, (configuration,))
+                    separate_processor.start_process(indicators_set_up.INDICATOR_SPECS, EnumPair.OTHER)
+                    separate_results.append(separate_processor.get_features_labels())
+        finally:
+            constants.ORDER_BOOK_TYPE = order_book_type
+        results = processor.get_features_labels_per_configuration()
+        self.assertEqual(2, len(results))
+        self.assertIs(results[0], processor.get_features_labels())
+        self.assertEqual(2, len(results[1][0]))
+        self.assertLess(len(results[1][1]), len(results[0][1]))
+        for (labels, features), (separate_labels, separate_features) in zip(results, separate_results):
+            self.assertGreater(len(features), 0)
+            self.assertEqual(separate_labels, labels)
+            np.testing.assert_array_equal(separate_features, features)
+
+    def test_drop_warm_up_rows(self):
+        labels = [[[False, False], [True, False], [False, True]], [[False, False], [False, False], [True, True]]]
+        features = np.array([[np.nan, 1.0], [2.0, 3.0], [4.0, 5.0]], dtype=np.float32)
+        validity_masks = np.array([0b10, 0b11, 0b11], dtype=np.uint64)
+        labels, features = ProcessQuotesFile.drop_warm_up_rows(labels, features, validity_masks, 0b11)
+
+        self.assertEqual((2, 2), features.shape)
+        self.assertEqual(np.float32, features.dtype)
+        self.assertEqual([[True, False], [False, True]], labels[0])
+        self.assertEqual([[False, False], [True, True]], labels[1])
+        self.assertEqual([2.0, 3.0], features[0].tolist())
+
+        labels, features = ProcessQuotesFile.drop_warm_up_rows([[], []], np.empty((0, 2), dtype=np.float32),
+                                                               np.empty(0, dtype=np.uint64), 0b11)
+        self.assertEqual((0, 2), features.shape)
@@ -0,0 +1,51 @@
+import tempfile
+from unittest import TestCase
+
+from profiler import Profiler
+
+
+class TestProfiler(TestCase):
+
+    def test_disabled(self):
+        profiler = Profiler("disabled", enabled=False)
+        with profiler.measure(Profiler.NORMALIZATION):
+            pass
+        profiler.count("quotes")
+        report = profiler.get_report()
+        self.assertEqual({}, report["stages"])
+        self.assertEqual({}, report["counters"])
+        self.assertIsNone(profiler.store_report("disabled.json"))
+
+    def test_enabled(self):
+        profiler = Profiler("enabled", enabled=True)
+        profiler.add_time(Profiler.ORDER_BOOK, 100)
+        profiler.add_time(Profiler.ORDER_BOOK, 300)
+        # Far above the measured STORAGE time.
+        profiler.add_time(Profiler.READ_PARSE, 4 * 10 ** 9, calls=4)
+        with profiler.measure(Profiler.STORAGE):
+            pass
+        profiler.count("quotes", 4)
+        report = profiler.get_report()
+        # The most expensive stage comes first.
+        self.assertEqual(Profiler.READ_PARSE, list(report["stages"])[0])
+        self.assertEqual({"total_ns": 400, "calls": 2, "mean_ns": 200}, report["stages"][Profiler.ORDER_BOOK])
+        self.assertEqual(10 ** 9, report["stages"][Profiler.READ_PARSE]["mean_ns"])
+        self.assertEqual(1, report["stages"][Profiler.STORAGE]["calls"])
+        self.assertEqual({"quotes": 4}, report["counters"])
+
+    def test_store_load_aggregate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(2):
+                profiler = Profiler("file_{}".format(i), enabled=True)
+                profiler.add_time(Profiler.ORDER_BOOK, 10 * (i + 1))
+                profiler.count("quotes", 5)
+                profiler.store_report("features_{}.json".format(i), directory)
+            aggregated_report = Profiler.aggregate_reports(Profiler.load_reports("features_", directory))
+            Profiler.store(aggregated_report, "features_all.json", directory)
+            # The aggregated report is not loaded again.
+            self.assertEqual(2, len(Profiler.load_reports("features_", directory)))
+
+        self.assertEqual(2, aggregated_report["reports_count"])
+        self.assertEqual({"total_ns": 30, "calls": 2, "mean_ns": 15},
+                         aggregated_report["stages"][Profiler.ORDER_BOOK])
+        self.assertEqual({"quotes": 10}, aggregated_report["counters"])
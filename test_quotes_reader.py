@@ -1,8 +1,13 @@
+import os
+import tempfile
+from datetime import datetime
 from unittest import TestCase
 
-from enum_classes import EnumPair
+import constants
+from enum_classes import EnumPair, EnumOrderBook
 from quotes_reader import QuotesReader
 from quote import Quote
+from synthetic_quotes_generator import SyntheticQuotesGenerator
 
 
 class TestQuotesReader(TestCase):
@@ -60,3 +65,99 @@ class TestQuotesReader(TestCase):
             next_quote = reader.read_line()
 
         self.assertEqual(1096, len(list_of_quotes))
+
+    def test_fast_path_rejects(self):
+        """
+        Malformed lines of the monitored pair are counted as rejected. The audit mode catches the lines that the fast
+        path would accept.
+        """
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.HIGH_FREQ_FX
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "quotes.csv")
+            written_count = SyntheticQuotesGenerator(3).generate_high_freq_fx(file_name, 100)
+            with open(file_name, 'a') as open_pointer:
+                # Wrong field count, wrong way, not a number, accepted by the fast path only, other pair.
+                open_pointer.write("N;1-1--1;EUR/USD;10;10;1000000.00;0.00;0.00;1.10000;B\n")
+                open_pointer.write("N;1-1--1;EUR/USD;10;10;1000000.00;0.00;0.00;1.10000;X;0\n")
+                open_pointer.write("N;1-1--1;EUR/USD;10;10;1000000.00;0.00;0.00;1.1x000;B;0\n")
+                open_pointer.write("N;1-1--1;EUR/USD;10;10;1e6;0.00;0.00;1.10000;B;0\n")
+                open_pointer.write("N;1-1--1;EUR/JPY;10;10;1000000.00;0.00;0.00;118.000;B;0")
+
+            reader = QuotesReader(file_name, EnumPair.EURUSD, audit_every=0)
+            quotes_count = 0
+            while reader.read_line() is not None:
+                quotes_count += 1
+            self.assertEqual(written_count + 1, quotes_count)
+            self.assertEqual(3, reader.get_rejected_lines_count())
+            self.assertEqual(written_count + 5, reader.get_lines_count())
+
+            reader = QuotesReader(file_name, EnumPair.EURUSD, audit_every=1)
+            quotes_count = 0
+            while reader.read_line() is not None:
+                quotes_count += 1
+            self.assertEqual(written_count, quotes_count)
+            self.assertEqual(4, reader.get_rejected_lines_count())
+            # The audit runs before the conversion: the "not a number" line fails it too.
+            self.assertEqual(2, reader.get_audit_failures_count())
+
+    def test_dukascopy_decoding(self):
+        """
+        Each line is decoded once into the Bid and the Offer quotes. The cached date epoch and the vectorized batch
+        path give the same times as strptime.
+        """
+        previous_order_book_type = constants.ORDER_BOOK_TYPE
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.DUKASKOPY
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, "quotes.csv")
+                written_count = SyntheticQuotesGenerator(3).generate_dukascopy(file_name, 100)
+                with open(file_name, 'a') as open_pointer:
+                    # Next day, then an invalid date and an invalid time.
+                    open_pointer.write("01.01.2025 00:00:00.007,1.10010,1.10000,1.50,2.50\n")
+                    open_pointer.write("32.01.2025 00:00:00.007,1.10010,1.10000,1.50,2.50\n")
+                    open_pointer.write("01.01.2025 24:00:00.007,1.10010,1.10000,1.50,2.50\n")
+                with open(file_name) as open_pointer:
+                    time_fields = [line.split(",")[0] for line in open_pointer.readlines()[1:-2]]
+                expected_times = [(datetime.strptime(time_field, '%d.%m.%Y %H:%M:%S.%f') - datetime(1970, 1, 1))
+                                  .total_seconds() * 1000 for time_field in time_fields]
+                expected_times = [round(milliseconds) * constants.NANOS_IN_ONE_MILLIS
+                                  for milliseconds in expected_times]
+
+                reader = QuotesReader(file_name, EnumPair.OTHER)
+                # As before the line was decoded once: the Bid first, then the Offer after a Bid was read.
+                line = "01.01.2025 00:00:00.007,1.10010,1.10000,1.50,2.50\n"
+                self.assertTrue(reader.deserialize_quote(line).get_way())
+                self.assertTrue(reader.read_line().get_way())
+                self.assertFalse(reader.deserialize_quote(line).get_way())
+                reader = QuotesReader(file_name, EnumPair.OTHER)
+                quotes = []
+                next_quote: Quote = reader.read_line()
+                while next_quote is not None:
+                    quotes.append(next_quote)
+                    next_quote = reader.read_line()
+                self.assertEqual(written_count + 2, len(quotes))
+                self.assertEqual(2, reader.get_rejected_lines_count())
+                self.assertEqual([True, False] * (len(quotes) // 2), [quote.get_way() for quote in quotes])
+                self.assertEqual(expected_times, [quote.get_local_timestamp() for quote in quotes[::2]])
+                self.assertEqual(expected_times, [quote.get_local_timestamp() for quote in quotes[1::2]])
+                self.assertEqual((1.1001, 1.1, 1.5, 2.5), (quotes[-2].get_price(), quotes[-1].get_price(),
+                                                           quotes[-2].get_amount(), quotes[-1].get_amount()))
+
+                self.assertEqual(expected_times, QuotesReader.decode_dukascopy_times(time_fields).tolist())
+                with self.assertRaises(ValueError):
+                    QuotesReader.decode_dukascopy_times(["32.01.2025 00:00:00.007"])
+                # Longer times are rejected, not truncated.
+                with self.assertRaises(ValueError):
+                    QuotesReader.decode_dukascopy_times(["01.01.2025 00:00:00.0071"])
+                with self.assertRaises(ValueError):
+                    QuotesReader.decode_dukascopy_times(["01-01-2025 00:00:00.007"])
+                with open(file_name) as open_pointer:
+                    valid_lines = open_pointer.readlines()[:-2]
+                with open(file_name, 'w') as open_pointer:
+                    open_pointer.writelines(valid_lines)
+                times, bid_prices, offer_prices, bid_amounts, offer_amounts = QuotesReader.load_dukascopy(file_name)
+                self.assertEqual(expected_times, times.tolist())
+                self.assertEqual([quote.get_price() for quote in quotes[::2]], bid_prices.tolist())
+                self.assertEqual([quote.get_amount() for quote in quotes[1::2]], offer_amounts.tolist())
+        finally:
+            constants.ORDER_BOOK_TYPE = previous_order_book_type
@@ -0,0 +1,62 @@
+from unittest import TestCase
+import numpy as np
+
+import recursive_kernels
+from enum_classes import EnumCcy, EnumPair
+from indicator_parabolic_stop_reverse import IndicatorSAR
+from indicator_RSI import IndicatorRSI
+from indicator_VPVMA import IndicatorVPVMA
+from order_book_dukaskopy import OrderBookDukascopy
+from quote import Quote
+
+
+class TestRecursiveKernels(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.__prices = 1.1 + np.cumsum(rng.normal(size=400) * 1e-4)
+
+    def __replay(self, each_indicator) -> tuple:
+        # One quote per price, alternately on each side of the book.
+        order_book = OrderBookDukascopy(EnumPair.EURUSD)
+        order_book.set_indicators((each_indicator,))
+        values = []
+        mids = []
+        for index, price in enumerate(self.__prices.tolist()):
+            order_book.incoming_quote(Quote(index, EnumCcy.EUR, EnumCcy.USD, index, index, 1.0, 0.0, 0.0, price,
+                                            index % 2 == 0))
+            values.append(each_indicator.get_current_value())
+            mids.append(order_book.get_market_state().get_mid())
+        return values, np.array(mids)
+
+    def test_backend(self):
+        self.assertEqual("numba" if recursive_kernels.NUMBA_AVAILABLE else "python", recursive_kernels.get_backend())
+
+    def test_ema(self):
+        ema = recursive_kernels.ema_series(self.__prices, 12)
+        self.assertEqual(self.__prices[0], ema[0])
+        expected = self.__prices[0]
+        for price in self.__prices[1:].tolist():
+            expected = 2 / 13 * price + (1 - 2 / 13) * expected
+        self.assertEqual(expected, ema[-1])
+        self.assertEqual(expected, IndicatorVPVMA().calculate_ema(self.__prices.tolist(), 12))
+        self.assertIsNone(IndicatorVPVMA().calculate_ema([1.0], 12))
+        self.assertEqual(0, len(recursive_kernels.ema_series(np.empty(0), 12)))
+
+    def test_wilder(self):
+        changes = np.abs(np.diff(self.__prices))
+        smoothed = recursive_kernels.wilder_sum_series(changes, 14)
+        self.assertTrue(np.isnan(smoothed[12]))
+        expected = sum(changes[:14].tolist())
+        self.assertEqual(expected, smoothed[13])
+        for index in range(14, len(changes)):
+            expected = expected - (expected / 14) + changes[index]
+        self.assertEqual(expected, smoothed[-1])
+
+        # The RSI reads the price of each quote.
+        rsi, _ = self.__replay(IndicatorRSI(14))
+        np.testing.assert_array_equal(rsi, recursive_kernels.rsi_series(self.__prices, 14))
+
+    def test_sar(self):
+        sar, mids = self.__replay(IndicatorSAR(0.02, 0.2, -0.2))
+        np.testing.assert_array_equal(sar, recursive_kernels.sar_series(mids, 0.02, 0.2, -0.2))
@@ -0,0 +1,49 @@
+from unittest import TestCase
+import numpy as np
+
+from sliding_window_dataset import SlidingWindowDataset
+
+
+class TestSlidingWindowDataset(TestCase):
+
+    def setUp(self):
+        # Row i holds i in every feature. 2 files of 6 and 4 rows.
+        self.__features = np.repeat(np.arange(10, dtype=np.float32)[:, np.newaxis], 3, axis=1)
+        self.__labels = np.stack([np.arange(10) % 2, np.arange(10) % 3 == 0], axis=1).astype(np.float32)
+
+    def test_windows_within_files(self):
+        windows = SlidingWindowDataset(self.__features, self.__labels, 3, [6, 4])
+        # 4 windows in the 1st file, 2 in the 2nd: none spans the 2 files.
+        np.testing.assert_array_equal([0, 1, 2, 3, 6, 7], windows.get_window_starts())
+        np.testing.assert_array_equal([[6, 6, 6], [7, 7, 7], [8, 8, 8]], windows.get_window(4))
+        # The windows are views of the features.
+        self.assertTrue(np.shares_memory(self.__features, windows.get_window(0)))
+        np.testing.assert_array_equal(self.__labels[[2, 3, 4, 5, 8, 9]], windows.get_labels())
+        # A file shorter than the window has no window.
+        self.assertEqual(0, SlidingWindowDataset(self.__features, self.__labels, 5, [4, 4, 2]).get_windows_count())
+        with self.assertRaises(ValueError):
+            SlidingWindowDataset(self.__features, self.__labels, 3, [6, 3])
+
+    def test_split_and_batches(self):
+        windows = SlidingWindowDataset(self.__features, self.__labels, 2, [6, 4])
+        train_windows, test_windows = windows.split(0.25)
+        np.testing.assert_array_equal([0, 1, 2, 3, 4, 6], train_windows.get_window_starts())
+        np.testing.assert_array_equal([7, 8], test_windows.get_window_starts())
+        batches = list(train_windows.iterate_batches(4, shuffle=True, rng=np.random.default_rng(0)))
+        self.assertEqual([(4, 2, 3), (2, 2, 3)], [batch[0].shape for batch in batches])
+        window_batches = np.concatenate([batch[0] for batch in batches])
+        label_batches = np.concatenate([batch[1] for batch in batches])
+        # Each window ends with the row of its label.
+        self.assertEqual([1, 2, 3, 4, 5, 7], sorted(window_batches[:, -1, 0].astype(int).tolist()))
+        np.testing.assert_array_equal(self.__labels[window_batches[:, -1, 0].astype(int)], label_batches)
+        np.testing.assert_array_equal(window_batches[:, 0, 0] + 1, window_batches[:, 1, 0])
+
+    def test_sequence_models(self):
+        import keras_models
+        windows = SlidingWindowDataset(self.__features, self.__labels, 3, [6, 4])
+        for sequence_model in ("lstm", "conv1d"):
+            model = keras_models.get_model_prototype_sequence(3, 3, 2, sequence_model)
+            model.fit(windows.get_dataset(4, shuffle=True, seed=0), epochs=1, verbose=0)
+            self.assertEqual((6, 2), model.predict(windows.get_dataset(4), verbose=0).shape)
+        with self.assertRaises(ValueError):
+            keras_models.get_model_prototype_sequence(3, 3, 2, "transformer")
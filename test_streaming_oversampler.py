@@ -0,0 +1,46 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+
+from streaming_oversampler import StreamingOversampler
+
+
+class TestStreamingOversampler(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # 300 rows [0, 0], 60 rows [1, 0] around 5.0, 15 rows [0, 1] around -5.0, no [1, 1].
+        self.__labels = np.array([[0, 0]] * 300 + [[1, 0]] * 60 + [[0, 1]] * 15)
+        self.__features = np.concatenate([rng.normal(0.0, 1.0, (300, 4)), rng.normal(5.0, 0.1, (60, 4)),
+                                          rng.normal(-5.0, 0.1, (15, 4))]).astype(np.float32)
+
+    def test_balanced_epoch(self):
+        oversampler = StreamingOversampler(self.__features, self.__labels, k_neighbors=3, seed=1)
+        self.assertEqual(375, oversampler.get_rows_count())
+        self.assertEqual(240 + 285, oversampler.get_synthetic_rows_count())
+        batches = list(oversampler.iterate_batches(64))
+        self.assertEqual(6, len(batches))
+        features = np.concatenate([batch[0] for batch in batches])
+        labels = np.concatenate([batch[1] for batch in batches])
+        # Each class present has as many rows as the majority class, the synthetic rows stay within their class.
+        for label, center in (((0, 0), None), ((1, 0), 5.0), ((0, 1), -5.0)):
+            class_rows = np.all(labels == label, axis=1)
+            self.assertEqual(300, np.count_nonzero(class_rows))
+            if center is not None:
+                self.assertTrue(np.all(np.abs(features[class_rows] - center) < 1.0))
+        self.assertEqual(0, np.count_nonzero(np.all(labels == (1, 1), axis=1)))
+
+    def test_memory_map_and_dataset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "features.npy")
+            np.save(path, self.__features)
+            features = np.load(path, mmap_mode='r')
+            oversampler = StreamingOversampler(features, self.__labels, seed=2)
+            dataset = oversampler.get_dataset(100)
+            # Each epoch draws new synthetic rows.
+            epochs = [np.concatenate([features_batch for features_batch, _ in dataset.as_numpy_iterator()])
+                      for _ in range(2)]
+            del features
+        self.assertEqual((375 + 525, 4), epochs[0].shape)
+        self.assertFalse(np.array_equal(np.sort(epochs[0], axis=0), np.sort(epochs[1], axis=0)))
@@ -0,0 +1,80 @@
+import filecmp
+import os
+import tempfile
+from unittest import TestCase
+
+import constants
+from benchmark import Benchmark
+from enum_classes import EnumOrderBook, EnumPair
+from quotes_reader import QuotesReader
+from synthetic_quotes_generator import SyntheticQuotesGenerator
+
+
+class TestSyntheticQuotesGenerator(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__order_book_type = constants.ORDER_BOOK_TYPE
+
+    def tearDown(self):
+        constants.ORDER_BOOK_TYPE = self.__order_book_type
+        self.__directory.cleanup()
+
+    def __path(self, file_name: str) -> str:
+        return os.path.join(self.__directory.name, file_name)
+
+    def test_reproducible(self):
+        pairs_weights = {EnumPair.EURUSD: 3, EnumPair.USDJPY: 1}
+        SyntheticQuotesGenerator(7).generate_high_freq_fx(self.__path("first.csv"), 100, pairs_weights)
+        SyntheticQuotesGenerator(7).generate_high_freq_fx(self.__path("second.csv"), 100, pairs_weights)
+        SyntheticQuotesGenerator(8).generate_high_freq_fx(self.__path("other.csv"), 100, pairs_weights)
+        self.assertTrue(filecmp.cmp(self.__path("first.csv"), self.__path("second.csv"), shallow=False))
+        self.assertFalse(filecmp.cmp(self.__path("first.csv"), self.__path("other.csv"), shallow=False))
+
+    def test_read_high_freq_fx(self):
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.HIGH_FREQ_FX
+        written_count = SyntheticQuotesGenerator(1).generate_high_freq_fx(
+            self.__path("high_freq_fx.csv"), 200, {EnumPair.EURUSD: 1, EnumPair.USDJPY: 1})
+        # Only the USDJPY quotes are read.
+        reader = QuotesReader(self.__path("high_freq_fx.csv"), EnumPair.USDJPY)
+        quotes = []
+        quote = reader.read_line()
+        while quote is not None:
+            quotes.append(quote)
+            quote = reader.read_line()
+        self.assertLess(0, len(quotes))
+        self.assertLess(len(quotes), written_count)
+        for quote in quotes:
+            self.assertEqual(EnumPair.USDJPY, quote.get_pair())
+            self.assertAlmostEqual(145.0, quote.get_price(), delta=1.0)
+
+    def test_read_dukascopy(self):
+        constants.ORDER_BOOK_TYPE = EnumOrderBook.DUKASKOPY
+        written_count = SyntheticQuotesGenerator(1).generate_dukascopy(self.__path("dukascopy.csv"), 50)
+        reader = QuotesReader(self.__path("dukascopy.csv"), EnumPair.OTHER)
+        quotes = []
+        quote = reader.read_line()
+        while quote is not None:
+            quotes.append(quote)
+            quote = reader.read_line()
+        self.assertEqual(written_count, len(quotes))
+        # The reader alternates the two sides of each line.
+        self.assertEqual([True, False] * 50, [quote.get_way() for quote in quotes])
+        self.assertLess(quotes[0].get_local_timestamp(), quotes[-1].get_local_timestamp())
+
+
+class TestBenchmark(TestCase):
+
+    def test_run_store_compare(self):
+        results = Benchmark(steps=60, include_backtest=False).run()
+        self.assertIn("HIGH_FREQ_FX:quotes_reader", results["stages"])
+        self.assertIn("DUKASKOPY:order_book", results["stages"])
+        self.assertIn("storage_round_trip", results["stages"])
+        self.assertEqual(120, results["stages"]["DUKASKOPY:quotes_reader"]["items"])
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(Benchmark.load_previous_results(directory))
+            Benchmark.store_results(results, directory)
+            previous_results = Benchmark.load_previous_results(directory)
+        ratios = Benchmark.compare_results(results, previous_results)
+        self.assertEqual(set(results["stages"]), set(ratios))
+        self.assertAlmostEqual(1.0, ratios["storage_round_trip"])
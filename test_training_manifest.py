@@ -0,0 +1,157 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+
+import constants
+from common_utilities import CommonUtilities
+from enum_classes import EnumPair, EnumHyperParamsOptimization
+from features_labels_storage import FeaturesLabelsStorage
+from training_manifest import TrainingManifest
+
+
+class TestTrainingManifest(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    @staticmethod
+    def __get_rows(count: int, value: float) -> tuple:
+        # Labels of 2 profit levels.
+        return np.full((count, 3), value, dtype=np.float32), np.zeros((2, count, 2), dtype=bool)
+
+    def test_replay_sample(self):
+        manifest = TrainingManifest(self.__directory.name)
+        self.assertEqual((None, None), manifest.get_replay_sample())
+        manifest.add_trained_files(["a.pkl"], *self.__get_rows(300, 1.0), "a.keras", replay_size=100, seed=0)
+        manifest.add_trained_files(["b.pkl"], *self.__get_rows(100, 2.0), "b.keras", replay_size=100, seed=0)
+        manifest.store()
+
+        restored = TrainingManifest(self.__directory.name)
+        self.assertEqual(["a.pkl", "b.pkl"], restored.get_seen_files())
+        self.assertTrue(restored.is_seen("b.pkl"))
+        self.assertEqual(400, restored.get_seen_rows_count())
+        self.assertEqual("b.keras", restored.get_model_path())
+        features, labels = restored.get_replay_sample()
+        self.assertEqual((100, 2, 2), labels.shape)
+        # A uniform sample of the 400 seen rows: 3/4 of the first file.
+        self.assertEqual(75, np.count_nonzero(features[:, 0] == 1.0))
+        self.assertEqual(25, np.count_nonzero(features[:, 0] == 2.0))
+        # A new lineage ignores the stored manifest.
+        self.assertEqual([], TrainingManifest(self.__directory.name, restore=False).get_seen_files())
+
+    def test_lineage_filters(self):
+        manifest = TrainingManifest(self.__directory.name, restore=False, ccy_pair=EnumPair.EURUSD,
+                                    file_name_base="2024-01-02-00-00")
+        manifest.add_trained_files(["2024-01-02-00-00_0.pkl"], *self.__get_rows(10, 1.0), "a.keras")
+        manifest.store()
+
+        restored = TrainingManifest(self.__directory.name)
+        self.assertEqual(EnumPair.EURUSD, restored.get_ccy_pair())
+        self.assertEqual("2024-01-02-00-00", restored.get_file_name_base())
+        self.assertFalse(restored.is_new_file("2024-01-02-00-00_0.pkl"))
+        self.assertTrue(restored.is_new_file("2024-01-02-00-00_1.pkl"))
+        self.assertTrue(restored.is_new_file("2024-01-03-00-00_0.pkl"))
+        # Older calculations were never read by the full training.
+        self.assertFalse(restored.is_new_file("2024-01-01-00-00_0.pkl"))
+        self.assertTrue(restored.is_lineage_ccy_pair(EnumPair.EURUSD))
+        self.assertFalse(restored.is_lineage_ccy_pair(EnumPair.GBPUSD))
+        # Without filters: all the pairs and bases.
+        self.assertTrue(TrainingManifest(self.__directory.name, restore=False).is_lineage_ccy_pair(EnumPair.GBPUSD))
+
+
+class TestIncrementalTraining(TestCase):
+
+    __CONSTANTS = ("FEATURES_LABELS_PATH", "MODELS_PATH", "HYPERPARAMETERS_OPTIMIZATION", "EPOCHS_COUNT",
+                   "INCREMENTAL_EPOCHS_COUNT", "DEBUG")
+
+    def setUp(self):
+        self.__constants = {name: getattr(constants, name) for name in TestIncrementalTraining.__CONSTANTS}
+        self.__working_directory = os.getcwd()
+        self.__directory = tempfile.TemporaryDirectory()
+        os.chdir(self.__directory.name)
+        os.makedirs("features_labels")
+        constants.FEATURES_LABELS_PATH = "features_labels"
+        constants.MODELS_PATH = "model"
+        constants.HYPERPARAMETERS_OPTIMIZATION = EnumHyperParamsOptimization.NONE
+        constants.EPOCHS_COUNT = 1
+        constants.INCREMENTAL_EPOCHS_COUNT = 1
+        constants.DEBUG = False
+
+    def tearDown(self):
+        for name, value in self.__constants.items():
+            setattr(constants, name, value)
+        os.chdir(self.__working_directory)
+        self.__directory.cleanup()
+
+    @staticmethod
+    def __store_features_labels(stored_file_name: str, seed: int, ccy_pair: EnumPair = EnumPair.EURUSD,
+                                directory_base: str = "features_labels") -> None:
+        rng = np.random.default_rng(seed)
+        labels = [rng.integers(0, 2, size=(120, 2)).astype(bool).tolist() for _ in range(3)]
+        features = rng.normal(size=(120, 5)).astype(np.float32)
+        FeaturesLabelsStorage.store_ready_features_labels([labels, features], ("quotes.csv", stored_file_name),
+                                                          ((), (1, 2, 3), ccy_pair), directory_base)
+
+    def test_run_incremental(self):
+        import train_network
+        file_name_base = CommonUtilities.generate_file_name_base(".pkl")
+        self.__store_features_labels(file_name_base.format(0), 0)
+        # No model yet: full training, which starts the manifest.
+        first_report = train_network.run_incremental(ccy_pair=EnumPair.EURUSD)
+        self.assertEqual([file_name_base.format(0)], TrainingManifest("model").get_seen_files())
+        self.assertEqual(first_report["model_path"], train_network.get_most_recent_model_path("model"))
+        self.assertIsNone(train_network.run_incremental())
+
+        self.__store_features_labels(file_name_base.format(1), 1)
+        # Another pair: not a file of the EUR/USD lineage.
+        self.__store_features_labels(file_name_base.format(2), 2, EnumPair.GBPUSD)
+        report = train_network.run_incremental()
+        self.assertEqual(first_report["model_path"], report["previous_model_path"])
+        self.assertEqual([file_name_base.format(1)], report["new_files"])
+        self.assertIn(0, report["profit_levels"])
+        manifest = TrainingManifest("model")
+        self.assertEqual(240, manifest.get_seen_rows_count())
+        self.assertEqual(report["model_path"], manifest.get_model_path())
+        self.assertEqual(report["model_path"], train_network.get_most_recent_model_path("model"))
+
+    def test_run_incremental_empty_file(self):
+        import train_network
+        file_name_base = CommonUtilities.generate_file_name_base(".pkl")
+        self.__store_features_labels(file_name_base.format(0), 0)
+        first_report = train_network.run_incremental()
+        replay_rows_count = len(TrainingManifest("model").get_replay_sample()[0])
+        # A short day: all its rows were dropped by the warm-up.
+        FeaturesLabelsStorage.store_ready_features_labels([[[], [], []], np.empty((0, 5), dtype=np.float32)],
+                                                          ("quotes.csv", file_name_base.format(1)),
+                                                          ((), (1, 2, 3), EnumPair.EURUSD), "features_labels")
+        self.assertIsNone(train_network.run_incremental())
+        manifest = TrainingManifest("model")
+        self.assertTrue(manifest.is_seen(file_name_base.format(1)))
+        self.assertFalse(manifest.is_new_file(file_name_base.format(1)))
+        self.assertEqual(120, manifest.get_seen_rows_count())
+        self.assertEqual(replay_rows_count, len(manifest.get_replay_sample()[0]))
+        self.assertEqual(first_report["model_path"], manifest.get_model_path())
+
+    def test_run_incremental_sequence_model(self):
+        import keras_models
+        import train_network
+        os.makedirs("model")
+        keras_models.get_model_prototype_sequence(4, 5, 2, "lstm").save(
+            os.path.join("model", CommonUtilities.generate_file_name_base(".keras").format(0)))
+        with self.assertRaises(ValueError):
+            train_network.run_incremental()
+
+    def test_run_configuration_folder(self):
+        import train_network
+        # The features and labels of a run configuration (see RunConfiguration), in their own folder.
+        configuration_path = os.path.join("features_labels", "lb_60s")
+        os.makedirs(configuration_path)
+        self.__store_features_labels(CommonUtilities.generate_file_name_base(".pkl").format(0), 0,
+                                     directory_base=configuration_path)
+        self.assertIsNone(train_network.run(os.path.join("model", "empty_0.keras")))
+        report = train_network.run_incremental(features_labels_path=configuration_path)
+        self.assertTrue(os.path.exists(report["model_path"]))
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+
+from common_utilities import CommonUtilities
+from enum_classes import EnumPair, EnumHyperParamsOptimization
+from features_labels_storage import FeaturesLabelsStorage
+from training_scheduler import TrainingJob, TrainingScheduler
+
+
+class TestTrainingScheduler(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__features_labels_path = os.path.join(self.__directory.name, "features_labels")
+        os.makedirs(self.__features_labels_path)
+        rng = np.random.default_rng(0)
+        labels = [rng.integers(0, 2, size=(200, 2)).astype(bool).tolist() for _ in range(3)]
+        features = rng.normal(size=(200, 5)).astype(np.float32)
+        stored_file_name = CommonUtilities.generate_file_name_base(".pkl").format(0)
+        FeaturesLabelsStorage.store_ready_features_labels([labels, features], ("quotes.csv", stored_file_name),
+                                                          ((), (1, 2, 3), EnumPair.EURUSD),
+                                                          self.__features_labels_path)
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_job_name(self):
+        self.assertEqual("EURUSD_2_smote", TrainingJob(EnumPair.EURUSD, 2, "smote").get_name())
+        configuration_job = TrainingJob(EnumPair.EURUSD, 2, "smote", "lb_60s")
+        self.assertEqual("EURUSD_2_smote_lb_60s", configuration_job.get_name())
+        self.assertEqual(os.path.join("features_labels", "lb_60s"),
+                         configuration_job.get_features_labels_path("features_labels"))
+        self.assertEqual("features_labels", TrainingJob(EnumPair.EURUSD, 2).get_features_labels_path("features_labels"))
+        with self.assertRaises(ValueError):
+            TrainingScheduler([TrainingJob(EnumPair.EURUSD, 0), TrainingJob(EnumPair.EURUSD, 0)])
+
+    def test_run_jobs(self):
+        models_path = os.path.join(self.__directory.name, "model")
+        jobs = [TrainingJob(EnumPair.EURUSD, 0), TrainingJob(EnumPair.EURUSD, 1), TrainingJob(EnumPair.GBPUSD, 0)]
+        scheduler = TrainingScheduler(jobs, workers_count=2, intra_op_threads=1, inter_op_threads=1,
+                                      models_path=models_path,
+                                      constants_overrides={"FEATURES_LABELS_PATH": self.__features_labels_path,
+                                                           "HYPERPARAMETERS_OPTIMIZATION":
+                                                               EnumHyperParamsOptimization.NONE,
+                                                           "EPOCHS_COUNT": 1, "DEBUG": False})
+        self.assertEqual(2, scheduler.get_workers_count())
+        reports = scheduler.run()
+
+        self.assertEqual({job.get_name() for job in jobs}, set(reports.keys()))
+        for job in jobs[:2]:
+            report = reports[job.get_name()]
+            self.assertNotIn("error", report)
+            self.assertEqual(job.get_profit_level_index(), report["profit_level_index"])
+            self.assertEqual(1, report["intra_op_threads"])
+            self.assertTrue(os.path.exists(report["model_path"]))
+            self.assertEqual(scheduler.get_job_folder(job), os.path.dirname(report["model_path"]))
+            with open(report["model_path"][:-len(".keras")] + TrainingScheduler.REPORT_FILE_EXTENSION) as open_pointer:
+                self.assertEqual(report["test_accuracy"], json.load(open_pointer)["test_accuracy"])
+        # No features and labels were stored for this pair.
+        self.assertEqual("no data", reports[jobs[2].get_name()]["status"])
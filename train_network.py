@@ -1,17 +1,19 @@
 import random
 from os import linesep, makedirs, getcwd
-from os.path import join, exists
+from os.path import join, exists, dirname
 import keras
-from sklearn.metrics import multilabel_confusion_matrix, classification_report
+import numpy as np
 from tensorflow.data import Dataset
 # LOCAL LIBRARIES:
 import constants
 import keras_models
+import model_evaluation
 from common_utilities import CommonUtilities
-from enum_classes import EnumHyperParamsOptimization
-from indicator import Indicator
+from enum_classes import EnumHyperParamsOptimization, EnumPair
 from features_labels_storage import FeaturesLabelsStorage
-from features_labels_modificator import FeatureLabelModificator
+from numpy_inference import NumpyInferenceModel
+from training_manifest import TrainingManifest
+from sliding_window_dataset import SlidingWindowDataset
 
 
 def shuffle_observations(labels, features) -> tuple:
@@ -117,21 +119,27 @@ def split_test_train(features, labels, test_fraction) -> tuple:
     return test_features, test_labels, train_features, train_labels
 
 
-def run():
+def split_validation_train(features, labels, validation_fraction) -> tuple:
     """
-    Runs the Training application
+    Holds out the first rows of the (shuffled) TRAIN set as the validation set monitored by the early stopping: the
+    weights are never chosen on the TEST set.
+    @return: tuple (validation features, validation labels, train features, train labels).
     """
-    print("Starting TRAIN NETWORK")
-    # SECTION: Read the calculated data in previous step (i.e. CalculateFeaturesLabels)
+    count_of_observations = len(features)
+    validation_count = int(count_of_observations * validation_fraction)
+    print("Vector validation length: {}, train: {}.".format(validation_count,
+                                                            count_of_observations - validation_count))
+    return features[:validation_count], labels[:validation_count], features[validation_count:], \
+        labels[validation_count:]
 
-    # Hold the whole calculated data in these variables.
-    concatenated_features = []
-    concatenated_labels = []
 
-    # Test create the folder and file:
-    # Save the trained model in the "best_model" folder with a unique name.
-    # Check that we can create the file before training a heavy model.
-    save_model_folder = join(getcwd(), constants.MODELS_PATH)
+def get_new_model_path(models_path: str) -> str:
+    """
+    Checks that we can create the file before training a heavy model.
+    @param models_path: the models folder (created if needed).
+    @return: a new .keras file path in the folder, named after the date.
+    """
+    save_model_folder = join(getcwd(), models_path)
     makedirs(save_model_folder, exist_ok=True)
     generated_filename = CommonUtilities.generate_file_name_base(".keras")
     file_name_counter = 0
@@ -139,14 +147,72 @@ def run():
     while exists(model_path):
         file_name_counter += 1
         model_path = join(save_model_folder, generated_filename.format(file_name_counter))
-    del file_name_counter, generated_filename, save_model_folder
+    return model_path
+
+
+def get_most_recent_model_path(models_path: str) -> str:
+    """
+    @param models_path: the models folder.
+    @return: the path of the most recent .keras model of the folder: the most recent date, then the highest counter.
+    None if there is no model.
+    """
+    file_name_base = CommonUtilities.get_most_recent_file_base_name_by_filename_extension(models_path, ".keras")
+    if file_name_base is None:
+        return None
+    counters = []
+    for file_name in CommonUtilities.get_files_list_of_a_type_in_dir(models_path, ".keras"):
+        counter = file_name[len(file_name_base) + 1:-len(".keras")]
+        if file_name.startswith(file_name_base + "_") and counter.isdigit():
+            counters.append(int(counter))
+    if len(counters) == 0:
+        return join(getcwd(), models_path, file_name_base + ".keras")
+    return join(getcwd(), models_path, "{}_{}.keras".format(file_name_base, max(counters)))
+
+
+def save_model(model: keras.Model, model_path: str) -> None:
+    """
+    Saves the Keras model and its NumPy export (same base name): the backtest runs the export without TensorFlow.
+    """
+    model.save(model_path)
+    try:
+        NumpyInferenceModel.export_keras_model(model, model_path[:-len(".keras")] +
+                                               NumpyInferenceModel.MODEL_FILE_EXTENSION)
+    except ValueError as error:
+        print("The model couldn't be exported for the NumPy inference: {}".format(error))
+
 
+def run(model_path: str = None, ccy_pair: EnumPair = None, features_labels_path: str = None) -> dict:
+    """
+    Runs the Training application
+    @param model_path: the .keras destination of the model. By default, a new file name in constants.MODELS_PATH.
+    @param ccy_pair: only the stored features and labels of this currency pair are used. By default, all of them.
+    @param features_labels_path: folder of the stored features and labels. By default, constants.FEATURES_LABELS_PATH.
+    With constants.RUN_CONFIGURATIONS, the folder of a configuration: FEATURES_LABELS_PATH/<configuration name>.
+    @return: the report of the training (model path and TEST metrics). None if there was nothing to train on.
+    """
+    print("Starting TRAIN NETWORK")
+    features_labels_path = constants.FEATURES_LABELS_PATH if features_labels_path is None else features_labels_path
+    # SECTION: Read the calculated data in previous step (i.e. CalculateFeaturesLabels)
+
+    # Hold the whole calculated data in these variables. One list of labels per profit level.
+    concatenated_features = []
+    concatenated_labels_per_level = None
+
+    # Test create the folder and file:
+    # Save the trained model in the "best_model" folder with a unique name.
+    # Check that we can create the file before training a heavy model.
+    if model_path is None:
+        model_path = get_new_model_path(constants.MODELS_PATH)
+
+    trained_files = []
+    # Rows of each restored file: the sequence windows don't span 2 files.
+    file_rows_counts = []
     file_index = 0
     while True:
         # Restore
         print("Restoring next calculation.")
         restored = FeaturesLabelsStorage.restore_ready_features_labels(file_index,
-                                                                       directory_base=constants.FEATURES_LABELS_PATH)
+                                                                       directory_base=features_labels_path)
         if restored is not None and len(restored) > 0:
             (labels, features), \
                 (original_quotes_file_name, stored_file_name), \
@@ -155,31 +221,70 @@ def run():
             if file_index == 0:
                 # Nothing was found and nothing was read.
                 print("Nothing was found. No data was read. Terminating this procedure.")
-                return
+                return None
             else:
                 break
+        if ccy_pair is not None and currency_pair != ccy_pair:
+            print("Skipped: {} calculations of the ccy pair {}.".format(original_quotes_file_name, currency_pair))
+            file_index += 1
+            continue
         print("Restored: {} calculations stored in {}. Ccy pair: {}. Profit level index {}.".format(original_quotes_file_name,
                                                                                                     stored_file_name,
                                                                                                     currency_pair,
                                                                                                     constants.PROFIT_LEVEL_INDEX))
 
         # Add the calculations from this file to a whole collection.
-        concatenated_labels += labels[constants.PROFIT_LEVEL_INDEX]
-        concatenated_features += features
+        if concatenated_labels_per_level is None:
+            concatenated_labels_per_level = [[] for _ in labels]
+        for level_index, level_labels in enumerate(labels):
+            concatenated_labels_per_level[level_index] += level_labels
+        # extend: the stored features are a 2-D array (a list += array would broadcast instead).
+        concatenated_features.extend(features)
+        trained_files.append(stored_file_name)
+        file_rows_counts.append(len(features))
         # Increase files counter.
         file_index += 1
 
     print("Done extracting and concatenating stored labels and features.")
 
     del labels, features
+    if concatenated_labels_per_level is None:
+        print("No calculations of the ccy pair {} were found. Terminating this procedure.".format(ccy_pair))
+        return None
+
+    # A new lineage for the incremental training (see run_incremental): the model is trained on these files, of the
+    # most recent file name base (see FeaturesLabelsStorage.restore_ready_features_labels).
+    manifest = TrainingManifest(dirname(model_path), restore=False, ccy_pair=ccy_pair,
+                                file_name_base=trained_files[0].split("_")[0])
+    # The replay sample is drawn from the rows as they are: no second copy of the dataset.
+    manifest.add_trained_files(trained_files, concatenated_features, concatenated_labels_per_level, model_path)
+
+    report = {"model_path": model_path, "ccy_pair": None if ccy_pair is None else str(ccy_pair)}
+    if constants.MULTI_HEAD_TRAINING:
+        report["profit_levels"] = train_multi_head(concatenated_labels_per_level, concatenated_features, indicators,
+                                                   profit_levels, model_path)
+        if len(report["profit_levels"]) > 0:
+            manifest.store()
+        return report
+    if constants.SEQUENCE_MODEL != "NONE":
+        sequence_report = train_sequence(concatenated_features,
+                                         concatenated_labels_per_level[constants.PROFIT_LEVEL_INDEX],
+                                         file_rows_counts, profit_levels, model_path)
+        if sequence_report is None:
+            return None
+        report.update(sequence_report)
+        manifest.store()
+        return report
 
     # SECTION: Prepare the Features and Labels for training
+    concatenated_labels = concatenated_labels_per_level[constants.PROFIT_LEVEL_INDEX]
+    del concatenated_labels_per_level
     labels, features = equalize_to_4_labels(concatenated_labels, concatenated_features)
     labels, features = shuffle_observations(labels, features)
 
     if labels is None or features is None:
         print("There were no observations in this dataset. Ending the program execution.")
-        return
+        return None
     # Remember: we have ONE tuple per profit level. We can have 10 profit levels. Each one containing 2
     # instructions: SELL or BUY signal.
     output_vector_length = len(labels[0])
@@ -196,12 +301,15 @@ def run():
     del labels, features
 
     if not constants.FEATURE_LABEL_MODIFICATION_STRATEGY == "NONE": #Use one of the strategies
+        from features_labels_modificator import FeatureLabelModificator
         modificator = FeatureLabelModificator(train_features, train_labels)
         result = modificator.modify()
         if constants.FEATURE_LABEL_MODIFICATION_STRATEGY == "class_weights":
             class_weights = result
         elif constants.FEATURE_LABEL_MODIFICATION_STRATEGY in ["smote", "map_labels"]:
             train_features, train_labels = result
+        elif constants.FEATURE_LABEL_MODIFICATION_STRATEGY == "streaming_smote":
+            oversampler = result
         else:
             print("Be sure the FEATURE_LABEL_MODIFICATION_STRATEGY in constant is set to correct value!")
 
@@ -210,12 +318,18 @@ def run():
     #test_labels = keras.utils.to_categorical(test_labels, num_classes=2)
     #train_labels = keras.utils.to_categorical(train_labels, num_classes=2)
     train_labels = [[int(x[0]), int(x[1])] for x in train_labels]
-    test_labels = [[int(x[0]), int(x[1])] for x in test_labels]
+    test_features = np.asarray(test_features, dtype=np.float32)
+    test_labels = np.asarray(test_labels, dtype=np.int64)
     train_dataset = Dataset.from_tensor_slices((train_features, train_labels))
     test_dataset = Dataset.from_tensor_slices((test_features, test_labels))
-    # divide the dataset in batches after it being sliced.
+    # divide the dataset in batches after it being sliced. The test set is only evaluated: large batches.
     train_dataset = train_dataset.batch(batch_size=constants.BATCH_SIZE, drop_remainder=False)
-    test_dataset = test_dataset.batch(batch_size=1)
+    test_dataset = test_dataset.batch(batch_size=constants.EVALUATION_BATCH_SIZE)
+    if constants.FEATURE_LABEL_MODIFICATION_STRATEGY == "streaming_smote":
+        # The synthetic minority rows are generated batch by batch.
+        print("Streaming oversampling: {} synthetic rows per epoch for {} rows.".format(
+            oversampler.get_synthetic_rows_count(), oversampler.get_rows_count()))
+        train_dataset = oversampler.get_dataset(constants.BATCH_SIZE)
 
     print("Preparing and training the NN model.")
 
@@ -243,7 +357,7 @@ def run():
               batch_size=constants.BATCH_SIZE,
               epochs=constants.EPOCHS_COUNT,
               class_weight=class_weights)
-        elif constants.FEATURE_LABEL_MODIFICATION_STRATEGY in ["smote", "map_labels"]:
+        elif constants.FEATURE_LABEL_MODIFICATION_STRATEGY in ["smote", "map_labels", "streaming_smote"]:
             model.fit(x=train_dataset,
                       batch_size=constants.BATCH_SIZE,
                       epochs=constants.EPOCHS_COUNT)
@@ -258,28 +372,29 @@ def run():
     # Test, predict and print models. Test accuracy goal 100%
     #model.save(model_path)
     print(linesep)
-    print("Evaluating your model with TEST SET")
-    test_loss, test_acc = model.evaluate(x=test_dataset)
-    print(linesep)
     print(model.summary())
     print(linesep)
-    print("Evaluating a confusion matrix with TEST SET")
-    model_predicted = model.predict(x=test_dataset)
-    list_of_probas = model_predicted.tolist()
-    list_of_ints = [[int(x[0] > 0.5), int(x[1] > 0.5)] for x in list_of_probas]
-    cm = multilabel_confusion_matrix(test_labels, list_of_ints)
-    print("Confusion matrix and metrics:")
-    print(cm)
-    print(classification_report(test_labels, list_of_ints))
+    print("Evaluating your model with TEST SET")
+    # One prediction pass in large batches. The loss and the metrics are then computed on the arrays.
+    model_predicted = model.predict(x=test_features, batch_size=constants.EVALUATION_BATCH_SIZE)
+    test_loss = model_evaluation.get_binary_crossentropy(test_labels, model_predicted)
+    metrics = get_level_metrics(constants.PROFIT_LEVEL_INDEX, profit_levels[constants.PROFIT_LEVEL_INDEX],
+                                model_predicted, test_labels)
+    test_acc = metrics["accuracy"]
+    report.update({"profit_level_index": constants.PROFIT_LEVEL_INDEX,
+                   "strategy": constants.FEATURE_LABEL_MODIFICATION_STRATEGY,
+                   "test_loss": test_loss, "test_accuracy": test_acc, "confusion_matrix": metrics["confusion_matrix"],
+                   "metrics": metrics})
     print("All used indicators list:")
-    indicator: Indicator
+    # IndicatorSpec in the files stored since the indicator registry, Indicator instances in the older ones.
     for indicator in indicators:  # There is a control statement: this one can't be empty.
-        print(str(indicator.get_doc_description()))
+        print(str(indicator))
     print(linesep)
     print('\nTest accuracy: {}%. Goal: 100%.'.format(round(test_acc * 100.00, 2)))
 
     # subsection E: save model
-    model.save(model_path)
+    save_model(model, model_path)
+    manifest.store()
 
     # subsection F: test some prediction
     # We test the prediction mechanism:
@@ -297,6 +412,256 @@ def run():
         print('\nExample prediction.\nExpected: SELL: {}; BUY: {}\nPredicted : SELL: {}; BUY: {}'
               .format(train_labels[0][0], train_labels[0][1],
                       predicted_label_0, predicted_label_1))
+    return report
+
+
+def train_multi_head(labels_per_level: list, features: list, indicators, profit_levels, model_path: str) -> dict:
+    """
+    Trains all the profit levels in one pass over the same dataset: one shared trunk with one head per profit level
+    (see keras_models.get_model_prototype_multi_head). The rows stay aligned between the levels, therefore the per
+    level equalization (equalize_to_4_labels) and the FEATURE_LABEL_MODIFICATION_STRATEGY are not applied here.
+    @param labels_per_level: one list of [SELL, BUY] labels per profit level, aligned with the features.
+    @param features: the features rows.
+    @param indicators: the indicators of the features (printed with the metrics).
+    @param profit_levels: the profit levels of the labels.
+    @param model_path: the .keras destination. The NumPy export is stored next to it.
+    @return: dict profit level index -> dict of the TEST metrics of the level (see get_level_metrics): "accuracy"
+    (of each label), "confusion_matrix" (multilabel, as lists), the precision, recall, f1-score and support of "SELL"
+    and "BUY" and the same metrics per swept threshold ("thresholds").
+    """
+    features = np.asarray(features, dtype=np.float32)
+    if len(features) == 0 or labels_per_level is None:
+        print("There were no observations in this dataset. Ending the program execution.")
+        return {}
+    if constants.FEATURE_LABEL_MODIFICATION_STRATEGY != "NONE":
+        print("The FEATURE_LABEL_MODIFICATION_STRATEGY is ignored by the multi-head training.")
+    # Shape (observations, profit levels, 2).
+    labels = np.stack([np.asarray(level_labels, dtype=np.float32) for level_labels in labels_per_level], axis=1)
+    heads_count = labels.shape[1]
+    permutation = np.random.permutation(len(features))
+    features, labels = features[permutation], labels[permutation]
+    input_vector_length = features.shape[1]
+    output_vector_length = labels.shape[2]
+    print("Vector input length: {}, output length: {}, profit levels: {}.".format(input_vector_length,
+                                                                                  output_vector_length, heads_count))
+    test_features, test_labels, train_features, train_labels = split_test_train(features, labels,
+                                                                                constants.TEST_FRACTION)
+    del labels, features
+    validation_features, validation_labels, train_features, train_labels = split_validation_train(
+        train_features, train_labels, constants.VALIDATION_FRACTION)
+
+    # The labels of the heads are given as a tuple, ordered as the model outputs.
+    train_dataset = Dataset.from_tensor_slices(
+        (train_features, tuple(train_labels[:, level_index] for level_index in range(heads_count))))
+    validation_dataset = Dataset.from_tensor_slices(
+        (validation_features, tuple(validation_labels[:, level_index] for level_index in range(heads_count))))
+    train_dataset = train_dataset.batch(batch_size=constants.BATCH_SIZE, drop_remainder=False)
+    validation_dataset = validation_dataset.batch(batch_size=constants.EVALUATION_BATCH_SIZE)
+
+    print("Preparing and training the multi-head NN model.")
+    model = keras_models.get_model_prototype_multi_head(input_vector_length, output_vector_length, heads_count)
+    reduce_lr = keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
+    early_stop = keras.callbacks.EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+    model.fit(x=train_dataset, epochs=constants.EPOCHS_COUNT, validation_data=validation_dataset,
+              callbacks=[reduce_lr, early_stop])
+
+    print(linesep)
+    print("Evaluating your model with TEST SET, profit level by profit level")
+    predictions = model.predict(x=test_features, batch_size=constants.EVALUATION_BATCH_SIZE)
+    metrics = {level_index: get_level_metrics(level_index, profit_levels[level_index], predictions[level_index],
+                                              test_labels[:, level_index])
+               for level_index in range(heads_count)}
+    print("All used indicators list:")
+    for indicator in indicators:
+        print(str(indicator))
+    print(linesep)
+
+    # The backtest queries the head of constants.PROFIT_LEVEL_INDEX.
+    save_model(model, model_path)
+    return metrics
+
+
+def train_sequence(features: list, labels: list, file_rows_counts: list, profit_levels, model_path: str) -> dict:
+    """
+    Trains a sequence model (constants.SEQUENCE_MODEL, see keras_models.get_model_prototype_sequence) on the windows of
+    the last constants.SEQUENCE_WINDOW_LENGTH feature rows of the PROFIT_LEVEL_INDEX level. The rows keep their time
+    order: no equalization, no shuffle of the rows (only of the windows), the last windows are the TEST set. The last
+    training windows are the validation set of the early stopping.
+    @param features: the features rows of the files, one file after the other.
+    @param labels: their [SELL, BUY] labels.
+    @param file_rows_counts: count of rows of each file.
+    @param model_path: the .keras destination.
+    @return: the TEST metrics report. None if there are no windows.
+    """
+    windows = SlidingWindowDataset(np.asarray(features, dtype=np.float32), np.asarray(labels, dtype=np.float32),
+                                   constants.SEQUENCE_WINDOW_LENGTH, file_rows_counts)
+    if windows.get_windows_count() == 0:
+        print("The files are shorter than the windows. Ending the program execution.")
+        return None
+    train_windows, test_windows = windows.split(constants.TEST_FRACTION)
+    # Time-ordered tail of the training windows: the weights are never chosen on the TEST set.
+    train_windows, validation_windows = train_windows.split(constants.VALIDATION_FRACTION)
+    print("Windows of {} rows x {} features. Test windows: {}, validation: {}, train: {}.".format(
+        windows.get_window_length(), windows.get_features_count(), test_windows.get_windows_count(),
+        validation_windows.get_windows_count(), train_windows.get_windows_count()))
+
+    model = keras_models.get_model_prototype_sequence(windows.get_window_length(), windows.get_features_count(), 2,
+                                                      constants.SEQUENCE_MODEL)
+    test_dataset = test_windows.get_dataset(constants.EVALUATION_BATCH_SIZE)
+    reduce_lr = keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
+    early_stop = keras.callbacks.EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+    model.fit(x=train_windows.get_dataset(constants.BATCH_SIZE, shuffle=True), epochs=constants.EPOCHS_COUNT,
+              validation_data=validation_windows.get_dataset(constants.EVALUATION_BATCH_SIZE),
+              callbacks=[reduce_lr, early_stop])
+
+    print(linesep)
+    print("Evaluating your sequence model with TEST SET")
+    metrics = get_level_metrics(constants.PROFIT_LEVEL_INDEX, profit_levels[constants.PROFIT_LEVEL_INDEX],
+                                model.predict(x=test_dataset), test_windows.get_labels())
+    # The NumPy export only supports the Dense models: the backtest loads the .keras file.
+    save_model(model, model_path)
+    return {"profit_level_index": constants.PROFIT_LEVEL_INDEX, "sequence_model": constants.SEQUENCE_MODEL,
+            "window_length": windows.get_window_length(), "test_accuracy": metrics["accuracy"],
+            "confusion_matrix": metrics["confusion_matrix"], "metrics": metrics}
+
+
+def get_level_metrics(level_index: int, profit_level: float, predicted_probabilities: np.ndarray,
+                      expected_labels: np.ndarray) -> dict:
+    """
+    Prints and returns the TEST metrics of a profit level, at the 0.5 decision threshold of the backtest and at each
+    of constants.EVALUATION_THRESHOLDS (see model_evaluation.evaluate).
+    @param predicted_probabilities: (rows, 2) SELL/BUY probabilities.
+    @param expected_labels: (rows, 2) SELL/BUY labels.
+    @return: dict with the "accuracy" (of each label), the "confusion_matrix" (multilabel, as lists), the precision,
+    recall, f1-score and support of "SELL" and "BUY" and the same metrics per swept threshold ("thresholds").
+    """
+    metrics = model_evaluation.evaluate(expected_labels, predicted_probabilities, constants.EVALUATION_THRESHOLDS)
+    print("Profit level {} ({}). Test accuracy: {}%.".format(level_index, profit_level,
+                                                            round(metrics["accuracy"] * 100.0, 2)))
+    print("Confusion matrix and metrics:")
+    print(np.array(metrics["confusion_matrix"]))
+    print(model_evaluation.format_metrics(metrics))
+    return metrics
+
+
+def run_incremental(models_path: str = None, model_path: str = None, ccy_pair: EnumPair = None,
+                    features_labels_path: str = None) -> dict:
+    """
+    Incremental (warm start) training: fine-tunes the most recent model of the models folder on the stored features
+    and labels files it was not trained on yet (see TrainingManifest), mixed with a replay sample of the older rows.
+    Only the files of the currency pair and of the file name base (or a more recent one) of the lineage are new.
+    The architecture of the previous model is kept: no hyperparameters search. Without a previous model, runs the full
+    training (see run). The sequence models (see train_sequence) are not fine-tuned: a ValueError is raised.
+    @param models_path: the models folder. By default, constants.MODELS_PATH.
+    @param model_path: the .keras destination of the fine-tuned model. By default, a new file name in the models folder.
+    @param ccy_pair: the currency pair of the full training, without a previous model. Otherwise, it must be the pair
+    of the lineage (or None).
+    @param features_labels_path: folder of the stored features and labels (see run). By default,
+    constants.FEATURES_LABELS_PATH.
+    @return: the report of the training (model path, new files and TEST metrics of each trained profit level). None if
+    there was nothing new to train on.
+    """
+    print("Starting INCREMENTAL TRAIN NETWORK")
+    models_path = constants.MODELS_PATH if models_path is None else models_path
+    features_labels_path = constants.FEATURES_LABELS_PATH if features_labels_path is None else features_labels_path
+    previous_model_path = get_most_recent_model_path(models_path)
+    if previous_model_path is None:
+        print("There were no models saved/stored in the " + models_path + " folder. Running the full training.")
+        return run(get_new_model_path(models_path) if model_path is None else model_path, ccy_pair,
+                   features_labels_path)
+    manifest = TrainingManifest(models_path)
+    if ccy_pair is not None and not manifest.is_lineage_ccy_pair(ccy_pair):
+        raise ValueError("The models of {} are trained on the ccy pair {}, not {}.".format(
+            models_path, manifest.get_ccy_pair(), ccy_pair))
+    model = keras.models.load_model(previous_model_path)
+    if len(model.input_shape) == 3:
+        # The replay sample holds single rows: a window of the previous rows can't be rebuilt.
+        raise ValueError("The model {} is a sequence model (input {}): the incremental training only fine-tunes the "
+                         "models of single feature rows. Please run the full training (train_network.run)."
+                         .format(previous_model_path, model.input_shape))
+
+    new_files = []
+    new_features = []
+    new_labels = []
+    profit_levels = None
+    for file_name in sorted(CommonUtilities.get_files_list_of_a_type_in_dir(features_labels_path, ".pkl")):
+        if not manifest.is_new_file(file_name):
+            continue
+        (labels, features), _, (indicators, profit_levels, currency_pair) = \
+            FeaturesLabelsStorage.restore_ready_features_labels(file_name=join(features_labels_path, file_name))
+        if not manifest.is_lineage_ccy_pair(currency_pair):
+            print("Skipped: {} calculations of the ccy pair {}.".format(file_name, currency_pair))
+            continue
+        print("Restored new calculations stored in {}. Ccy pair: {}.".format(file_name, currency_pair))
+        new_files.append(file_name)
+        if len(features) > 0:
+            new_features.append(np.asarray(features, dtype=np.float32))
+            # (profit levels, rows, 2) -> (rows, profit levels, 2)
+            new_labels.append(np.asarray(labels, dtype=bool).transpose(1, 0, 2))
+    if len(new_features) == 0:
+        print("No new features and labels since the model {}. Nothing to train.".format(previous_model_path))
+        if len(new_files) > 0:
+            # The empty files (too short for the warm-up) are recorded as seen: they aren't restored again. The
+            # previous model stays the model of the lineage.
+            manifest.add_trained_files(new_files, [], [], previous_model_path)
+            manifest.store()
+        return None
+    new_features = np.concatenate(new_features)
+    new_labels = np.concatenate(new_labels)
+
+    # The TEST set only holds new rows: the previous models were trained on the replayed ones.
+    permutation = np.random.permutation(len(new_features))
+    test_features, test_labels, train_features, train_labels = split_test_train(
+        new_features[permutation], new_labels[permutation].astype(np.float32), constants.TEST_FRACTION)
+    del permutation
+    # The training rows plus the replay sample of the older ones, shuffled.
+    replay_features, replay_labels = manifest.get_replay_sample()
+    replayed_rows_count = 0
+    if replay_features is not None:
+        replayed_rows_count = len(replay_features)
+        train_features = np.concatenate([train_features, replay_features])
+        train_labels = np.concatenate([train_labels, replay_labels.astype(np.float32)])
+        permutation = np.random.permutation(len(train_features))
+        train_features, train_labels = train_features[permutation], train_labels[permutation]
+    print("Fine-tuning {} on {} new rows ({} files) and {} replayed rows.".format(
+        previous_model_path, len(new_features), len(new_files), replayed_rows_count))
+    validation_features, validation_labels, train_features, train_labels = split_validation_train(
+        train_features, train_labels, constants.VALIDATION_FRACTION)
+
+    # A multi-head model trains all the profit levels, a single head model the PROFIT_LEVEL_INDEX level.
+    levels = list(range(len(model.outputs))) if len(model.outputs) > 1 else [constants.PROFIT_LEVEL_INDEX]
+    if len(levels) > 1:
+        train_targets = tuple(train_labels[:, level_index] for level_index in levels)
+        validation_targets = tuple(validation_labels[:, level_index] for level_index in levels)
+    else:
+        train_targets = train_labels[:, levels[0]]
+        validation_targets = validation_labels[:, levels[0]]
+    train_dataset = Dataset.from_tensor_slices((train_features, train_targets)).batch(constants.BATCH_SIZE)
+    validation_dataset = Dataset.from_tensor_slices((validation_features, validation_targets)) \
+        .batch(constants.EVALUATION_BATCH_SIZE)
+    # The early stopping monitors the validation slice of the training rows: the TEST set is only used for the report.
+    early_stop = keras.callbacks.EarlyStopping(monitor='val_loss', patience=2, restore_best_weights=True)
+    model.fit(x=train_dataset, epochs=constants.INCREMENTAL_EPOCHS_COUNT, validation_data=validation_dataset,
+              callbacks=[early_stop])
+
+    print(linesep)
+    print("Evaluating your fine-tuned model with TEST SET")
+    predictions = model.predict(x=test_features, batch_size=constants.EVALUATION_BATCH_SIZE)
+    if len(levels) == 1:
+        predictions = [predictions]
+    report = {"model_path": None, "previous_model_path": previous_model_path, "new_files": new_files,
+              "profit_levels": {level_index: get_level_metrics(level_index, profit_levels[level_index],
+                                                               predictions[head_index],
+                                                               test_labels[:, level_index])
+                                for head_index, level_index in enumerate(levels)}}
+
+    model_path = get_new_model_path(models_path) if model_path is None else model_path
+    save_model(model, model_path)
+    manifest.add_trained_files(new_files, new_features, new_labels.transpose(1, 0, 2), model_path)
+    manifest.store()
+    report["model_path"] = model_path
+    return report
+
 
 def lr_schedule(epoch, lr):
     if epoch < 10:
@@ -0,0 +1,155 @@
+import json
+import os
+from os.path import join, exists
+import numpy as np
+
+import constants
+from enum_classes import EnumPair
+
+
+class TrainingManifest:
+    """
+    Lineage of the models of a folder, for the incremental training (see train_network.run_incremental): the stored
+    features and labels files already trained on, the count of their rows, the last model and a replay sample.
+    A lineage is started by a full training (train_network.run) on the files of one file name base (calculation date)
+    and, optionally, of one currency pair: only the files of that pair and of that base or a more recent one are new.
+    The replay sample stays a uniform random sample of all the seen rows (all the profit levels): mixed with the rows
+    of the new files, it limits the drift of the fine-tuned model towards the most recent days.
+    """
+
+    MANIFEST_FILE_NAME = "training_manifest.json"
+    REPLAY_FILE_NAME = "training_replay_sample.npz"
+
+    def __init__(self, models_path: str, restore: bool = True, ccy_pair: EnumPair = None,
+                 file_name_base: str = None):
+        """
+        @param models_path: the folder of the models, the manifest and the replay sample.
+        @param restore: False starts a new lineage (full training): the stored manifest is ignored, then overwritten
+        by store.
+        @param ccy_pair: new lineage only. The currency pair of its files. None: all the pairs.
+        @param file_name_base: new lineage only. The file name base of the files of the full training. None: all the
+        bases.
+        """
+        self.__models_path = models_path
+        self.__ccy_pair = ccy_pair
+        self.__file_name_base = file_name_base
+        self.__seen_files = []
+        self.__seen_rows_count = 0
+        self.__model_path = None
+        # Shapes (rows, features) and (rows, profit levels, 2).
+        self.__replay_features = None
+        self.__replay_labels = None
+        if restore and exists(join(models_path, TrainingManifest.MANIFEST_FILE_NAME)):
+            with open(join(models_path, TrainingManifest.MANIFEST_FILE_NAME)) as open_pointer:
+                stored = json.load(open_pointer)
+            self.__seen_files = stored["seen_files"]
+            self.__seen_rows_count = stored["seen_rows_count"]
+            self.__model_path = stored["model_path"]
+            # The manifests stored before the lineage filters accept all the pairs and bases.
+            self.__ccy_pair = None if stored.get("ccy_pair") is None else EnumPair[stored["ccy_pair"]]
+            self.__file_name_base = stored.get("file_name_base")
+            if exists(join(models_path, TrainingManifest.REPLAY_FILE_NAME)):
+                with np.load(join(models_path, TrainingManifest.REPLAY_FILE_NAME)) as arrays:
+                    self.__replay_features = arrays["features"]
+                    self.__replay_labels = arrays["labels"]
+
+    def get_seen_files(self) -> list:
+        return list(self.__seen_files)
+
+    def is_seen(self, file_name: str) -> bool:
+        return file_name in self.__seen_files
+
+    def get_ccy_pair(self) -> EnumPair:
+        return self.__ccy_pair
+
+    def get_file_name_base(self) -> str:
+        return self.__file_name_base
+
+    def is_new_file(self, file_name: str) -> bool:
+        """
+        @param file_name: a stored features and labels file name (<file name base>_<index>.pkl).
+        @return: True if the file wasn't trained on and its file name base isn't older than the one of the lineage.
+        """
+        if file_name in self.__seen_files:
+            return False
+        return self.__file_name_base is None or file_name.split("_")[0] >= self.__file_name_base
+
+    def is_lineage_ccy_pair(self, ccy_pair: EnumPair) -> bool:
+        return self.__ccy_pair is None or ccy_pair == self.__ccy_pair
+
+    def get_seen_rows_count(self) -> int:
+        return self.__seen_rows_count
+
+    def get_model_path(self) -> str:
+        """
+        @return: the model trained last. None for a new lineage.
+        """
+        return self.__model_path
+
+    def get_replay_sample(self) -> tuple:
+        """
+        @return: tuple (features (rows, features), labels (rows, profit levels, 2)). (None, None) if empty.
+        """
+        return self.__replay_features, self.__replay_labels
+
+    def add_trained_files(self, file_names: list, features, labels_per_level, model_path: str,
+                          replay_size: int = None, seed: int = None) -> None:
+        """
+        Records the files of a training and draws the new replay sample: from the old sample and the new rows, in
+        proportion to the count of rows they stand for. Only the drawn rows are copied: the training data can be given
+        as it is, without building another full array.
+        @param file_names: the stored features and labels files names.
+        @param features: their rows: (rows, features) array or list of rows.
+        @param labels_per_level: their labels: one sequence of [SELL, BUY] labels per profit level, (profit levels,
+        rows, 2).
+        @param model_path: the model trained on them.
+        @param replay_size: maximal count of rows of the replay sample. By default, constants.REPLAY_SAMPLE_SIZE.
+        @param seed: random generator seed.
+        """
+        replay_size = constants.REPLAY_SAMPLE_SIZE if replay_size is None else replay_size
+        rng = np.random.default_rng(seed)
+        new_rows_count = len(features)
+        total_rows_count = self.__seen_rows_count + new_rows_count
+        old_kept_count = 0
+        if self.__replay_features is not None and total_rows_count > 0:
+            old_kept_count = min(len(self.__replay_features),
+                                 int(round(replay_size * self.__seen_rows_count / total_rows_count)))
+        new_kept_count = min(new_rows_count, replay_size - old_kept_count)
+        old_kept = rng.choice(len(self.__replay_features), old_kept_count, replace=False) if old_kept_count > 0 \
+            else None
+        new_kept = rng.choice(new_rows_count, new_kept_count, replace=False)
+        replay_features = []
+        replay_labels = []
+        if new_kept_count > 0:
+            replay_features.append(np.asarray([features[row] for row in new_kept], dtype=np.float32))
+            # (rows, profit levels, 2)
+            replay_labels.append(np.asarray([[level_labels[row] for level_labels in labels_per_level]
+                                             for row in new_kept], dtype=bool))
+        if old_kept is not None:
+            replay_features.append(self.__replay_features[old_kept])
+            replay_labels.append(self.__replay_labels[old_kept])
+        if len(replay_features) > 0:
+            self.__replay_features = np.concatenate(replay_features).astype(np.float32, copy=False)
+            self.__replay_labels = np.concatenate(replay_labels).astype(bool, copy=False)
+
+        self.__seen_files += [file_name for file_name in file_names if file_name not in self.__seen_files]
+        self.__seen_rows_count = total_rows_count
+        self.__model_path = model_path
+
+    def store(self) -> str:
+        """
+        Stores the manifest (JSON) and the replay sample (compressed .npz) in the models folder.
+        @return: the manifest path.
+        """
+        os.makedirs(self.__models_path, exist_ok=True)
+        if self.__replay_features is not None:
+            with open(join(self.__models_path, TrainingManifest.REPLAY_FILE_NAME), 'wb') as open_pointer:
+                np.savez_compressed(open_pointer, features=self.__replay_features, labels=self.__replay_labels)
+        manifest_path = join(self.__models_path, TrainingManifest.MANIFEST_FILE_NAME)
+        with open(manifest_path, 'w') as open_pointer:
+            json.dump({"ccy_pair": None if self.__ccy_pair is None else self.__ccy_pair.name,
+                       "file_name_base": self.__file_name_base, "seen_files": self.__seen_files,
+                       "seen_rows_count": self.__seen_rows_count, "model_path": self.__model_path,
+                       "replay_rows_count": 0 if self.__replay_features is None else len(self.__replay_features)},
+                      open_pointer, indent=2)
+        return manifest_path
@@ -0,0 +1,208 @@
+# Training scheduler: independent models, one per (ccy pair, profit level, strategy) job, trained concurrently in
+# worker processes. The small dense networks barely benefit from TensorFlow's intra-op parallelism: several
+# processes with a few CPU threads each train many more models per hour than one process with all the cores.
+import json
+import multiprocessing
+import os
+from concurrent import futures
+from os.path import join, exists, abspath
+from time import perf_counter
+
+import constants
+from common_utilities import CommonUtilities
+from enum_classes import EnumPair
+
+
+class TrainingJob:
+    """
+    One model to train: on the stored features and labels of a currency pair, for one profit level and with one
+    FEATURE_LABEL_MODIFICATION_STRATEGY ("class_weights", "smote", "map_labels", "NONE"). Optionally on the features
+    and labels of one run configuration (see RunConfiguration): the FEATURES_LABELS_PATH/<configuration name> folder.
+    """
+
+    def __init__(self, ccy_pair: EnumPair, profit_level_index: int, strategy: str = "NONE",
+                 run_configuration_name: str = None):
+        self.__ccy_pair = ccy_pair
+        self.__profit_level_index = profit_level_index
+        self.__strategy = strategy
+        self.__run_configuration_name = run_configuration_name
+
+    def get_ccy_pair(self) -> EnumPair:
+        return self.__ccy_pair
+
+    def get_profit_level_index(self) -> int:
+        return self.__profit_level_index
+
+    def get_strategy(self) -> str:
+        return self.__strategy
+
+    def get_run_configuration_name(self) -> str:
+        """
+        @return: the name of the run configuration of the features and labels. None: the single run.
+        """
+        return self.__run_configuration_name
+
+    def get_features_labels_path(self, features_labels_path: str) -> str:
+        """
+        @param features_labels_path: the root folder of the stored features and labels.
+        @return: the folder of the features and labels of the job.
+        """
+        if self.__run_configuration_name is None:
+            return features_labels_path
+        return join(features_labels_path, self.__run_configuration_name)
+
+    def get_name(self) -> str:
+        """
+        @return: unique name of the job. Also the name of its models folder.
+        """
+        name = "{}_{}_{}".format(self.__ccy_pair.name, self.__profit_level_index, self.__strategy)
+        if self.__run_configuration_name is not None:
+            name += "_" + self.__run_configuration_name
+        return name
+
+
+class TrainingScheduler:
+    """
+    Runs the training jobs in a pool of spawned processes. Each process trains one job (train_network.run) with
+    explicit intra-op/inter-op thread limits, then exits. The model and the JSON report of each job are stored in
+    its own folder: <models path>/<job name>/, with the usual model file names (the backtest can point to it).
+    """
+
+    REPORT_FILE_EXTENSION = "_report.json"
+
+    def __init__(self, jobs: list, workers_count: int = None, intra_op_threads: int = None,
+                 inter_op_threads: int = None, models_path: str = None, constants_overrides: dict = None):
+        """
+        @param jobs: list of TrainingJob.
+        @param workers_count: concurrent processes. By default, constants.TRAINING_WORKERS. 0 shares the CPUs:
+        CPU count / intra_op_threads processes.
+        @param intra_op_threads: threads of each TensorFlow operation. By default, constants.TRAINING_INTRA_OP_THREADS.
+        @param inter_op_threads: concurrent TensorFlow operations. By default, constants.TRAINING_INTER_OP_THREADS.
+        @param models_path: root folder of the job folders. By default, constants.MODELS_PATH.
+        @param constants_overrides: constant name -> value, set in each worker process (the spawned processes
+        import the constants module afresh).
+        """
+        names = [job.get_name() for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError("Please input each job once: {}.".format(names))
+        self.__jobs = list(jobs)
+        self.__intra_op_threads = constants.TRAINING_INTRA_OP_THREADS if intra_op_threads is None \
+            else intra_op_threads
+        self.__inter_op_threads = constants.TRAINING_INTER_OP_THREADS if inter_op_threads is None \
+            else inter_op_threads
+        workers_count = constants.TRAINING_WORKERS if workers_count is None else workers_count
+        if workers_count <= 0:
+            workers_count = max(1, (os.cpu_count() or 1) // self.__intra_op_threads)
+        self.__workers_count = max(1, min(workers_count, len(self.__jobs)))
+        self.__models_path = abspath(constants.MODELS_PATH if models_path is None else models_path)
+        self.__constants_overrides = {} if constants_overrides is None else dict(constants_overrides)
+
+    def get_workers_count(self) -> int:
+        return self.__workers_count
+
+    def get_job_folder(self, job: TrainingJob) -> str:
+        return join(self.__models_path, job.get_name())
+
+    def run(self) -> dict:
+        """
+        Trains all the jobs and stores their reports.
+        @return: dict job name -> report (see train_network.run, plus the job parameters and its wall time). A failed
+        job has an "error" instead of the metrics, a job without data a "status".
+        """
+        print("Training scheduler: {} jobs in {} processes with {} intra-op and {} inter-op threads each."
+              .format(len(self.__jobs), self.__workers_count, self.__intra_op_threads, self.__inter_op_threads))
+        # The workers run in their job folder: the relative paths are resolved here.
+        overrides = dict(self.__constants_overrides)
+        overrides["FEATURES_LABELS_PATH"] = abspath(overrides.get("FEATURES_LABELS_PATH",
+                                                                  constants.FEATURES_LABELS_PATH))
+        reports = {}
+        # Spawn and one job per process: each job starts a TensorFlow runtime with its own thread limits.
+        context = multiprocessing.get_context("spawn")
+        with futures.ProcessPoolExecutor(max_workers=self.__workers_count, mp_context=context,
+                                         max_tasks_per_child=1) as executor:
+            futures_to_jobs = {}
+            for job in self.__jobs:
+                job_folder = self.get_job_folder(job)
+                os.makedirs(job_folder, exist_ok=True)
+                futures_to_jobs[executor.submit(_train_job, job, self.__get_model_path(job_folder),
+                                                self.__intra_op_threads, self.__inter_op_threads, overrides)] = job
+            for finished_future in futures.as_completed(futures_to_jobs):
+                job = futures_to_jobs[finished_future]
+                try:
+                    report = finished_future.result()
+                except Exception as error:
+                    report = {"error": "{}: {}".format(type(error).__name__, error)}
+                report.update({"job": job.get_name(), "ccy_pair": str(job.get_ccy_pair()),
+                               "profit_level_index": job.get_profit_level_index(), "strategy": job.get_strategy(),
+                               "run_configuration": job.get_run_configuration_name()})
+                reports[job.get_name()] = report
+                self.__store_report(job, report)
+                print("Training job {} done: {}".format(job.get_name(), self.__get_summary(report)))
+        return reports
+
+    def __store_report(self, job: TrainingJob, report: dict) -> str:
+        model_path = report.get("model_path")
+        if model_path is not None:
+            report_path = model_path[:-len(".keras")] + TrainingScheduler.REPORT_FILE_EXTENSION
+        else:
+            report_path = join(self.get_job_folder(job), job.get_name() + TrainingScheduler.REPORT_FILE_EXTENSION)
+        with open(report_path, 'w') as open_pointer:
+            json.dump(report, open_pointer, indent=2)
+        return report_path
+
+    @staticmethod
+    def __get_model_path(job_folder: str) -> str:
+        generated_filename = CommonUtilities.generate_file_name_base(".keras")
+        file_name_counter = 0
+        model_path = join(job_folder, generated_filename.format(file_name_counter))
+        while exists(model_path):
+            file_name_counter += 1
+            model_path = join(job_folder, generated_filename.format(file_name_counter))
+        return model_path
+
+    @staticmethod
+    def __get_summary(report: dict) -> str:
+        if "error" in report:
+            return "failed ({})".format(report["error"])
+        if "status" in report:
+            return report["status"]
+        return "test accuracy {}% in {:.1f} s".format(round(report.get("test_accuracy", 0.0) * 100.0, 2),
+                                                      report["elapsed_seconds"])
+
+
+def _train_job(job: TrainingJob, model_path: str, intra_op_threads: int, inter_op_threads: int,
+               constants_overrides: dict) -> dict:
+    """
+    Entry point of a worker process: trains the job and returns its report.
+    """
+    started = perf_counter()
+    # The thread limits are set before TensorFlow runs anything.
+    import parallel_tuning
+    parallel_tuning.limit_threads(intra_op_threads, inter_op_threads)
+    for name, value in constants_overrides.items():
+        setattr(constants, name, value)
+    constants.PROFIT_LEVEL_INDEX = job.get_profit_level_index()
+    constants.FEATURE_LABEL_MODIFICATION_STRATEGY = job.get_strategy()
+    constants.MULTI_HEAD_TRAINING = False
+    # One level of parallelism: the searches of the jobs run sequentially.
+    constants.TUNER_WORKERS = 1
+    # The tuners write their projects in the working directory: one per job.
+    os.chdir(os.path.dirname(model_path))
+    import train_network
+
+    report = train_network.run(model_path, job.get_ccy_pair(),
+                               job.get_features_labels_path(constants.FEATURES_LABELS_PATH))
+    if report is None:
+        report = {"status": "no data"}
+    report["elapsed_seconds"] = perf_counter() - started
+    report["intra_op_threads"] = intra_op_threads
+    report["inter_op_threads"] = inter_op_threads
+    return report
+
+
+def run() -> dict:
+    """
+    Trains the jobs of constants.TRAINING_JOBS.
+    """
+    jobs = [TrainingJob(*job_parameters) for job_parameters in constants.TRAINING_JOBS]
+    return TrainingScheduler(jobs).run()